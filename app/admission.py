@@ -0,0 +1,258 @@
+"""
+Admission control for write requests.
+
+SQLite has a single writer, so a burst of form posts (everyone recording
+allowances at payout time) only queues on the writer lock, holding a
+worker thread each while it waits. ``AdmissionMiddleware`` lets at most
+``WRITE_CONCURRENCY`` write requests run at once and parks up to
+``WRITE_QUEUE`` more on the event loop, in arrival order. Requests
+beyond that, or that wait longer than ``WRITE_QUEUE_TIMEOUT``, get an
+immediate ``503`` with a ``Retry-After`` header instead of adding to the
+pile-up. Reads never enter the queue, so they keep their threads and
+their latency during a write storm.
+
+With tenant routing each household's ledger has its own writer, so it
+gets its own queue: a payout burst in one household never sheds
+another's writes. The middleware must then run inside
+``TenantMiddleware``, which resolves the household first.
+
+Queue times and shed counts are reported under ``admission.writes``
+(and ``admission.tenants`` per household database) in ``/api/metrics``.
+Queues are per worker process.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import metrics, tenants
+from app.database import current_sessionmaker
+
+# Write requests handled at once; more would only wait on SQLite's lock
+WRITE_CONCURRENCY = int(os.environ.get("LEDGER_WRITE_CONCURRENCY", "2"))
+
+# Write requests allowed to wait for a slot before new ones are shed
+WRITE_QUEUE = int(os.environ.get("LEDGER_WRITE_QUEUE", "32"))
+
+# Longest a write request waits for a slot before it is shed
+WRITE_QUEUE_TIMEOUT = float(os.environ.get("LEDGER_WRITE_QUEUE_TIMEOUT", "5"))
+
+# Seconds clients are told to wait before retrying a shed request
+RETRY_AFTER = int(os.environ.get("LEDGER_WRITE_RETRY_AFTER", "1"))
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Queue times kept for the percentiles in the metrics
+SAMPLES = 1024
+
+
+class AdmissionQueue:
+    """
+    A bounded FIFO of requests waiting for one of a fixed number of slots.
+    
+    Used from a single event loop; a released slot is handed straight to
+    the oldest waiter so late arrivals cannot overtake it.
+    """
+    
+    def __init__(self, concurrency: int, queue_size: int, timeout: float):
+        """
+        Create an admission queue.
+        
+        Args:
+            concurrency: Requests admitted at once.
+            queue_size: Requests allowed to wait for a slot.
+            timeout: Longest wait in seconds before a request is shed.
+        """
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.active = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._samples: Deque[float] = deque(maxlen=SAMPLES)
+    
+    async def acquire(self) -> Optional[float]:
+        """
+        Wait for a slot.
+        
+        Returns:
+            Optional[float]: Seconds spent queued, or None if the request
+                was shed because the queue was full or the wait timed out.
+        """
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            return self._admit(0.0)
+        if len(self._waiters) >= self.queue_size:
+            self.shed += 1
+            return None
+        
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait({future}, timeout=self.timeout)
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+        if not future.done():
+            self._abandon(future)
+            self.timed_out += 1
+            return None
+        return self._admit(time.perf_counter() - started)
+    
+    def release(self) -> None:
+        """Hand the caller's slot to the oldest waiter, or free it."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+    
+    def _admit(self, waited: float) -> float:
+        """Record an admitted request's queue time."""
+        self.admitted += 1
+        self._samples.append(waited)
+        return waited
+    
+    def _abandon(self, future: asyncio.Future) -> None:
+        """Leave the queue, giving back a slot handed over meanwhile."""
+        if future.done():
+            self.release()
+        else:
+            future.cancel()
+            self._waiters.remove(future)
+    
+    @property
+    def idle(self) -> bool:
+        """Whether no request holds or waits for a slot."""
+        return self.active == 0 and not self._waiters
+    
+    def stats(self) -> dict:
+        """
+        Report queue state and recent queue times.
+        
+        Returns:
+            dict: Limits, active and waiting requests, admitted, shed and
+                timed-out totals, and queue time percentiles in milliseconds.
+        """
+        samples = sorted(self._samples)
+        if len(samples) > 1:
+            cuts = statistics.quantiles(samples, n=100, method="inclusive")
+            p50, p95 = cuts[49], cuts[94]
+        else:
+            p50 = p95 = samples[0] if samples else 0.0
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "queue_ms": {
+                "p50": round(p50 * 1000, 3),
+                "p95": round(p95 * 1000, 3),
+                "max": round((samples[-1] if samples else 0.0) * 1000, 3)
+            }
+        }
+
+
+writes = AdmissionQueue(WRITE_CONCURRENCY, WRITE_QUEUE, WRITE_QUEUE_TIMEOUT)
+
+# Household queues kept at once, like the tenant engines they serve
+TENANT_QUEUES = tenants.MAX_ENGINES
+
+# Household database URL -> its queue, least recently used first; only
+# touched from the event loop
+tenant_writes: "OrderedDict[str, AdmissionQueue]" = OrderedDict()
+
+
+def queue_for_request() -> AdmissionQueue:
+    """
+    Get the queue for the database the current request writes to.
+    
+    Returns:
+        AdmissionQueue: The household's own queue under tenant routing,
+            otherwise the shared one.
+    """
+    factory = current_sessionmaker.get()
+    if factory is None:
+        return writes
+    key = str(factory.kw["bind"].url)
+    queue = tenant_writes.get(key)
+    if queue is None:
+        _evict_idle(TENANT_QUEUES - 1)
+        queue = tenant_writes[key] = AdmissionQueue(WRITE_CONCURRENCY, WRITE_QUEUE, WRITE_QUEUE_TIMEOUT)
+    else:
+        tenant_writes.move_to_end(key)
+    return queue
+
+
+def _evict_idle(capacity: int) -> None:
+    """Drop least recently used idle household queues beyond a capacity."""
+    excess = len(tenant_writes) - capacity
+    if excess <= 0:
+        return
+    for key in [key for key, queue in tenant_writes.items() if queue.idle][:excess]:
+        del tenant_writes[key]
+
+
+metrics.register("admission.writes", writes.stats)
+metrics.register("admission.tenants", lambda: {key: queue.stats() for key, queue in tenant_writes.items()})
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting write requests through an AdmissionQueue."""
+    
+    def __init__(self, app: ASGIApp, queue: Optional[AdmissionQueue] = None,
+                 retry_after: int = RETRY_AFTER):
+        """
+        Wrap an ASGI application.
+        
+        Args:
+            app: Application to wrap.
+            queue: Admission queue for every request; by default each
+                request uses its database's (see queue_for_request).
+            retry_after: Retry-After seconds sent with shed requests.
+        """
+        self.app = app
+        self.queue = queue
+        self.retry_after = retry_after
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        
+        queue = self.queue or queue_for_request()
+        if await queue.acquire() is None:
+            await _unavailable(send, self.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            queue.release()
+
+
+async def _unavailable(send: Send, retry_after: int) -> None:
+    """Send a JSON 503 response asking the client to retry later."""
+    body = json.dumps({"detail": "Too many updates in progress, please retry shortly"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,365 @@
+"""
+Columnar in-memory analytics over the Account ledger.
+
+Loads Account into NumPy arrays (child ID, day ordinal, month ordinal,
+amount in cents) and computes grouped aggregates, rolling windows and
+percentiles in vectorized form. Each refresh only reads rows added since
+the previous one; if rows were removed the columns are reloaded from
+scratch. Transactions are append-only, so edits in place are not tracked.
+Opening-balance rows carried forward from archived years are loaded but
+flagged: they count towards balances (and so interest) but stand in for
+history rather than activity, so the activity reports skip them.
+
+Day ordinals count days since 1970-01-01 and month ordinals count months
+since 1970-01, matching NumPy's ``datetime64`` units.
+"""
+
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import session_engine
+
+# Account rows that carry an archived year's balance forward
+OPENING = "id IN (SELECT account_id FROM ArchiveOpenings)"
+
+# julianday('1970-01-01')
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+def parse_days(dates: Sequence[str]) -> np.ndarray:
+    """
+    Convert YYYY-MM-DD strings to day ordinals.
+    
+    Dates with an out-of-range day (e.g. 2021-02-31, which the form
+    validation allows) roll over into the following month.
+    
+    Args:
+        dates: ISO date strings.
+    
+    Returns:
+        np.ndarray: int64 days since 1970-01-01.
+    """
+    try:
+        return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+    except ValueError:
+        days = np.empty(len(dates), dtype=np.int64)
+        for i, value in enumerate(dates):
+            try:
+                days[i] = np.datetime64(value, "D").astype(np.int64)
+            except ValueError:
+                month_start = np.datetime64(value[:7], "D")
+                days[i] = month_start.astype(np.int64) + int(value[8:10]) - 1
+        return days
+
+
+def month_of(day: np.ndarray) -> np.ndarray:
+    """Convert day ordinals to month ordinals."""
+    return day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+class LedgerSnapshot(NamedTuple):
+    """
+    Immutable columnar copy of the Account table as of one refresh.
+    
+    Attributes:
+        ids: Account row IDs, ascending.
+        child_ids: Child ID per row.
+        days: Day ordinal per row.
+        months: Month ordinal per row.
+        cents: Amount per row in integer cents.
+        openings: True for opening balances carried from archived years.
+    """
+    ids: np.ndarray
+    child_ids: np.ndarray
+    days: np.ndarray
+    months: np.ndarray
+    cents: np.ndarray
+    openings: np.ndarray
+    
+    @property
+    def last_id(self) -> int:
+        """Highest loaded Account ID, or 0 when empty."""
+        return int(self.ids[-1]) if len(self.ids) else 0
+    
+    def extend(self, rows: Sequence[tuple]) -> "LedgerSnapshot":
+        """
+        Return a new snapshot with rows appended.
+        
+        Args:
+            rows: (id, child_id, day, cents, is_opening) tuples.
+        
+        Returns:
+            LedgerSnapshot: The combined columns; this one is unchanged.
+        """
+        block = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        return LedgerSnapshot(
+            ids=np.concatenate([self.ids, block[:, 0]]),
+            child_ids=np.concatenate([self.child_ids, block[:, 1]]),
+            days=np.concatenate([self.days, block[:, 2]]),
+            months=np.concatenate([self.months, month_of(block[:, 2])]),
+            cents=np.concatenate([self.cents, block[:, 3]]),
+            openings=np.concatenate([self.openings, block[:, 4].astype(bool)])
+        )
+
+
+_NONE = np.empty(0, dtype=np.int64)
+EMPTY = LedgerSnapshot(
+    ids=_NONE, child_ids=_NONE, days=_NONE, months=_NONE, cents=_NONE,
+    openings=np.empty(0, dtype=bool)
+)
+
+
+class LedgerColumns:
+    """
+    Refreshable store of the latest LedgerSnapshot of one database.
+    
+    Refreshes build new arrays and publish them in a single assignment,
+    so a report holding a snapshot never sees columns of different
+    lengths.
+    
+    Attributes:
+        snapshot: Columns as of the last refresh.
+    """
+    
+    def __init__(self):
+        """Create an empty store."""
+        self.snapshot = EMPTY
+        self.lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.snapshot.ids)
+    
+    def refresh(self, db: Session) -> int:
+        """
+        Bring the snapshot up to date with the database.
+        
+        Args:
+            db: Database session.
+        
+        Returns:
+            int: Number of rows loaded by this refresh.
+        """
+        with self.lock:
+            current = self.snapshot
+            count, max_id = db.execute(
+                text("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM Account")
+            ).one()
+            if max_id == current.last_id and count == len(current.ids):
+                return 0
+            
+            if max_id < current.last_id or count < len(current.ids):
+                # Rows were deleted (e.g. archived): start over.
+                current = EMPTY
+            rows = _read_rows(db, current.last_id)
+            snapshot = current.extend(rows)
+            if len(snapshot.ids) != count:
+                # Rows below the high-water mark changed: reload everything.
+                rows = _read_rows(db, 0)
+                snapshot = EMPTY.extend(rows)
+            self.snapshot = snapshot
+            return len(rows)
+
+
+def _read_rows(db: Session, since: int) -> List[tuple]:
+    """Read (id, child_id, day, cents, is_opening) for rows after an ID."""
+    # Day ordinals and cents are computed by SQLite, so rows arrive as
+    # plain integers; julianday() also rolls invalid days over.
+    cursor = db.connection().connection.cursor()
+    try:
+        return cursor.execute(
+            "SELECT id, COALESCE(children_id, 0), "
+            f"COALESCE(CAST(julianday(date) - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER), 0), "
+            f"CAST(round(COALESCE(amount, 0) * 100) AS INTEGER), {OPENING} "
+            "FROM Account WHERE id > ? ORDER BY id",
+            (since,)
+        ).fetchall()
+    finally:
+        cursor.close()
+
+
+_stores: Dict[str, LedgerColumns] = {}
+_stores_lock = threading.Lock()
+
+
+def get_columns(db: Session) -> LedgerSnapshot:
+    """
+    Get the refreshed columnar ledger for a session's database.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        LedgerSnapshot: Columns including every committed Account row.
+    """
+    key = str(session_engine(db).url)
+    with _stores_lock:
+        store = _stores.setdefault(key, LedgerColumns())
+    store.refresh(db)
+    return store.snapshot
+
+
+def clear_stores() -> None:
+    """Drop every loaded columnar ledger."""
+    with _stores_lock:
+        _stores.clear()
+
+
+def _select(columns: LedgerSnapshot, child_id: Optional[int]) -> tuple:
+    """Return activity (child_ids, days, months, cents), optionally for one child."""
+    mask = ~columns.openings
+    if child_id is not None:
+        mask &= columns.child_ids == child_id
+    return (columns.child_ids[mask], columns.days[mask],
+            columns.months[mask], columns.cents[mask])
+
+
+# Reports
+
+def monthly_spend(columns: LedgerSnapshot, child_id: Optional[int] = None) -> List[dict]:
+    """
+    Total purchases (negative amounts) per child per month.
+    
+    Args:
+        columns: Columnar ledger.
+        child_id: Restrict to one child.
+    
+    Returns:
+        List[dict]: child_id, month (YYYY-MM) and spend in dollars,
+            ordered by child then month; months without spending omitted.
+    """
+    child_ids, _, months, cents = _select(columns, child_id)
+    debit = cents < 0
+    if not debit.any():
+        return []
+    child_ids, months, spend = child_ids[debit], months[debit], -cents[debit]
+    
+    # One int64 key per (child, month) so grouping is a 1-D unique
+    first_month = int(months.min())
+    width = int(months.max()) - first_month + 1
+    keys = child_ids * width + (months - first_month)
+    groups, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, weights=spend)
+    labels = (groups % width + first_month).astype("datetime64[M]").astype(str)
+    return [
+        {"child_id": child, "month": month, "spend": total / 100}
+        for child, month, total in zip((groups // width).tolist(), labels.tolist(), totals.tolist())
+    ]
+
+
+def reward_ratio(columns: LedgerSnapshot) -> List[dict]:
+    """
+    Rewards (credits) versus purchases (debits) per child.
+    
+    Args:
+        columns: Columnar ledger.
+    
+    Returns:
+        List[dict]: child_id, rewards, purchases and their ratio
+            (None when the child has no purchases).
+    """
+    child_ids, _, _, cents = _select(columns, None)
+    if not len(cents):
+        return []
+    children, inverse = np.unique(child_ids, return_inverse=True)
+    credits = np.bincount(inverse, weights=np.where(cents > 0, cents, 0))
+    debits = np.bincount(inverse, weights=np.where(cents < 0, -cents, 0))
+    return [
+        {
+            "child_id": int(child),
+            "rewards": credit / 100,
+            "purchases": debit / 100,
+            "ratio": credit / debit if debit else None
+        }
+        for child, credit, debit in zip(children, credits, debits)
+    ]
+
+
+def rolling_net(
+    columns: LedgerSnapshot,
+    child_id: Optional[int] = None,
+    window: int = 90,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> List[dict]:
+    """
+    Net amount over a trailing window, one point per day.
+    
+    Args:
+        columns: Columnar ledger.
+        child_id: Restrict to one child; all children combined if None.
+        window: Window length in days.
+        start: First day reported (YYYY-MM-DD), defaults to first activity.
+        end: Last day reported (YYYY-MM-DD), defaults to last activity.
+    
+    Returns:
+        List[dict]: date and net (dollars) for the window ending that day.
+    """
+    _, days, _, cents = _select(columns, child_id)
+    if not len(days):
+        return []
+    
+    first = int(days.min())
+    last = int(days.max())
+    report_start = int(parse_days([start])[0]) if start else first
+    report_end = int(parse_days([end])[0]) if end else last
+    if report_end < report_start:
+        return []
+    
+    # Daily totals from the earliest day that can reach the report window
+    origin = min(first, report_start - window + 1)
+    span = max(last, report_end) - origin + 1
+    in_range = days <= origin + span - 1
+    daily = np.bincount(days[in_range] - origin, weights=cents[in_range], minlength=span)
+    cumulative = np.concatenate([[0.0], np.cumsum(daily)])
+    
+    ends = np.arange(report_start, report_end + 1) - origin + 1
+    starts = np.maximum(ends - window, 0)
+    nets = cumulative[ends] - cumulative[starts]
+    labels = np.arange(report_start, report_end + 1).astype("datetime64[D]").astype(str)
+    return [
+        {"date": day, "net": net / 100}
+        for day, net in zip(labels.tolist(), nets.tolist())
+    ]
+
+
+def percentiles(
+    columns: LedgerSnapshot,
+    metric: str = "balance",
+    points: Sequence[float] = (50, 90, 99)
+) -> Dict[str, float]:
+    """
+    Percentiles of child balances or transaction sizes.
+    
+    Balances include archived-year openings; transaction sizes do not.
+    
+    Args:
+        columns: Columnar ledger.
+        metric: "balance" (per child), "credit" or "debit" (per transaction).
+        points: Percentiles to compute, 0-100.
+    
+    Returns:
+        Dict[str, float]: Value in dollars keyed by percentile ("p50", ...).
+    
+    Raises:
+        ValueError: If the metric is unknown.
+    """
+    if metric == "balance":
+        _, inverse = np.unique(columns.child_ids, return_inverse=True)
+        values = np.bincount(inverse, weights=columns.cents) if len(columns.ids) else np.empty(0)
+    elif metric == "credit":
+        cents = _select(columns, None)[3]
+        values = cents[cents > 0]
+    elif metric == "debit":
+        cents = _select(columns, None)[3]
+        values = -cents[cents < 0]
+    else:
+        raise ValueError(f"Unknown metric: {metric}")
+    
+    if not len(values):
+        return {f"p{point:g}": 0.0 for point in points}
+    results = np.percentile(values, points)
+    return {f"p{point:g}": float(value) / 100 for point, value in zip(points, results)}
@@ -0,0 +1,392 @@
+"""
+Yearly archival of closed ledger years.
+
+Moves every Account row dated before the end of a closed year into a
+per-year table (``Account_YYYY``) in an archive database beside the
+ledger (``ledgerdb-archive.sqlite`` for ``ledgerdb.sqlite``), leaving
+only the current period in the hot table. Each child's closing balance
+is carried forward as an "Opening balance" transaction dated 1 January
+of the following year, so balances, interest and the dashboard's
+running totals are unchanged.
+
+The move happens in two steps so a crash can never lose rows: the rows
+are first copied and committed to the archive, then a second
+transaction recomputes a SHA-256 checksum over both copies and only
+deletes the hot rows, inserts the openings and records the year in
+ArchiveManifest if they match. A failed run leaves nothing in the
+manifest and is simply repeated.
+
+Reads that ask for archived history (see ``transactions``) attach the
+archive and merge it with the hot table, skipping the opening rows.
+
+Usage:
+    python -m app.archive                 # archive every closed year
+    python -m app.archive --through 2022  # archive up to and including 2022
+    python -m app.archive --verify        # re-check archived checksums
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple, cast
+
+from sqlalchemy import text
+from sqlalchemy.engine import CursorResult, Engine, Row
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal, database_path, init_db, serialized_write, session_engine
+
+# Schema name the archive database is attached under
+SCHEMA = "archive"
+
+OPENING_DESCRIPTION = "Opening balance"
+
+COLUMNS = "id, children_id, date, description, amount"
+
+
+def archive_path(bind: Engine) -> str:
+    """
+    Get the archive database file for a ledger database.
+    
+    Args:
+        bind: Engine of the ledger database.
+    
+    Returns:
+        str: Path of the archive file beside the ledger.
+    
+    Raises:
+        ValueError: If the ledger is an in-memory database.
+    """
+    path = database_path(bind)
+    if path is None:
+        raise ValueError("In-memory databases cannot be archived")
+    root, extension = os.path.splitext(os.path.abspath(path))
+    return f"{root}-archive{extension or '.sqlite'}"
+
+
+def table_name(year: int) -> str:
+    """Name of the archive table holding a year's rows."""
+    return f"Account_{int(year)}"
+
+
+def attach(db: Session, create: bool = False) -> bool:
+    """
+    Attach the archive database to the session's connection.
+    
+    Attachments last for the pooled connection's lifetime, so this is a
+    no-op after the first call on a connection. SQLite cannot attach
+    inside a write transaction; call this before the session writes.
+    
+    Args:
+        db: Database session.
+        create: Create the archive file if it does not exist yet.
+    
+    Returns:
+        bool: True if the archive is attached.
+    """
+    connection = db.connection()
+    attached = connection.exec_driver_sql("PRAGMA database_list").fetchall()
+    if any(row[1] == SCHEMA for row in attached):
+        return True
+    path = archive_path(session_engine(db))
+    if not create and not os.path.exists(path):
+        return False
+    connection.exec_driver_sql(f"ATTACH DATABASE ? AS {SCHEMA}", (path,))
+    return True
+
+
+def archived_years(db: Session) -> List[int]:
+    """
+    List archived years, oldest first.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[int]: Years recorded in ArchiveManifest.
+    """
+    return list(db.execute(text("SELECT year FROM ArchiveManifest ORDER BY year")).scalars())
+
+
+def checksum(db: Session, source: str, where: str = "", params: Optional[dict] = None) -> Tuple[int, str]:
+    """
+    Checksum Account-shaped rows in ID order.
+    
+    Args:
+        db: Database session.
+        source: Table to read, optionally schema-qualified.
+        where: Optional WHERE clause selecting the rows.
+        params: Parameters for the WHERE clause.
+    
+    Returns:
+        Tuple[int, str]: Row count and hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    rows = db.execute(text(f"SELECT {COLUMNS} FROM {source} {where} ORDER BY id"), params or {})
+    for row in rows:
+        digest.update(("\x1f".join(map(repr, row)) + "\n").encode())
+        count += 1
+    return count, digest.hexdigest()
+
+
+def closed_years(db: Session, through: int) -> List[int]:
+    """
+    List years with hot Account rows up to and including a year.
+    
+    Args:
+        db: Database session.
+        through: Last year to include.
+    
+    Returns:
+        List[int]: Years, oldest first.
+    """
+    rows = db.execute(
+        text("""
+            SELECT DISTINCT CAST(substr(date, 1, 4) AS INTEGER) AS year
+            FROM Account WHERE date < :end
+            ORDER BY year
+        """),
+        {"end": f"{through + 1:04d}-01-01"}
+    ).scalars()
+    return [year for year in rows if year]
+
+
+@serialized_write
+def archive_year(db: Session, year: int, today: Optional[date] = None) -> Optional[models.ArchiveManifest]:
+    """
+    Move a closed year's transactions into the archive.
+    
+    Every hot row dated before the following 1 January moves, so rows
+    left behind by earlier runs (e.g. backdated entries) are swept too.
+    
+    Args:
+        db: Database session.
+        year: Year to archive.
+        today: Current date, defaults to today.
+    
+    Returns:
+        Optional[models.ArchiveManifest]: Manifest entry, or None if the
+            year was already archived or has no rows.
+    
+    Raises:
+        ValueError: If the year has not ended yet.
+        RuntimeError: If the archived copy does not match the hot rows.
+    """
+    today = today or date.today()
+    if year >= today.year:
+        raise ValueError(f"{year} has not closed yet")
+    if db.get(models.ArchiveManifest, year) is not None:
+        return None
+    
+    table = f"{SCHEMA}.{table_name(year)}"
+    end = {"end": f"{year + 1:04d}-01-01"}
+    
+    # Step 1: copy into the archive and commit.
+    attach(db, create=True)
+    db.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    db.execute(text(f"""
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY,
+            children_id INTEGER,
+            date TEXT,
+            description TEXT,
+            amount REAL
+        )
+    """))
+    db.execute(text(f"INSERT INTO {table} SELECT {COLUMNS} FROM Account WHERE date < :end ORDER BY id"), end)
+    db.execute(text(f"CREATE INDEX {SCHEMA}.ix_{table_name(year)}_children_id ON {table_name(year)} (children_id, date)"))
+    db.commit()
+    
+    # Step 2: the manifest insert takes the write lock first, so the hot
+    # rows cannot change between the checksum and the delete. Committing
+    # returned the connection to the pool, so attach again first.
+    attach(db, create=True)
+    manifest = models.ArchiveManifest(
+        year=year,
+        table_name=table_name(year),
+        rows=0,
+        checksum="",
+        archived_at=datetime.now().isoformat(timespec="seconds")
+    )
+    db.add(manifest)
+    db.flush()
+    
+    rows, digest = checksum(db, "Account", "WHERE date < :end", end)
+    if rows == 0 or checksum(db, table) != (rows, digest):
+        db.rollback()
+        attach(db, create=True)
+        db.execute(text(f"DROP TABLE {table}"))
+        db.commit()
+        if rows == 0:
+            return None
+        raise RuntimeError(f"Archive checksum mismatch for {year}; nothing was moved")
+    db.execute(
+        text("UPDATE ArchiveManifest SET rows = :rows, checksum = :checksum WHERE year = :year"),
+        {"rows": rows, "checksum": digest, "year": year}
+    )
+    
+    # Openings get IDs above every archived row, and are registered
+    # before they are inserted so the leaderboard triggers skip them.
+    db.execute(
+        text(f"""
+            INSERT INTO ArchiveOpenings (account_id, year, children_id)
+            SELECT base.id + ROW_NUMBER() OVER (ORDER BY children_id), :year, children_id
+            FROM {table},
+                 (SELECT MAX((SELECT COALESCE(MAX(id), 0) FROM Account),
+                             (SELECT COALESCE(MAX(id), 0) FROM {table})) AS id) AS base
+            WHERE children_id IS NOT NULL
+            GROUP BY children_id
+            HAVING round(SUM(amount), 2) != 0
+        """),
+        {"year": year}
+    )
+    db.execute(
+        text(f"""
+            INSERT INTO Account (id, children_id, date, description, amount)
+            SELECT o.account_id, o.children_id, :opening, :description, round(SUM(a.amount), 2)
+            FROM ArchiveOpenings AS o
+            JOIN {table} AS a ON a.children_id = o.children_id
+            WHERE o.year = :year
+            GROUP BY o.account_id
+        """),
+        {"year": year, "opening": end["end"], "description": OPENING_DESCRIPTION}
+    )
+    deleted = cast(CursorResult, db.execute(text("DELETE FROM Account WHERE date < :end"), end)).rowcount
+    if deleted != rows:
+        db.rollback()
+        raise RuntimeError(f"Expected to move {rows} rows for {year}, found {deleted}")
+    db.commit()
+    db.refresh(manifest)
+    return manifest
+
+
+def archive_through(db: Session, through: Optional[int] = None, today: Optional[date] = None) -> List[models.ArchiveManifest]:
+    """
+    Archive every closed year up to and including a year, oldest first.
+    
+    Args:
+        db: Database session.
+        through: Last year to archive, defaults to last year.
+        today: Current date, defaults to today.
+    
+    Returns:
+        List[models.ArchiveManifest]: Manifest entries of newly archived years.
+    
+    Raises:
+        ValueError: If ``through`` has not ended yet.
+        RuntimeError: If an archived copy does not match the hot rows.
+    """
+    today = today or date.today()
+    through = today.year - 1 if through is None else through
+    if through >= today.year:
+        raise ValueError(f"{through} has not closed yet")
+    archived = []
+    for year in closed_years(db, through):
+        manifest = archive_year(db, year, today=today)
+        if manifest is not None:
+            archived.append(manifest)
+    return archived
+
+
+def verify(db: Session) -> List[dict]:
+    """
+    Recompute the checksum of every archived year.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[dict]: year, rows, and ok (whether rows and checksum match
+            the manifest) per archived year.
+    """
+    entries = db.query(models.ArchiveManifest).order_by(models.ArchiveManifest.year).all()
+    if entries and not attach(db):
+        return [{"year": entry.year, "rows": 0, "ok": False} for entry in entries]
+    results = []
+    for entry in entries:
+        rows, digest = checksum(db, f"{SCHEMA}.{entry.table_name}")
+        results.append({
+            "year": entry.year,
+            "rows": rows,
+            "ok": rows == entry.rows and digest == entry.checksum
+        })
+    return results
+
+
+def transactions(db: Session, child_id: int) -> Sequence[Row]:
+    """
+    Get a child's full history, archived years included.
+    
+    Opening-balance rows are left out since the archived rows they stand
+    for are returned instead.
+    
+    Args:
+        db: Database session.
+        child_id: Child ID.
+    
+    Returns:
+        Sequence[Row]: (id, children_id, date, description, amount,
+            cumulative) rows ordered by date, where cumulative is the
+            balance after each transaction.
+    """
+    tables = db.execute(text("SELECT table_name FROM ArchiveManifest ORDER BY year")).scalars().all()
+    sources = ["main.Account"]
+    if tables and attach(db):
+        sources = [f"{SCHEMA}.{name}" for name in tables] + sources
+    union = " UNION ALL ".join(
+        f"SELECT {COLUMNS} FROM {source} WHERE children_id = :child_id" for source in sources
+    )
+    return db.execute(
+        text(f"""
+            SELECT {COLUMNS}, SUM(amount) OVER (ORDER BY date, id) AS cumulative
+            FROM ({union})
+            WHERE id NOT IN (SELECT account_id FROM main.ArchiveOpenings)
+            ORDER BY date, id
+        """),
+        {"child_id": child_id}
+    ).all()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Archive closed ledger years")
+    parser.add_argument("--through", type=int, help="last year to archive, defaults to last year")
+    parser.add_argument("--verify", action="store_true", help="re-check archived checksums only")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.verify:
+            results = verify(db)
+            for result in results:
+                print(f"{result['year']}\t{result['rows']}\t{'ok' if result['ok'] else 'MISMATCH'}")
+            return 0 if all(result["ok"] for result in results) else 1
+        archived = archive_through(db, args.through)
+        for manifest in archived:
+            print(f"Archived {manifest.rows} transactions from {manifest.year} into {manifest.table_name}")
+    except (ValueError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+    
+    if not archived:
+        print("Nothing to archive")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
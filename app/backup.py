@@ -0,0 +1,469 @@
+"""
+Online backups and read-only reporting snapshots.
+
+Copies a live ledger with SQLite's backup API in batches of
+``PAGE_BATCH`` pages. The source is only read-locked while a batch is
+copied, so a writer waits at most one batch (and never, with WAL). If
+writes keep restarting the copy, it falls back to one snapshot-isolated
+pass, which under WAL does not block writers either.
+
+Each copy is written under a temporary name, switched out of WAL mode,
+checked with ``PRAGMA integrity_check`` and only then renamed into
+place next to a JSON manifest (SHA-256, size, row counts), so every
+``<ledger>-<timestamp>.sqlite`` in the backup directory is a verified
+snapshot. The newest one is also linked as ``<ledger>-latest.sqlite``;
+with ``LEDGER_REPORT_SNAPSHOT=1`` heavy reporting endpoints read that
+file through a read-only engine instead of competing with writers.
+
+Usage:
+    python -m app.backup                    # back up now
+    python -m app.backup --list
+    python -m app.backup --verify PATH
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime
+from typing import Dict, Generator, List, Optional, Sequence, Tuple
+
+from fastapi import Depends
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import tenants
+from app.database import database_path, get_db, is_memory_database, session_engine
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = os.environ.get("LEDGER_BACKUP_DIR", "./backups")
+
+# Seconds between background backups; 0 disables them
+BACKUP_INTERVAL_SECONDS = float(os.environ.get("LEDGER_BACKUP_INTERVAL", "0"))
+
+# Verified snapshots kept per ledger
+KEEP = int(os.environ.get("LEDGER_BACKUP_KEEP", "7"))
+
+# Pages copied per step, and seconds to pause (unlocked) between steps
+PAGE_BATCH = int(os.environ.get("LEDGER_BACKUP_PAGES", "256"))
+STEP_PAUSE_SECONDS = float(os.environ.get("LEDGER_BACKUP_PAUSE", "0"))
+
+# Restarts caused by concurrent writes before copying in one pass
+MAX_RESTARTS = 5
+
+# Serve heavy reports from the latest snapshot
+REPORT_SNAPSHOT = os.environ.get("LEDGER_REPORT_SNAPSHOT", "0") == "1"
+
+# Tables counted in each manifest
+COUNTED_TABLES = ("Children", "Workbooks", "Members", "Account")
+
+
+class _Restarted(Exception):
+    """Raised from the progress callback to abandon a restarting copy."""
+
+
+def _stem(source: str) -> str:
+    """Snapshot name prefix for a ledger file."""
+    return os.path.splitext(os.path.basename(source))[0]
+
+
+def latest_path(source: str, directory: str = BACKUP_DIR) -> str:
+    """
+    Get the path of a ledger's newest verified snapshot link.
+    
+    Args:
+        source: Ledger file.
+        directory: Backup directory.
+    
+    Returns:
+        str: ``<directory>/<ledger>-latest.sqlite``.
+    """
+    return os.path.join(directory, f"{_stem(source)}-latest.sqlite")
+
+
+def _copy(source: str, target: str, pages: int, pause: float) -> int:
+    """
+    Copy a database with the backup API.
+    
+    Args:
+        source: Ledger file.
+        target: New file to write.
+        pages: Pages per step; -1 copies everything in one step.
+        pause: Seconds to sleep between steps.
+    
+    Returns:
+        int: Number of steps taken.
+    
+    Raises:
+        _Restarted: If concurrent writes restarted the copy too often.
+    """
+    steps = 0
+    restarts = 0
+    previous = None
+    
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal steps, restarts, previous
+        steps += 1
+        if previous is not None and remaining > previous:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise _Restarted()
+        previous = remaining
+        if pause and remaining:
+            time.sleep(pause)
+    
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target)
+    try:
+        source_connection.backup(target_connection, pages=pages, progress=progress)
+        # A self-contained file: no -wal or -shm needed to read it
+        target_connection.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target_connection.close()
+        source_connection.close()
+    return steps
+
+
+def _file_digest(path: str) -> str:
+    """SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _inspect(path: str) -> Tuple[str, Dict[str, int]]:
+    """Run an integrity check and count rows in a snapshot."""
+    connection = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        result = connection.execute("PRAGMA integrity_check").fetchone()[0]
+        tables = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        counts = {
+            table: connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            for table in COUNTED_TABLES if table in tables
+        }
+    finally:
+        connection.close()
+    return result, counts
+
+
+def backup(source: str, directory: str = BACKUP_DIR, pages: int = PAGE_BATCH,
+           pause: float = STEP_PAUSE_SECONDS, keep: int = KEEP) -> dict:
+    """
+    Take a verified snapshot of a live ledger.
+    
+    Args:
+        source: Ledger file.
+        directory: Backup directory.
+        pages: Pages copied per step.
+        pause: Seconds to sleep between steps.
+        keep: Snapshots of this ledger to keep; older ones are deleted.
+    
+    Returns:
+        dict: The snapshot's manifest: path, sha256, bytes, steps,
+            seconds, tables (row counts) and created.
+    
+    Raises:
+        RuntimeError: If the copy fails its integrity check.
+    """
+    os.makedirs(directory, exist_ok=True)
+    created = datetime.now()
+    path = os.path.join(directory, f"{_stem(source)}-{created:%Y%m%dT%H%M%S%f}.sqlite")
+    partial = f"{path}.partial"
+    
+    started = time.perf_counter()
+    try:
+        try:
+            steps = _copy(source, partial, pages, pause)
+        except _Restarted:
+            logger.info("Backup of %s kept restarting; copying in one pass", source)
+            os.remove(partial)
+            steps = _copy(source, partial, -1, 0)
+        result, counts = _inspect(partial)
+        if result != "ok":
+            raise RuntimeError(f"Backup of {source} failed its integrity check: {result}")
+        manifest = {
+            "path": path,
+            "source": os.path.abspath(source),
+            "sha256": _file_digest(partial),
+            "bytes": os.path.getsize(partial),
+            "steps": steps,
+            "seconds": round(time.perf_counter() - started, 3),
+            "tables": counts,
+            "created": created.isoformat(timespec="seconds")
+        }
+        os.replace(partial, path)
+    finally:
+        with suppress(FileNotFoundError):
+            os.remove(partial)
+    with open(f"{path}.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    
+    _publish_latest(path, latest_path(source, directory))
+    _prune(source, directory, keep)
+    return manifest
+
+
+def _publish_latest(path: str, latest: str) -> None:
+    """Atomically point the -latest name at a snapshot."""
+    staging = f"{latest}.partial"
+    with suppress(FileNotFoundError):
+        os.remove(staging)
+    try:
+        os.link(path, staging)
+    except OSError:
+        shutil.copyfile(path, staging)
+    os.replace(staging, latest)
+
+
+def snapshots(source: str, directory: str = BACKUP_DIR) -> List[str]:
+    """
+    List a ledger's verified snapshots, oldest first.
+    
+    Args:
+        source: Ledger file.
+        directory: Backup directory.
+    
+    Returns:
+        List[str]: Snapshot paths that have a manifest.
+    """
+    if not os.path.isdir(directory):
+        return []
+    prefix = f"{_stem(source)}-"
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(prefix) and name.endswith(".sqlite")
+        and name[len(prefix):-len(".sqlite")].replace("T", "").isdigit()
+    )
+    paths = [os.path.join(directory, name) for name in names]
+    return [path for path in paths if os.path.exists(f"{path}.json")]
+
+
+def _prune(source: str, directory: str, keep: int) -> None:
+    """Delete all but the newest ``keep`` snapshots of a ledger."""
+    for path in snapshots(source, directory)[:-keep or None]:
+        for name in (path, f"{path}.json"):
+            with suppress(FileNotFoundError):
+                os.remove(name)
+
+
+def verify(path: str) -> dict:
+    """
+    Re-check a snapshot against its manifest.
+    
+    Args:
+        path: Snapshot file.
+    
+    Returns:
+        dict: path, ok, and problems (list of mismatches).
+    """
+    problems = []
+    try:
+        with open(f"{path}.json") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        return {"path": path, "ok": False, "problems": [f"manifest: {e}"]}
+    if _file_digest(path) != manifest["sha256"]:
+        problems.append("sha256 differs")
+    result, counts = _inspect(path)
+    if result != "ok":
+        problems.append(f"integrity_check: {result}")
+    if counts != manifest["tables"]:
+        problems.append("row counts differ")
+    return {"path": path, "ok": not problems, "problems": problems}
+
+
+def ledger_sources() -> List[str]:
+    """
+    List the ledger files this server writes.
+    
+    Returns:
+        List[str]: The application database, or every tenant's.
+    """
+    sources = []
+    for factory in tenants.session_factories():
+        bind = factory.kw["bind"]
+        if not is_memory_database(bind):
+            sources.append(bind.url.database)
+    return sources
+
+
+def backup_once(directory: str = BACKUP_DIR) -> List[dict]:
+    """
+    Back up every ledger unless another process is already doing so.
+    
+    Args:
+        directory: Backup directory.
+    
+    Returns:
+        List[dict]: Manifests of the snapshots taken.
+    """
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - Windows has no flock
+        fcntl = None  # type: ignore[assignment]
+    
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return []
+        manifests = []
+        for source in ledger_sources():
+            existing = snapshots(source, directory)
+            # Every worker runs the loop; skip ledgers another one just did.
+            if existing and BACKUP_INTERVAL_SECONDS > 0 and \
+                    time.time() - os.path.getmtime(existing[-1]) < BACKUP_INTERVAL_SECONDS / 2:
+                continue
+            try:
+                manifests.append(backup(source, directory))
+            except (OSError, sqlite3.Error, RuntimeError):
+                logger.exception("Backup of %s failed", source)
+        return manifests
+
+
+async def run_forever(interval: float = BACKUP_INTERVAL_SECONDS) -> None:
+    """
+    Back up now and then every interval seconds.
+    
+    Args:
+        interval: Seconds between backups.
+    """
+    while True:
+        try:
+            taken = await asyncio.to_thread(backup_once)
+            for manifest in taken:
+                logger.info("Backed up %s in %.3fs", manifest["path"], manifest["seconds"])
+        except Exception:
+            logger.exception("Scheduled backup failed")
+        await asyncio.sleep(interval)
+
+
+def start_background() -> Optional[asyncio.Task]:
+    """
+    Start background backups unless they are disabled.
+    
+    Returns:
+        Optional[asyncio.Task]: Running task, or None if disabled.
+    """
+    if BACKUP_INTERVAL_SECONDS <= 0:
+        return None
+    return asyncio.create_task(run_forever(BACKUP_INTERVAL_SECONDS))
+
+
+# Read-only reporting snapshots
+
+_snapshot_engines: Dict[str, Tuple[int, sessionmaker]] = {}
+_snapshot_lock = threading.Lock()
+
+
+def snapshot_sessionmaker(source: str, directory: str = BACKUP_DIR) -> Optional[sessionmaker]:
+    """
+    Get a read-only session factory on a ledger's latest snapshot.
+    
+    The engine is replaced when a newer snapshot is published, so reads
+    move to it on their next session.
+    
+    Args:
+        source: Ledger file.
+        directory: Backup directory.
+    
+    Returns:
+        Optional[sessionmaker]: Factory, or None if there is no snapshot.
+    """
+    latest = os.path.abspath(latest_path(source, directory))
+    try:
+        inode = os.stat(latest).st_ino
+    except FileNotFoundError:
+        return None
+    stale = None
+    with _snapshot_lock:
+        current = _snapshot_engines.get(latest)
+        if current is not None and current[0] == inode:
+            return current[1]
+        engine = create_engine(
+            f"sqlite:///file:{latest}?mode=ro&uri=true",
+            connect_args={"check_same_thread": False}
+        )
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _snapshot_engines[latest] = (inode, factory)
+        if current is not None:
+            stale = current[1].kw["bind"]
+    if stale is not None:
+        stale.dispose()
+    return factory
+
+
+def get_report_db(db: Session = Depends(get_db)) -> Generator:
+    """
+    Dependency for heavy read-only reports.
+    
+    Yields a session on the latest snapshot of the request's ledger when
+    ``LEDGER_REPORT_SNAPSHOT`` is on and a snapshot exists, so long scans
+    never compete with writers; otherwise the request's own session.
+    Snapshot data is as old as the last backup.
+    
+    Yields:
+        Session: Database session.
+    """
+    path = database_path(session_engine(db))
+    factory = None
+    if REPORT_SNAPSHOT and path:
+        factory = snapshot_sessionmaker(path)
+    if factory is None:
+        yield db
+        return
+    snapshot = factory()
+    try:
+        yield snapshot
+    finally:
+        snapshot.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Back up live ledgers")
+    parser.add_argument("--dir", default=BACKUP_DIR, help="backup directory")
+    parser.add_argument("--list", action="store_true", help="list verified snapshots")
+    parser.add_argument("--verify", metavar="PATH", help="re-check a snapshot")
+    args = parser.parse_args(argv)
+    
+    if args.verify:
+        result = verify(args.verify)
+        print("ok" if result["ok"] else "; ".join(result["problems"]))
+        return 0 if result["ok"] else 1
+    if args.list:
+        for source in ledger_sources():
+            for path in snapshots(source, args.dir):
+                print(path)
+        return 0
+    
+    for source in ledger_sources():
+        manifest = backup(source, args.dir)
+        print(f"{manifest['path']}: {manifest['bytes']} bytes in {manifest['steps']} steps, "
+              f"{manifest['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+In-process caching utilities.
+
+Provides a small thread-safe LRU cache with optional expiry and hit/miss
+counters, used to keep rarely changing rows (children, workbooks) off
+the common request path, and single-flight coalescing of identical
+concurrent reads.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache.
+    
+    Attributes:
+        maxsize: Maximum number of entries kept.
+        ttl: Seconds an entry stays valid, or None for no expiry.
+        hits: Number of lookups served from the cache.
+        misses: Number of lookups that found nothing.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Create an empty cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept.
+            ttl: Seconds an entry stays valid, or None for no expiry.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+        
+        Args:
+            key: Cache key.
+            
+        Returns:
+            Optional[Any]: Cached value, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+        
+        Args:
+            key: Cache key.
+            value: Value to cache; None values are not stored.
+        """
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drop a single entry if present.
+        
+        Args:
+            key: Cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness.
+        
+        Returns:
+            dict: Hits, misses, hit ratio and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """
+    Share one computation among concurrent identical requests.
+    
+    The first caller for a key starts the computation; callers arriving
+    while it runs wait for the same result instead of repeating it. With
+    a TTL the result is also reused for that long after it completes.
+    Used from the event loop; a caller that is cancelled does not cancel
+    the computation the others are waiting on.
+    
+    Attributes:
+        ttl: Seconds a completed result is reused, 0 for none.
+        computed: Number of computations started.
+        joined: Number of callers that waited on another's computation.
+        reused: Number of callers served a completed result within the TTL.
+    """
+    
+    def __init__(self, ttl: float = 0.0, maxsize: int = 256):
+        """
+        Create a coalescer.
+        
+        Args:
+            ttl: Seconds a completed result is reused, 0 for none.
+            maxsize: Completed results kept for reuse.
+        """
+        self.ttl = ttl
+        self.computed = 0
+        self.joined = 0
+        self.reused = 0
+        self._results = LRUCache(maxsize=maxsize, ttl=ttl) if ttl > 0 else None
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+    
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get the result for a key, computing it at most once at a time.
+        
+        Args:
+            key: Identifies requests that share a result.
+            compute: Coroutine function producing the result.
+        
+        Returns:
+            Any: The shared result; callers must not modify it.
+        
+        Raises:
+            Exception: Whatever the computation raised, for every caller
+                that waited on it.
+        """
+        if self._results is not None:
+            cached = self._results.get(key)
+            if cached is not None:
+                self.reused += 1
+                return cached
+        
+        flight = self._flights.get(key)
+        if flight is None:
+            self.computed += 1
+            flight = asyncio.ensure_future(compute())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._land(key, done))
+        else:
+            self.joined += 1
+        return await asyncio.shield(flight)
+    
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        """Forget a finished computation, keeping its result for the TTL."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if self._results is not None and not flight.cancelled() and flight.exception() is None:
+            self._results.put(key, flight.result())
+    
+    def stats(self) -> dict:
+        """
+        Report how many requests shared a computation.
+        
+        Returns:
+            dict: Computations, joined and reused callers, and the
+                computations currently running.
+        """
+        return {
+            "computed": self.computed,
+            "joined": self.joined,
+            "reused": self.reused,
+            "in_flight": len(self._flights),
+            "ttl": self.ttl
+        }
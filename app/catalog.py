@@ -0,0 +1,156 @@
+"""
+Workbook catalog autocomplete and progress.
+
+Suggests workbooks for a partially typed title using indexes only:
+queries of one or two characters use the case-insensitive name index
+for a prefix range scan, longer queries use the Workbooks_fts trigram
+index for substring matches. Both read at most ``SCAN_LIMIT`` candidate
+rows, so the cost stays flat however large the catalog grows.
+
+Progress reports group completions by the grade and subject facets in
+the WorkbookFacets table (see app/models.py).
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Default and maximum number of suggestions returned
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+
+# Upper bound on candidate rows read per query
+SCAN_LIMIT = 500
+
+# Trigram matching needs at least three characters
+TRIGRAM_MIN_LENGTH = 3
+
+
+def _not_completed(alias: str) -> str:
+    """SQL filter excluding workbooks the child has already completed."""
+    return f"""NOT EXISTS (
+        SELECT 1 FROM Members
+        WHERE Members.children_id = :child_id AND Members.workbooks_id = {alias}
+    )"""
+
+
+def suggest_workbooks(
+    db: Session,
+    query: str,
+    child_id: Optional[int] = None,
+    limit: int = DEFAULT_SUGGESTIONS
+) -> List[dict]:
+    """
+    Suggest workbooks whose titles match partially typed text.
+    
+    Titles starting with the query rank before titles that only contain
+    it; shorter titles rank first within each group.
+    
+    Args:
+        db: Database session.
+        query: Text typed so far.
+        child_id: Skip workbooks this child has already completed.
+        limit: Maximum number of suggestions (capped at MAX_SUGGESTIONS).
+    
+    Returns:
+        List[dict]: Suggested workbooks with id and name.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    
+    params = {
+        "child_id": child_id,
+        "limit": max(1, min(limit, MAX_SUGGESTIONS)),
+        "scan": SCAN_LIMIT,
+        "prefix": query
+    }
+    
+    if len(query) < TRIGRAM_MIN_LENGTH:
+        # Range scan over the NOCASE index: 'ab' <= name < 'ab' + U+FFFF
+        params["upper"] = query + "\uffff"
+        candidates = """
+            SELECT id, name FROM Workbooks
+            WHERE name COLLATE NOCASE >= :prefix AND name COLLATE NOCASE < :upper
+            ORDER BY name COLLATE NOCASE
+            LIMIT :scan
+        """
+    else:
+        # Quote the query as one FTS5 string so it matches as a substring.
+        params["match"] = '"' + query.replace('"', '""') + '"'
+        candidates = """
+            SELECT Workbooks.id, Workbooks.name FROM Workbooks_fts
+            JOIN Workbooks ON Workbooks.id = Workbooks_fts.rowid
+            WHERE Workbooks_fts MATCH :match
+            LIMIT :scan
+        """
+    
+    child_filter = f"WHERE {_not_completed('candidates.id')}" if child_id is not None else ""
+    rows = db.execute(
+        text(f"""
+            SELECT candidates.id, candidates.name
+            FROM ({candidates}) AS candidates
+            {child_filter}
+            ORDER BY candidates.name LIKE :prefix || '%' DESC,
+                     length(candidates.name),
+                     candidates.name
+            LIMIT :limit
+        """),
+        params
+    )
+    return [dict(row) for row in rows.mappings()]
+
+
+def has_workbooks(db: Session) -> bool:
+    """
+    Check whether the catalog contains any workbook.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        bool: True if at least one workbook exists.
+    """
+    return db.execute(text("SELECT 1 FROM Workbooks LIMIT 1")).first() is not None
+
+
+# A child's (:child_id) completed and total titles per grade and subject
+PROGRESS_QUERY = """
+    SELECT grade, subject, SUM(completed) AS completed, SUM(total) AS total
+    FROM (
+        SELECT grade, subject, 0 AS completed, COUNT(*) AS total
+        FROM WorkbookFacets
+        GROUP BY grade, subject
+        UNION ALL
+        SELECT f.grade, f.subject, COUNT(*), 0
+        FROM Members AS m
+        JOIN WorkbookFacets AS f ON f.workbook_id = m.workbooks_id
+        WHERE m.children_id = :child_id
+        GROUP BY f.grade, f.subject
+    )
+    GROUP BY grade, subject
+"""
+
+
+def child_progress(db: Session, child_id: int) -> List[dict]:
+    """
+    Report a child's completions against the catalog by grade and subject.
+    
+    One statement: catalog totals come from a scan of the covering facet
+    index (no per-workbook lookups), and the child's completions from
+    their Members rows joined to the facets; the two are merged by facet.
+    
+    Args:
+        db: Database session.
+        child_id: Child ID.
+    
+    Returns:
+        List[dict]: grade, subject, completed and total per facet, by grade
+            then subject; titles without a grade come last with both None.
+    """
+    rows = db.execute(
+        text(f"{PROGRESS_QUERY} ORDER BY grade IS NULL, grade, subject"),
+        {"child_id": child_id}
+    )
+    return [dict(row) for row in rows.mappings()]
@@ -0,0 +1,352 @@
+"""
+Headless command line for scripted postings.
+
+Every subcommand writes JSON to stdout, so nightly jobs can post
+allowances or import completions without driving the interactive
+project.py menus. Children and workbooks may be named by ID or by name.
+
+``batch`` reads one JSON command per line from stdin. Commands are
+validated as they arrive and applied ``CHUNK_SIZE`` at a time, each chunk
+in a single transaction, and one JSON result line is written per command
+followed by a summary. A command that fails validation is reported and
+skipped without affecting the rest of its chunk.
+
+Usage:
+    python -m app.cli add-transaction --child River --date 2025-01-31 --description Allowance --amount 5
+    python -m app.cli complete-workbook --child 1 --workbook "Grade 3 Reading" --date 2025-02-01
+    python -m app.cli balance [--child River]
+    python -m app.cli export [--child River] > transactions.ndjson
+    python -m app.cli batch < postings.ndjson
+
+Batch commands:
+    {"op": "add-transaction", "child": "River", "date": "2025-01-31", "description": "Allowance", "amount": 5}
+    {"op": "complete-workbook", "child": 1, "workbook": 12, "date": "2025-02-01"}
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import crud, schemas, tenants
+
+# Commands applied per transaction in batch mode
+CHUNK_SIZE = 500
+
+# Rows fetched at a time by export
+EXPORT_BATCH = 1000
+
+OPS = ("add-transaction", "complete-workbook")
+
+Command = Union[schemas.TransactionCreate, schemas.CompletedWorkbookCreate]
+
+
+class Resolver:
+    """
+    Resolve child and workbook references to IDs.
+    
+    Integers are checked through the crud lookup caches; names are looked
+    up once and remembered for the rest of the run.
+    """
+    
+    def __init__(self, db: Session):
+        """
+        Create a resolver for one session.
+        
+        Args:
+            db: Database session.
+        """
+        self.db = db
+        self._names: Dict[Tuple[str, str], int] = {}
+    
+    def child(self, reference: Union[int, str]) -> int:
+        """
+        Resolve a child ID or name.
+        
+        Raises:
+            LookupError: If no such child exists.
+        """
+        if isinstance(reference, int) or str(reference).isdigit():
+            if crud.lookup_child(self.db, int(reference)) is None:
+                raise LookupError(f"Unknown child: {reference}")
+            return int(reference)
+        return self._by_name("Children", "child", reference)
+    
+    def workbook(self, reference: Union[int, str]) -> int:
+        """
+        Resolve a workbook ID or name.
+        
+        Raises:
+            LookupError: If no such workbook exists.
+        """
+        if isinstance(reference, int) or str(reference).isdigit():
+            if crud.lookup_workbook(self.db, int(reference)) is None:
+                raise LookupError(f"Unknown workbook: {reference}")
+            return int(reference)
+        return self._by_name("Workbooks", "workbook", reference)
+    
+    def _by_name(self, table: str, kind: str, name: str) -> int:
+        """Look up an ID by exact name."""
+        key = (table, name)
+        if key not in self._names:
+            found = self.db.execute(
+                text(f"SELECT id FROM {table} WHERE name = :name ORDER BY id LIMIT 1"), {"name": name}
+            ).scalar()
+            if found is None:
+                raise LookupError(f"Unknown {kind}: {name}")
+            self._names[key] = found
+        return self._names[key]
+
+
+def parse_command(payload: dict, resolver: Resolver) -> Command:
+    """
+    Validate one batch command.
+    
+    Args:
+        payload: Decoded JSON command.
+        resolver: Resolver for child and workbook references.
+    
+    Returns:
+        Command: TransactionCreate or CompletedWorkbookCreate.
+    
+    Raises:
+        ValueError: If the command is malformed (ValidationError included).
+        LookupError: If it names an unknown child or workbook.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Command must be a JSON object")
+    op = payload.get("op")
+    if op not in OPS:
+        raise ValueError(f"Unknown op: {op!r}")
+    if "child" not in payload:
+        raise ValueError("Missing field: child")
+    child_id = resolver.child(payload["child"])
+    if op == "add-transaction":
+        return schemas.TransactionCreate.model_validate({
+            "children_id": child_id,
+            "date": payload.get("date"),
+            "description": payload.get("description"),
+            "amount": payload.get("amount")
+        })
+    if "workbook" not in payload:
+        raise ValueError("Missing field: workbook")
+    return schemas.CompletedWorkbookCreate.model_validate({
+        "children_id": child_id,
+        "workbooks_id": resolver.workbook(payload["workbook"]),
+        "date": payload.get("date")
+    })
+
+
+def _error(e: Exception) -> str:
+    """Describe a rejected command in one line."""
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+    return str(e)
+
+
+def _result(command: Command, outcome: Union[int, bool]) -> dict:
+    """Describe an applied command."""
+    if isinstance(command, schemas.TransactionCreate):
+        return {"ok": True, "op": "add-transaction", "id": outcome}
+    return {"ok": True, "op": "complete-workbook", "recorded": outcome}
+
+
+def run_batch(db: Session, lines: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Apply NDJSON commands in chunked transactions.
+    
+    Args:
+        db: Database session.
+        lines: Input lines; blank lines are ignored.
+        chunk_size: Commands per transaction.
+    
+    Yields:
+        dict: One result per command in input order ({"line", "ok", ...}
+            with "error" on failure), then {"summary": {...}} with
+            applied, failed, seconds and ops_per_second.
+    """
+    started = time.perf_counter()
+    resolver = Resolver(db)
+    # (line, command or None, error or None) in input order
+    pending: List[Tuple[int, Optional[Command], Optional[str]]] = []
+    commands = 0
+    counts = {"applied": 0, "failed": 0}
+    
+    def flush() -> Iterator[dict]:
+        batch = [command for _, command, _ in pending if command is not None]
+        try:
+            outcomes = iter(crud.apply_batch(db, batch) if batch else [])
+            failure = None
+        except SQLAlchemyError as e:
+            db.rollback()
+            failure = str(getattr(e, "orig", None) or e)
+        for number, command, error in pending:
+            if command is not None and failure is None:
+                counts["applied"] += 1
+                yield {"line": number, **_result(command, next(outcomes))}
+            else:
+                counts["failed"] += 1
+                yield {"line": number, "ok": False, "error": error or failure}
+        pending.clear()
+    
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            pending.append((number, parse_command(json.loads(line), resolver), None))
+            commands += 1
+        except (ValueError, LookupError) as e:
+            pending.append((number, None, _error(e)))
+        if commands >= chunk_size:
+            yield from flush()
+            commands = 0
+    yield from flush()
+    
+    seconds = time.perf_counter() - started
+    total = counts["applied"] + counts["failed"]
+    yield {"summary": {
+        **counts,
+        "seconds": round(seconds, 3),
+        "ops_per_second": round(total / seconds) if seconds else None
+    }}
+
+
+def balances(db: Session, child_id: Optional[int] = None) -> List[dict]:
+    """
+    Get balances from the trigger-maintained totals.
+    
+    Args:
+        db: Database session.
+        child_id: Only this child; every child if None.
+    
+    Returns:
+        List[dict]: child_id, name and balance per child.
+    """
+    where = "WHERE c.id = :child_id" if child_id is not None else ""
+    rows = db.execute(text(f"""
+        SELECT c.id AS child_id, c.name, round(COALESCE(t.balance, 0), 2) AS balance
+        FROM Children AS c LEFT JOIN LeaderboardTotals AS t ON t.children_id = c.id
+        {where} ORDER BY c.id
+    """), {"child_id": child_id})
+    return [dict(row) for row in rows.mappings()]
+
+
+def export(db: Session, child_id: Optional[int] = None) -> Iterator[dict]:
+    """
+    Stream transactions in ID order.
+    
+    Args:
+        db: Database session.
+        child_id: Only this child; every child if None.
+    
+    Yields:
+        dict: id, children_id, date, description and amount.
+    """
+    where = "WHERE children_id = :child_id" if child_id is not None else ""
+    result = db.execute(
+        text(f"SELECT id, children_id, date, description, amount FROM Account {where} ORDER BY id"),
+        {"child_id": child_id},
+        execution_options={"yield_per": EXPORT_BATCH}
+    )
+    for row in result.mappings():
+        yield dict(row)
+
+
+def _write(out: TextIO, item: dict) -> None:
+    """Write one JSON line."""
+    out.write(json.dumps(item))
+    out.write("\n")
+
+
+def main(
+    argv: Optional[Sequence[str]] = None,
+    stdin: Optional[TextIO] = None,
+    stdout: Optional[TextIO] = None
+) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+        stdin: Batch input, defaults to sys.stdin.
+        stdout: JSON output, defaults to sys.stdout.
+    
+    Returns:
+        int: Process exit code; 1 if any command failed.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    parser = argparse.ArgumentParser(description="Headless ledger commands with JSON output")
+    parser.add_argument("--tenant", help="household database (see app.tenants)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    add = commands.add_parser("add-transaction", help="post one transaction")
+    add.add_argument("--child", required=True, help="child ID or name")
+    add.add_argument("--date", required=True, help="YYYY-MM-DD")
+    add.add_argument("--description", required=True)
+    add.add_argument("--amount", required=True, type=float)
+    
+    complete = commands.add_parser("complete-workbook", help="record a completed workbook")
+    complete.add_argument("--child", required=True, help="child ID or name")
+    complete.add_argument("--workbook", required=True, help="workbook ID or name")
+    complete.add_argument("--date", required=True, help="YYYY-MM-DD")
+    
+    balance = commands.add_parser("balance", help="print balances")
+    balance.add_argument("--child", help="child ID or name, defaults to every child")
+    
+    export_parser = commands.add_parser("export", help="print transactions as JSON lines")
+    export_parser.add_argument("--child", help="child ID or name, defaults to every child")
+    
+    batch = commands.add_parser("batch", help="apply JSON-line commands from stdin")
+    batch.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="commands per transaction")
+    batch.add_argument("--errors-only", action="store_true", help="only print failed commands and the summary")
+    args = parser.parse_args(argv)
+    
+    try:
+        factory = tenants.command_sessionmaker(args.tenant)
+    except (LookupError, ValueError) as e:
+        _write(stdout, {"ok": False, "error": str(e)})
+        return 2
+    db = factory()
+    try:
+        resolver = Resolver(db)
+        if args.command == "batch":
+            failed = False
+            for item in run_batch(db, stdin, max(1, args.chunk_size)):
+                failed = failed or item.get("ok") is False
+                if not args.errors_only or not item.get("ok", False):
+                    _write(stdout, item)
+            return 1 if failed else 0
+        
+        child_id = resolver.child(args.child) if getattr(args, "child", None) is not None else None
+        if args.command == "balance":
+            for item in balances(db, child_id):
+                _write(stdout, item)
+        elif args.command == "export":
+            for item in export(db, child_id):
+                _write(stdout, item)
+        else:
+            payload = {"op": args.command, "child": child_id, "date": args.date}
+            if args.command == "add-transaction":
+                payload.update(description=args.description, amount=args.amount)
+            else:
+                payload["workbook"] = args.workbook
+            command = parse_command(payload, resolver)
+            outcome = crud.apply_batch(db, [command])[0]
+            _write(stdout, {**_result(command, outcome), **command.model_dump()})
+        return 0
+    except (ValueError, LookupError) as e:
+        _write(stdout, {"ok": False, "error": _error(e)})
+        return 2
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
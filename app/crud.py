@@ -5,10 +5,262 @@ This module provides database operations for all models,
 abstracting the database queries from the API endpoints.
 """
 
+import json
+import os
+import threading
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from app import models, schemas
+from sqlalchemy import event, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import CursorResult
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union, cast
+from app import archive, catalog, metrics, models, schemas
+from app.cache import LRUCache
+from app.database import serialized_write, session_engine
+from app.events import broker
+
+
+# Lookup caches
+#
+# Children and workbooks are never renamed or deleted, so positive
+# lookups stay valid; creating one invalidates its entries. Keys are
+# scoped by database URL so several databases never share entries.
+
+class ChildRef(NamedTuple):
+    """Cached, session-independent view of a child."""
+    id: int
+    name: str
+
+
+class WorkbookRef(NamedTuple):
+    """Cached, session-independent view of a workbook."""
+    id: int
+    name: str
+
+
+child_cache = LRUCache(maxsize=int(os.environ.get("LEDGER_CHILD_CACHE_SIZE", "4096")))
+workbook_cache = LRUCache(maxsize=int(os.environ.get("LEDGER_WORKBOOK_CACHE_SIZE", "4096")))
+# The full catalog can be extended by other worker processes, so it expires.
+catalog_cache = LRUCache(
+    maxsize=64,
+    ttl=float(os.environ.get("LEDGER_CATALOG_CACHE_TTL", "30"))
+)
+
+metrics.register("cache.children", child_cache.stats)
+metrics.register("cache.workbooks", workbook_cache.stats)
+metrics.register("cache.catalog", catalog_cache.stats)
+
+
+# Read rows
+#
+# Pages and the API only read history, so it is selected with Core and
+# returned as plain tuples: no ORM identity map, change tracking or
+# per-row dict.
+
+class TransactionRow(NamedTuple):
+    """A transaction and the child's balance after it."""
+    id: int
+    children_id: int
+    date: str
+    description: str
+    amount: float
+    cumulative: float
+
+
+class CompletionRow(NamedTuple):
+    """A completed workbook with child and workbook names."""
+    children_id: int
+    workbooks_id: int
+    completed: int
+    date: str
+    child_name: str
+    workbook_name: str
+
+
+class ChildBalance(NamedTuple):
+    """A child and their current balance."""
+    id: int
+    name: str
+    balance: float
+
+
+class Dashboard(NamedTuple):
+    """Everything the child dashboard shows."""
+    child: ChildRef
+    balance: float
+    transaction_count: int
+    transactions: List[TransactionRow]
+    page: int
+    pages: int
+    completions: List[CompletionRow]
+    progress: List[dict]
+    archived_years: List[int]
+
+
+# Transactions per dashboard page, newest page first
+DASHBOARD_PAGE_SIZE = int(os.environ.get("LEDGER_DASHBOARD_PAGE_SIZE", "100"))
+
+# Every dashboard section in one statement, as (section, seq, id, date,
+# label, amount, value) rows ordered by section and then seq.
+DASHBOARD_QUERY = f"""
+    WITH history AS (
+        SELECT id, date, description, amount,
+               SUM(amount) OVER (ORDER BY date, id) AS cumulative,
+               ROW_NUMBER() OVER (ORDER BY date DESC, id DESC) AS recent
+        FROM Account
+        WHERE children_id = :child_id
+    )
+    SELECT 0 AS section, 0 AS seq, id, NULL AS date, name AS label, NULL AS amount, NULL AS value
+    FROM Children WHERE id = :child_id
+    UNION ALL
+    SELECT 1, 0, COUNT(*), NULL, NULL, COALESCE((SELECT cumulative FROM history WHERE recent = 1), 0.0), NULL
+    FROM history
+    UNION ALL
+    SELECT 2, -recent, id, date, description, amount, cumulative
+    FROM history WHERE recent > :offset AND recent <= :offset + :limit
+    UNION ALL
+    SELECT 3, ROW_NUMBER() OVER (ORDER BY m.date, m.workbooks_id), m.workbooks_id, m.date, w.name, m.completed, NULL
+    FROM Members AS m JOIN Workbooks AS w ON w.id = m.workbooks_id
+    WHERE m.children_id = :child_id
+    UNION ALL
+    SELECT 4, ROW_NUMBER() OVER (ORDER BY grade IS NULL, grade, subject), grade, NULL, subject, completed, total
+    FROM ({catalog.PROGRESS_QUERY})
+    UNION ALL
+    SELECT 5, year, year, NULL, NULL, NULL, NULL FROM ArchiveManifest
+    ORDER BY section, seq
+"""
+
+
+# Batch inserts, prepared once per connection by the sqlite3 statement cache
+BATCH_TRANSACTION_INSERT = text(
+    "INSERT INTO Account (children_id, date, description, amount) "
+    "VALUES (:children_id, :date, :description, :amount)"
+)
+BATCH_COMPLETION_INSERT = text(
+    "INSERT INTO Members (children_id, workbooks_id, completed, date) "
+    "VALUES (:children_id, :workbooks_id, 1, :date) "
+    "ON CONFLICT (children_id, workbooks_id) DO NOTHING"
+)
+
+
+def _cache_scope(db: Session) -> str:
+    """Return the cache namespace for a session's database."""
+    return str(session_engine(db).url)
+
+
+def clear_caches() -> None:
+    """Drop every cached child and workbook lookup."""
+    child_cache.clear()
+    workbook_cache.clear()
+    catalog_cache.clear()
+
+
+# Write generations
+#
+# Bumped for a database whenever a session on it commits. Shared read
+# results are keyed by the generation, so a read that starts after a
+# write in this process never reuses a result computed before it.
+
+_generations: Dict[str, int] = {}
+# Commits arrive from threadpool threads; two must never share a generation
+_generations_lock = threading.Lock()
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_generation(session: Session) -> None:
+    if session.bind is not None:
+        scope = str(session_engine(session).url)
+        with _generations_lock:
+            _generations[scope] = _generations.get(scope, 0) + 1
+
+
+def read_version(db: Session) -> Tuple[str, int]:
+    """
+    Identify the state of a session's database as seen by this process.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        Tuple[str, int]: Database scope and write generation, which
+            increases with every commit in this process.
+    """
+    scope = _cache_scope(db)
+    return scope, _generations.get(scope, 0)
+
+
+# Change events
+#
+# Published after commit, and only for children someone is watching, so
+# writes pay nothing extra when no dashboard is open.
+
+def _current_balance(db: Session, child_id: int) -> float:
+    """Read a child's balance from the trigger-maintained totals."""
+    balance = db.execute(
+        text("SELECT balance FROM LeaderboardTotals WHERE children_id = :id"),
+        {"id": child_id}
+    ).scalar()
+    return round(balance or 0.0, 2)
+
+
+def _publish_transactions(db: Session, transactions: Sequence[Sequence[Any]]) -> None:
+    """Publish (id, children_id, date, description, amount) rows to watchers."""
+    scope = _cache_scope(db)
+    for transaction_id, child_id, date, description, amount in transactions:
+        broker.publish(child_id, {
+            "type": "transaction",
+            "child_id": child_id,
+            "transaction": {
+                "id": transaction_id,
+                "date": date,
+                "description": description,
+                "amount": amount
+            },
+            "balance": _current_balance(db, child_id)
+        }, scope=scope)
+
+
+def publish_new_transactions(
+    db: Session,
+    last_id: int,
+    child_ids: Optional[Sequence[int]] = None
+) -> None:
+    """
+    Publish committed Account rows above an ID to the children being watched.
+    
+    For bulk postings that insert with INSERT ... SELECT and so never see
+    the new rows: read the highest Account ID before inserting, commit,
+    then call this.
+    
+    Args:
+        db: Database session.
+        last_id: Highest Account ID before the posting.
+        child_ids: Children the posting could have reached; all if None.
+    """
+    watched = broker.subscribed_children(child_ids, scope=_cache_scope(db))
+    if watched:
+        rows = db.execute(text(
+            "SELECT id, children_id, date, description, amount FROM Account "
+            "WHERE id > :last_id AND children_id IN (SELECT value FROM json_each(:watched))"
+        ), {"last_id": last_id, "watched": json.dumps(sorted(watched))}).all()
+        _publish_transactions(db, rows)
+
+
+def _publish_completion(db: Session, completed: schemas.CompletedWorkbookCreate) -> None:
+    """Publish a recorded completion to watchers."""
+    scope = _cache_scope(db)
+    if not broker.has_subscribers(completed.children_id, scope=scope):
+        return
+    workbook = lookup_workbook(db, completed.workbooks_id)
+    broker.publish(completed.children_id, {
+        "type": "completion",
+        "child_id": completed.children_id,
+        "workbook": {
+            "id": completed.workbooks_id,
+            "name": workbook.name if workbook else None
+        },
+        "date": completed.date
+    }, scope=scope)
 
 
 # Children CRUD operations
@@ -26,6 +278,29 @@ def get_children(db: Session) -> List[models.Child]:
     return db.query(models.Child).all()
 
 
+def get_children_with_balances(db: Session) -> List[ChildBalance]:
+    """
+    Get every child with their current balance in one query.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[ChildBalance]: Children in ID order.
+    """
+    rows = db.execute(
+        select(
+            models.Child.id,
+            models.Child.name,
+            func.coalesce(func.sum(models.Account.amount), 0.0)
+        )
+        .outerjoin(models.Account, models.Account.children_id == models.Child.id)
+        .group_by(models.Child.id)
+        .order_by(models.Child.id)
+    )
+    return [ChildBalance(*row) for row in rows]
+
+
 def get_child(db: Session, child_id: int) -> Optional[models.Child]:
     """
     Get a specific child by ID.
@@ -54,6 +329,31 @@ def get_child_by_name(db: Session, name: str) -> Optional[models.Child]:
     return db.query(models.Child).filter(models.Child.name == name).first()
 
 
+def lookup_child(db: Session, child_id: int) -> Optional[ChildRef]:
+    """
+    Get a child's ID and name, served from the lookup cache when possible.
+    
+    Args:
+        db: Database session.
+        child_id: Child ID to retrieve.
+        
+    Returns:
+        Optional[ChildRef]: Child if found, None otherwise.
+    """
+    key = (_cache_scope(db), child_id)
+    cached = child_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    child = get_child(db, child_id)
+    if child is None:
+        return None
+    ref = ChildRef(id=child.id, name=child.name)
+    child_cache.put(key, ref)
+    return ref
+
+
+@serialized_write
 def create_child(db: Session, child: schemas.ChildCreate) -> models.Child:
     """
     Create a new child.
@@ -69,6 +369,7 @@ def create_child(db: Session, child: schemas.ChildCreate) -> models.Child:
     db.add(db_child)
     db.commit()
     db.refresh(db_child)
+    child_cache.invalidate((_cache_scope(db), db_child.id))
     return db_child
 
 
@@ -118,6 +419,56 @@ def get_workbook(db: Session, workbook_id: int) -> Optional[models.Workbook]:
     return db.query(models.Workbook).filter(models.Workbook.id == workbook_id).first()
 
 
+def lookup_workbook(db: Session, workbook_id: int) -> Optional[WorkbookRef]:
+    """
+    Get a workbook's ID and name, served from the lookup cache when possible.
+    
+    Args:
+        db: Database session.
+        workbook_id: Workbook ID to retrieve.
+        
+    Returns:
+        Optional[WorkbookRef]: Workbook if found, None otherwise.
+    """
+    key = (_cache_scope(db), workbook_id)
+    cached = workbook_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    workbook = get_workbook(db, workbook_id)
+    if workbook is None:
+        return None
+    ref = WorkbookRef(id=workbook.id, name=workbook.name)
+    workbook_cache.put(key, ref)
+    return ref
+
+
+def lookup_workbooks(db: Session) -> List[WorkbookRef]:
+    """
+    Get the workbook catalog, served from the lookup cache when possible.
+    
+    Args:
+        db: Database session.
+        
+    Returns:
+        List[WorkbookRef]: All workbooks in ID order.
+    """
+    key = _cache_scope(db)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    catalog = [
+        WorkbookRef(id=workbook_id, name=name)
+        for workbook_id, name in db.query(
+            models.Workbook.id, models.Workbook.name
+        ).order_by(models.Workbook.id)
+    ]
+    catalog_cache.put(key, catalog)
+    return catalog
+
+
+@serialized_write
 def create_workbook(db: Session, workbook: schemas.WorkbookCreate) -> models.Workbook:
     """
     Create a new workbook.
@@ -133,27 +484,52 @@ def create_workbook(db: Session, workbook: schemas.WorkbookCreate) -> models.Wor
     db.add(db_workbook)
     db.commit()
     db.refresh(db_workbook)
+    scope = _cache_scope(db)
+    workbook_cache.invalidate((scope, db_workbook.id))
+    catalog_cache.invalidate(scope)
     return db_workbook
 
 
 # Transaction CRUD operations
 
-def get_child_transactions(db: Session, child_id: int) -> List[models.Account]:
+def get_child_transactions(
+    db: Session,
+    child_id: int,
+    include_archived: bool = False
+) -> List[TransactionRow]:
     """
     Get all transactions for a specific child.
     
+    The running balance is computed by the query as a window sum.
+    
     Args:
         db: Database session.
         child_id: Child ID.
+        include_archived: Include years moved out by app/archive.py in
+            place of their carried-forward opening balances.
         
     Returns:
-        List[models.Account]: List of transactions ordered by date.
+        List[TransactionRow]: Transactions ordered by date.
     """
-    return db.query(models.Account).filter(
-        models.Account.children_id == child_id
-    ).order_by(models.Account.date).all()
-
-
+    if include_archived:
+        rows = archive.transactions(db, child_id)
+    else:
+        account = models.Account.__table__
+        order = (account.c.date, account.c.id)
+        rows = db.execute(
+            select(
+                account.c.id,
+                account.c.children_id,
+                account.c.date,
+                account.c.description,
+                account.c.amount,
+                func.sum(account.c.amount).over(order_by=order)
+            ).where(account.c.children_id == child_id).order_by(*order)
+        ).all()
+    return [TransactionRow(*row) for row in rows]
+
+
+@serialized_write
 def create_transaction(
     db: Session, 
     transaction: schemas.TransactionCreate
@@ -177,12 +553,137 @@ def create_transaction(
     db.add(db_transaction)
     db.commit()
     db.refresh(db_transaction)
+    if broker.has_subscribers(db_transaction.children_id, scope=_cache_scope(db)):
+        _publish_transactions(db, [(
+            db_transaction.id,
+            db_transaction.children_id,
+            db_transaction.date,
+            db_transaction.description,
+            db_transaction.amount
+        )])
     return db_transaction
 
 
+@serialized_write
+def create_fanout_transactions(db: Session, fanout: schemas.TransactionFanout) -> int:
+    """
+    Post one transaction to many children in a single statement.
+    
+    Args:
+        db: Database session.
+        fanout: Transaction data and target children (every child if None).
+    
+    Returns:
+        int: Number of transactions created.
+    """
+    params = {
+        "date": fanout.date,
+        "description": fanout.description,
+        "amount": fanout.amount
+    }
+    where = ""
+    if fanout.children_ids is not None:
+        # One JSON parameter instead of one bound variable per child
+        where = "WHERE id IN (SELECT value FROM json_each(:ids))"
+        params["ids"] = json.dumps(fanout.children_ids)
+    last_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM Account")).scalar_one()
+    result = cast(CursorResult, db.execute(text(f"""
+        INSERT INTO Account (children_id, date, description, amount)
+        SELECT id, :date, :description, :amount FROM Children {where}
+        ORDER BY id
+    """), params))
+    db.commit()
+    
+    publish_new_transactions(db, last_id, fanout.children_ids)
+    return result.rowcount
+
+
+def get_missing_children(db: Session, child_ids: List[int]) -> List[int]:
+    """
+    Find which of the given child IDs do not exist.
+    
+    Args:
+        db: Database session.
+        child_ids: Child IDs to check.
+    
+    Returns:
+        List[int]: Unknown IDs in ascending order.
+    """
+    rows = db.execute(text("""
+        SELECT DISTINCT value FROM json_each(:ids)
+        WHERE value NOT IN (SELECT id FROM Children)
+        ORDER BY value
+    """), {"ids": json.dumps(child_ids)})
+    return [row[0] for row in rows]
+
+
+# Allowance rule CRUD operations
+
+def get_allowance_rules(db: Session) -> List[models.AllowanceRule]:
+    """
+    Get all allowance rules.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[models.AllowanceRule]: Rules ordered by next posting date.
+    """
+    return db.query(models.AllowanceRule).order_by(
+        models.AllowanceRule.next_date, models.AllowanceRule.id
+    ).all()
+
+
+@serialized_write
+def create_allowance_rule(
+    db: Session,
+    rule: schemas.AllowanceRuleCreate
+) -> models.AllowanceRule:
+    """
+    Create a recurring allowance.
+    
+    Args:
+        db: Database session.
+        rule: Rule data; its date is the first posting date.
+    
+    Returns:
+        models.AllowanceRule: Created rule.
+    """
+    db_rule = models.AllowanceRule(
+        children_id=rule.children_id,
+        description=rule.description,
+        amount=rule.amount,
+        frequency=rule.frequency,
+        next_date=rule.date
+    )
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+
+@serialized_write
+def delete_allowance_rule(db: Session, rule_id: int) -> bool:
+    """
+    Delete an allowance rule.
+    
+    Args:
+        db: Database session.
+        rule_id: Rule ID.
+    
+    Returns:
+        bool: True if a rule was deleted, False if it did not exist.
+    """
+    deleted = db.query(models.AllowanceRule).filter(
+        models.AllowanceRule.id == rule_id
+    ).delete()
+    db.commit()
+    return deleted == 1
+
+
 # Completed Workbook CRUD operations
 
-def get_child_completed_workbooks(db: Session, child_id: int) -> List[dict]:
+def get_child_completed_workbooks(db: Session, child_id: int) -> List[CompletionRow]:
     """
     Get all completed workbooks for a child with workbook names.
     
@@ -191,33 +692,99 @@ def get_child_completed_workbooks(db: Session, child_id: int) -> List[dict]:
         child_id: Child ID.
         
     Returns:
-        List[dict]: List of completed workbooks with details.
-    """
-    results = db.query(
-        models.Member,
-        models.Child.name.label('child_name'),
-        models.Workbook.name.label('workbook_name')
-    ).join(
-        models.Child, models.Child.id == models.Member.children_id
-    ).join(
-        models.Workbook, models.Workbook.id == models.Member.workbooks_id
-    ).filter(
-        models.Member.children_id == child_id
-    ).order_by(models.Member.date).all()
-    
-    return [
-        {
-            'children_id': member.children_id,
-            'workbooks_id': member.workbooks_id,
-            'completed': member.completed,
-            'date': member.date,
-            'child_name': child_name,
-            'workbook_name': workbook_name
-        }
-        for member, child_name, workbook_name in results
-    ]
+        List[CompletionRow]: Completed workbooks ordered by date.
+    """
+    member = models.Member.__table__
+    child = models.Child.__table__
+    workbook = models.Workbook.__table__
+    rows = db.execute(
+        select(
+            member.c.children_id,
+            member.c.workbooks_id,
+            member.c.completed,
+            member.c.date,
+            child.c.name,
+            workbook.c.name
+        ).join(
+            child, child.c.id == member.c.children_id
+        ).join(
+            workbook, workbook.c.id == member.c.workbooks_id
+        ).where(
+            member.c.children_id == child_id
+        ).order_by(member.c.date)
+    )
+    return [CompletionRow(*row) for row in rows]
+
+
+def load_dashboard(
+    db: Session,
+    child_id: int,
+    page: int = 1,
+    page_size: int = DASHBOARD_PAGE_SIZE,
+    include_archived: bool = False
+) -> Optional[Dashboard]:
+    """
+    Load a child's dashboard in one database round trip.
+    
+    The child, balance, one page of transactions with running balances,
+    completions, catalog progress and archived years all come from a
+    single statement. Showing archived years reads the archive file with
+    a second statement.
+    
+    Args:
+        db: Database session.
+        child_id: Child ID.
+        page: Transaction page, 1 being the newest.
+        page_size: Transactions per page.
+        include_archived: Page through archived years as well.
+    
+    Returns:
+        Optional[Dashboard]: The dashboard, or None if the child does not
+            exist.
+    """
+    offset = (page - 1) * page_size
+    rows = db.execute(
+        text(DASHBOARD_QUERY),
+        {"child_id": child_id, "offset": offset, "limit": page_size}
+    ).all()
+    if not rows or rows[0].section != 0:
+        return None
+    
+    child = ChildRef(rows[0].id, rows[0].label)
+    transaction_count, balance = 0, 0.0
+    transactions, completions, progress, years = [], [], [], []
+    for section, _, key, date, label, amount, value in rows[1:]:
+        if section == 1:
+            transaction_count, balance = key, amount
+        elif section == 2:
+            transactions.append(TransactionRow(key, child_id, date, label, amount, value))
+        elif section == 3:
+            completions.append(CompletionRow(child_id, key, amount, date, child.name, label))
+        elif section == 4:
+            progress.append({"grade": key, "subject": label, "completed": amount, "total": value})
+        else:
+            years.append(key)
+    
+    if include_archived:
+        history = archive.transactions(db, child_id)
+        transaction_count = len(history)
+        end = max(0, transaction_count - offset)
+        transactions = [TransactionRow(*row) for row in history[max(0, end - page_size):end]]
+    
+    return Dashboard(
+        child=child,
+        balance=balance,
+        transaction_count=transaction_count,
+        transactions=transactions,
+        page=page,
+        pages=max(1, -(-transaction_count // page_size)),
+        completions=completions,
+        progress=progress,
+        archived_years=years
+    )
 
 
+@serialized_write
 def create_completed_workbook(
     db: Session,
     completed: schemas.CompletedWorkbookCreate
@@ -241,9 +808,88 @@ def create_completed_workbook(
     db.add(db_member)
     db.commit()
     db.refresh(db_member)
+    _publish_completion(db, completed)
     return db_member
 
 
+@serialized_write
+def record_completed_workbook(
+    db: Session,
+    completed: schemas.CompletedWorkbookCreate
+) -> bool:
+    """
+    Record a completed workbook unless the child already completed it.
+    
+    Uses a single ``INSERT ... ON CONFLICT DO NOTHING`` on the
+    (children_id, workbooks_id) primary key, so concurrent submissions
+    cannot race between a check and the insert.
+    
+    Args:
+        db: Database session.
+        completed: Completed workbook data.
+        
+    Returns:
+        bool: True if the completion was recorded, False if it already existed.
+    """
+    statement = sqlite_insert(models.Member).values(
+        children_id=completed.children_id,
+        workbooks_id=completed.workbooks_id,
+        completed=1,
+        date=completed.date
+    ).on_conflict_do_nothing(
+        index_elements=[models.Member.children_id, models.Member.workbooks_id]
+    )
+    result = db.execute(statement)
+    db.commit()
+    recorded = result.rowcount == 1
+    if recorded:
+        _publish_completion(db, completed)
+    return recorded
+
+
+@serialized_write
+def apply_batch(
+    db: Session,
+    commands: Sequence[Union[schemas.TransactionCreate, schemas.CompletedWorkbookCreate]]
+) -> List[Union[int, bool]]:
+    """
+    Apply a chunk of validated writes in one transaction.
+    
+    Each command is one prepared INSERT on the session's connection, so
+    the chunk costs a single commit however many rows it holds. The
+    children and workbooks must exist.
+    
+    Args:
+        db: Database session.
+        commands: Transactions and completions, applied in order.
+    
+    Returns:
+        List[Union[int, bool]]: Per command, the new transaction's ID or
+            whether the completion was recorded (False if it existed).
+    """
+    connection = db.connection()
+    results = []
+    posted = []
+    recorded = []
+    for command in commands:
+        if isinstance(command, schemas.TransactionCreate):
+            result = connection.execute(BATCH_TRANSACTION_INSERT, command.model_dump())
+            results.append(result.lastrowid)
+            posted.append((result.lastrowid, command.children_id, command.date, command.description, command.amount))
+        else:
+            result = connection.execute(BATCH_COMPLETION_INSERT, command.model_dump())
+            results.append(result.rowcount == 1)
+            if result.rowcount == 1:
+                recorded.append(command)
+    db.commit()
+    
+    scope = _cache_scope(db)
+    _publish_transactions(db, [row for row in posted if broker.has_subscribers(row[1], scope=scope)])
+    for completed in recorded:
+        _publish_completion(db, completed)
+    return results
+
+
 def check_workbook_already_completed(
     db: Session,
     child_id: int,
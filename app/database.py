@@ -3,27 +3,146 @@ Database configuration and session management.
 
 This module handles SQLite database connections and provides
 session management for the application.
+
+It also makes the database safe to share between several server
+processes: connections use WAL journaling and a busy timeout, engines
+are disposed in forked children so no pooled connection crosses a fork,
+and write transactions are serialized across processes with a lock file
+next to the database and retried when SQLite still reports it is locked.
 """
 
-from sqlalchemy import create_engine
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Any, Callable, Dict, Generator, Iterator, Optional, TypeVar
 
-# Database URL - using the existing ledgerdb.sqlite
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ledgerdb.sqlite"
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None  # type: ignore[assignment]
 
-# Create engine with connect_args for SQLite
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
+# Database URL - the existing ledgerdb.sqlite unless overridden
+SQLALCHEMY_DATABASE_URL = os.environ.get(
+    "LEDGER_DATABASE_URL", "sqlite:///./ledgerdb.sqlite"
 )
 
+# Seconds SQLite waits on a locked database before raising
+BUSY_TIMEOUT_SECONDS = float(os.environ.get("LEDGER_BUSY_TIMEOUT", "30"))
+
+# Attempts for a write that still fails with "database is locked"
+WRITE_RETRIES = int(os.environ.get("LEDGER_WRITE_RETRIES", "5"))
+WRITE_RETRY_BACKOFF_SECONDS = 0.05
+
+# Use write-ahead logging so readers never block the writer
+SQLITE_WAL = os.environ.get("LEDGER_SQLITE_WAL", "1") != "0"
+
+
+def make_engine(url: str, **options) -> Engine:
+    """
+    Create an engine configured for concurrent SQLite access.
+    
+    Args:
+        url: SQLAlchemy database URL.
+        **options: Extra ``create_engine`` options, e.g. pool sizing.
+    
+    Returns:
+        Engine: Engine whose connections use WAL and a busy timeout.
+    """
+    new_engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": BUSY_TIMEOUT_SECONDS
+        },
+        **options
+    )
+    
+    @event.listens_for(new_engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT_SECONDS * 1000)}")
+        if SQLITE_WAL and not is_memory_database(new_engine):
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+    
+    return new_engine
+
+
+def is_memory_database(bind: Engine) -> bool:
+    """
+    Check whether an engine points at an in-memory database.
+    
+    Args:
+        bind: Engine to inspect.
+    
+    Returns:
+        bool: True for in-memory SQLite databases.
+    """
+    database = bind.url.database
+    return not database or database == ":memory:" or "mode=memory" in str(bind.url)
+
+
+def database_path(bind: Engine) -> Optional[str]:
+    """
+    Get the file an engine's database lives in.
+    
+    Args:
+        bind: Engine to inspect.
+    
+    Returns:
+        Optional[str]: Path of the SQLite file, or None in memory.
+    """
+    return None if is_memory_database(bind) else bind.url.database
+
+
+def session_engine(db: Session) -> Engine:
+    """
+    Get the engine behind a session.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        Engine: The session's bind, or the engine of a bound connection.
+    """
+    bind = db.get_bind()
+    return bind if isinstance(bind, Engine) else bind.engine
+
+
+# Create engine with connect_args for SQLite
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create Base class for models
-Base = declarative_base()
+Base: Any = declarative_base()
+
+
+def _dispose_after_fork() -> None:
+    """Drop pooled connections inherited from the parent process."""
+    engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+# Session factory for the current request when it is not SessionLocal;
+# set per request by the tenant routing middleware (see app/tenants.py).
+current_sessionmaker: ContextVar[Optional[sessionmaker]] = ContextVar(
+    "current_sessionmaker", default=None
+)
 
 
 def get_db() -> Generator:
@@ -31,27 +150,130 @@ def get_db() -> Generator:
     Dependency function to get database session.
     
     Yields:
-        Session: SQLAlchemy database session.
+        Session: SQLAlchemy database session for the request's database.
     
     Example:
         @app.get("/items")
         def read_items(db: Session = Depends(get_db)):
             return db.query(models.Item).all()
     """
-    db = SessionLocal()
+    db = (current_sessionmaker.get() or SessionLocal)()
     try:
         yield db
     finally:
         db.close()
 
 
-def init_db() -> None:
+def init_db(bind: Optional[Engine] = None) -> None:
     """
     Initialize database tables.
     
     Creates all tables defined in models if they don't exist.
     Does not drop existing tables.
+    
+    Args:
+        bind: Engine to initialize, defaults to the application engine.
     """
-    Base.metadata.create_all(bind=engine)
+    # Importing models registers every table on Base.metadata.
+    from app import models
+    
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        # create_all skips indexes on tables that already exist
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        models.install_search_index(connection)
+
 
+# Cross-process write serialization
 
+_thread_locks: Dict[Optional[str], threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _lock_path(bind: Engine) -> Optional[str]:
+    """Return the writer lock file path for a file-backed database."""
+    path = database_path(bind)
+    return f"{os.path.abspath(path)}-lock" if path else None
+
+
+@contextmanager
+def write_lock(bind: Engine) -> Iterator[None]:
+    """
+    Hold the exclusive writer lock for a database.
+    
+    Threads in this process queue on a mutex; other processes queue on
+    an ``flock`` of a lock file beside the database. Holding it around a
+    write transaction means SQLite never sees two writers competing.
+    
+    Args:
+        bind: Engine whose database is being written.
+    
+    Yields:
+        None: While the lock is held.
+    """
+    path = _lock_path(bind)
+    with _thread_locks_guard:
+        mutex = _thread_locks.setdefault(path, threading.Lock())
+    with mutex:
+        if path is None or fcntl is None:
+            yield
+            return
+        with open(path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def is_locked_error(error: OperationalError) -> bool:
+    """
+    Check whether an error is SQLite's busy/locked condition.
+    
+    Args:
+        error: Error raised by SQLAlchemy.
+    
+    Returns:
+        bool: True if retrying may succeed.
+    """
+    message = str(error.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+T = TypeVar("T")
+
+
+def serialized_write(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Decorate a CRUD write so it runs under the writer lock with retries.
+    
+    The decorated function must take the Session as its first argument
+    and perform its own commit. If SQLite still reports the database as
+    locked, the session is rolled back and the whole function re-run
+    with exponential backoff, up to ``WRITE_RETRIES`` attempts.
+    
+    Args:
+        func: CRUD function performing a write transaction.
+    
+    Returns:
+        Callable: Wrapped function.
+    """
+    @functools.wraps(func)
+    def wrapper(db: Session, *args, **kwargs):
+        bind = session_engine(db)
+        delay = WRITE_RETRY_BACKOFF_SECONDS
+        for attempt in range(1, WRITE_RETRIES + 1):
+            try:
+                with write_lock(bind):
+                    return func(db, *args, **kwargs)
+            except OperationalError as e:
+                db.rollback()
+                if attempt == WRITE_RETRIES or not is_locked_error(e):
+                    raise
+                time.sleep(delay)
+                delay *= 2
+    
+    return wrapper
@@ -0,0 +1,197 @@
+"""
+In-process publish/subscribe for live dashboards.
+
+CRUD writes publish events for a child after they commit; each open
+Server-Sent Events stream holds a Subscription with a bounded queue.
+Publishing never blocks: when a slow client's queue is full its pending
+events are replaced by a single "resync" event telling it to reload.
+
+Events only reach subscribers connected to the same worker process.
+Children are identified by a database scope as well as their ID, so
+tenants served by one process (see app/tenants.py) never see each
+other's events.
+"""
+
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app import metrics
+
+# Events buffered per subscriber before it is told to resync
+QUEUE_SIZE = int(os.environ.get("LEDGER_EVENT_QUEUE_SIZE", "64"))
+
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """
+    One subscriber's queue of events for a child.
+    
+    Attributes:
+        child_id: Child whose events are delivered.
+        scope: Database the child belongs to.
+        queue: Pending events.
+    """
+    
+    def __init__(self, broker: "Broker", child_id: int, maxsize: int, scope: str = ""):
+        """
+        Create a subscription bound to the running event loop.
+        
+        Args:
+            broker: Broker that delivers to this subscription.
+            child_id: Child whose events are delivered.
+            maxsize: Queue capacity.
+            scope: Database the child belongs to.
+        """
+        self.broker = broker
+        self.child_id = child_id
+        self.scope = scope
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._loop = asyncio.get_running_loop()
+    
+    def deliver(self, event: dict) -> None:
+        """Queue an event from any thread without blocking."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(event)
+        else:
+            self._loop.call_soon_threadsafe(self._put, event)
+    
+    def _put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog; the client reloads instead of replaying it.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.broker.dropped += 1
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Wait for the next event.
+        
+        Args:
+            timeout: Seconds to wait, or None to wait forever.
+        
+        Returns:
+            Optional[dict]: The event, or None on timeout.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """
+    Routes published events to the subscriptions for a child.
+    
+    Attributes:
+        published: Events published.
+        dropped: Times a full queue was replaced by a resync event.
+    """
+    
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        """
+        Create a broker with no subscribers.
+        
+        Args:
+            queue_size: Capacity of each subscription queue.
+        """
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        self._subscriptions: Dict[Tuple[str, int], Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+    
+    def subscribe(self, child_id: int, scope: str = "") -> Subscription:
+        """
+        Subscribe to a child's events; must be called on the event loop.
+        
+        Args:
+            child_id: Child ID.
+            scope: Database the child belongs to.
+        
+        Returns:
+            Subscription: New subscription; close it when done.
+        """
+        subscription = Subscription(self, child_id, self.queue_size, scope)
+        with self._lock:
+            self._subscriptions[(scope, child_id)].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription."""
+        key = (subscription.scope, subscription.child_id)
+        with self._lock:
+            subscribers = self._subscriptions.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[key]
+    
+    def has_subscribers(self, child_id: int, scope: str = "") -> bool:
+        """Check whether anyone is listening for a child."""
+        with self._lock:
+            return (scope, child_id) in self._subscriptions
+    
+    def subscribed_children(
+        self,
+        child_ids: Optional[Iterable[int]] = None,
+        scope: str = ""
+    ) -> Set[int]:
+        """
+        Get the children that have subscribers.
+        
+        Args:
+            child_ids: Only consider these children; all if None.
+            scope: Database the children belong to.
+        
+        Returns:
+            Set[int]: Subscribed child IDs.
+        """
+        with self._lock:
+            subscribed = {child for key_scope, child in self._subscriptions if key_scope == scope}
+        return subscribed if child_ids is None else subscribed.intersection(child_ids)
+    
+    def publish(self, child_id: int, event: dict, scope: str = "") -> None:
+        """
+        Deliver an event to every subscriber of a child.
+        
+        Args:
+            child_id: Child ID.
+            event: JSON-serializable event with a "type" key.
+            scope: Database the child belongs to.
+        """
+        with self._lock:
+            subscribers = list(self._subscriptions.get((scope, child_id), ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        self.published += 1
+    
+    def stats(self) -> dict:
+        """
+        Get broker counters.
+        
+        Returns:
+            dict: subscribers, published and dropped counts.
+        """
+        with self._lock:
+            subscribers = sum(len(s) for s in self._subscriptions.values())
+        return {"subscribers": subscribers, "published": self.published, "dropped": self.dropped}
+
+
+broker = Broker()
+
+metrics.register("events", broker.stats)
@@ -0,0 +1,480 @@
+"""
+Streaming import of legacy ledger databases.
+
+Copies Children, Workbooks, Members and Account rows from any ledger
+file written by the old command line scripts (``ledgerdb.sqlite``,
+``test_database.sqlite``, ...) into the current database. The legacy
+file is attached and read ``CHUNK_SIZE`` rows at a time in rowid order;
+each chunk is a single ``INSERT ... SELECT`` run inside SQLite, so
+memory use does not grow with the size of the legacy ledger.
+
+Legacy columns are matched by name with a few known aliases (see
+``COLUMN_MAP``), and IDs are never copied: children and workbooks are
+matched by name, so rows are deduplicated on their natural keys.
+
+- Children: name
+- Workbooks: name
+- Members: (child name, workbook name)
+- Account: (child name, date, description, amount) among the rows the
+  ledger held before the import started. Identical rows within one
+  legacy file are all kept, since two equal purchases on one day are
+  still two purchases. Rows dated in an archived year are skipped.
+
+Each chunk commits together with its ImportProgress row, so an
+interrupted import resumes after the last committed chunk, and running
+it again later only reads rows added to the legacy file since.
+
+Usage:
+    python -m app.importer ledgerdb.sqlite
+    python -m app.importer old.sqlite --chunk-size 1000 --tenant holt
+    python -m app.importer old.sqlite --status
+    python -m app.importer old.sqlite --restart   # re-read from the start
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, cast
+
+from sqlalchemy import select, text, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from app import models, tenants
+from app.database import database_path, serialized_write, session_engine
+
+# Schema name the legacy database is attached under
+SCHEMA = "legacy"
+
+# Legacy rows read per transaction
+CHUNK_SIZE = int(os.environ.get("LEDGER_IMPORT_CHUNK_SIZE", "5000"))
+
+# Parents first, so every chunk can resolve its references
+TABLES = ("Children", "Workbooks", "Members", "Account")
+
+# Target column -> (legacy column names tried in order, SQL used when
+# none exists or None if the column is required). "{alias}" is the
+# legacy table's alias in the import statement.
+COLUMN_MAP: Dict[str, Dict[str, Tuple[Tuple[str, ...], Optional[str]]]] = {
+    "Children": {
+        "id": (("id", "children_id", "child_id"), "{alias}.rowid"),
+        "name": (("name", "child", "child_name"), None),
+    },
+    "Workbooks": {
+        "id": (("id", "workbooks_id", "workbook_id"), "{alias}.rowid"),
+        "name": (("name", "title", "workbook"), None),
+    },
+    "Members": {
+        "children_id": (("children_id", "child_id"), None),
+        "workbooks_id": (("workbooks_id", "workbook_id"), None),
+        "completed": (("completed",), "1"),
+        "date": (("date", "completed_on", "completed_date"), "NULL"),
+    },
+    "Account": {
+        "children_id": (("children_id", "child_id"), None),
+        "date": (("date", "transaction_date"), None),
+        "description": (("description", "memo"), "''"),
+        "amount": (("amount", "value"), None),
+    },
+}
+
+
+def attach(db: Session, source: str) -> str:
+    """
+    Attach a legacy database to the session's connection.
+    
+    A file that is already attached (under any name) is reused, so the
+    importer can read a database the caller attached itself. SQLite
+    cannot attach inside a write transaction; call this before the
+    session writes.
+    
+    Args:
+        db: Database session.
+        source: Absolute path of the legacy database.
+    
+    Returns:
+        str: Schema name the legacy database is attached under.
+    """
+    connection = db.connection()
+    attached = connection.exec_driver_sql("PRAGMA database_list").fetchall()
+    for _, name, path in attached:
+        if name != "main" and path and os.path.abspath(path) == source:
+            return name
+    if any(row[1] == SCHEMA for row in attached):
+        connection.exec_driver_sql(f"DETACH DATABASE {SCHEMA}")
+    connection.exec_driver_sql(f"ATTACH DATABASE ? AS {SCHEMA}", (source,))
+    return SCHEMA
+
+
+def legacy_columns(db: Session, schema: str, table: str) -> Optional[List[str]]:
+    """
+    List a legacy table's columns.
+    
+    Args:
+        db: Database session with the legacy database attached.
+        schema: Schema name of the legacy database.
+        table: Table name.
+    
+    Returns:
+        Optional[List[str]]: Column names, or None if there is no such table.
+    """
+    rows = db.execute(text(f'PRAGMA "{schema}".table_info("{table}")')).all()
+    return [row[1] for row in rows] or None
+
+
+def column_map(db: Session, schema: str, table: str, alias: str) -> Optional[Dict[str, str]]:
+    """
+    Map a legacy table's columns onto the current schema.
+    
+    Args:
+        db: Database session with the legacy database attached.
+        schema: Schema name of the legacy database.
+        table: Table name.
+        alias: Alias of the legacy table in the statement being built.
+    
+    Returns:
+        Optional[Dict[str, str]]: Target column -> SQL expression over
+            the legacy row, or None if the legacy table does not exist.
+    
+    Raises:
+        ValueError: If a required column has no legacy counterpart.
+    """
+    columns = legacy_columns(db, schema, table)
+    if columns is None:
+        return None
+    by_name = {column.lower(): column for column in columns}
+    mapped = {}
+    for target, (candidates, default) in COLUMN_MAP[table].items():
+        found = next((by_name[name] for name in candidates if name in by_name), None)
+        if found is not None:
+            mapped[target] = f'{alias}."{found}"'
+        elif default is not None:
+            mapped[target] = default.format(alias=alias)
+        else:
+            raise ValueError(f"Legacy {table} has no column for {target} (columns: {', '.join(columns)})")
+    return mapped
+
+
+def insert_statement(db: Session, schema: str, table: str) -> Optional[str]:
+    """
+    Build the statement importing one chunk of a legacy table.
+    
+    The statement takes :last and :upto (the legacy rowid range of the
+    chunk) and, for Account, :baseline.
+    
+    Args:
+        db: Database session with the legacy database attached.
+        schema: Schema name of the legacy database.
+        table: Table to import, one of ``TABLES``.
+    
+    Returns:
+        Optional[str]: INSERT ... SELECT statement, or None if the legacy
+            database has no such table.
+    
+    Raises:
+        ValueError: If a legacy column cannot be mapped, or Members or
+            Account rows cannot be matched to children or workbooks.
+    """
+    source = column_map(db, schema, table, "l")
+    if source is None:
+        return None
+    chunk = "l.rowid > :last AND l.rowid <= :upto"
+    if table in ("Children", "Workbooks"):
+        name = source["name"]
+        if table == "Children":
+            dedupe = "ON CONFLICT DO NOTHING"
+        else:
+            # Workbook names are not unique in the schema
+            dedupe = (
+                f"AND NOT EXISTS (SELECT 1 FROM main.Workbooks AS w WHERE w.name = {name})\n"
+                f"GROUP BY {name} ORDER BY MIN(l.rowid)"
+            )
+        return f"""
+            INSERT INTO main.{table} (name)
+            SELECT {name} FROM "{schema}".{table} AS l
+            WHERE {chunk} AND {name} IS NOT NULL
+            {dedupe}
+        """
+    
+    children = column_map(db, schema, "Children", "lc")
+    if children is None:
+        raise ValueError(f"Legacy {table} rows cannot be matched without a Children table")
+    child = f"(SELECT c.id FROM main.Children AS c WHERE c.name = {children['name']})"
+    joins = f'JOIN "{schema}".Children AS lc ON {children["id"]} = {source["children_id"]}'
+    
+    if table == "Members":
+        workbooks = column_map(db, schema, "Workbooks", "lw")
+        if workbooks is None:
+            raise ValueError("Legacy Members rows cannot be matched without a Workbooks table")
+        return f"""
+            INSERT INTO main.Members (children_id, workbooks_id, completed, date)
+            SELECT children_id, workbooks_id, completed, date FROM (
+                SELECT {child} AS children_id,
+                       (SELECT MIN(w.id) FROM main.Workbooks AS w WHERE w.name = {workbooks['name']}) AS workbooks_id,
+                       {source['completed']} AS completed, {source['date']} AS date, l.rowid AS legacy_rowid
+                FROM "{schema}".Members AS l
+                {joins}
+                JOIN "{schema}".Workbooks AS lw ON {workbooks['id']} = {source['workbooks_id']}
+                WHERE {chunk}
+            )
+            WHERE children_id IS NOT NULL AND workbooks_id IS NOT NULL
+            ORDER BY legacy_rowid
+            ON CONFLICT DO NOTHING
+        """
+    
+    return f"""
+        INSERT INTO main.Account (children_id, date, description, amount)
+        SELECT children_id, date, description, amount FROM (
+            SELECT {child} AS children_id, {source['date']} AS date,
+                   {source['description']} AS description, CAST({source['amount']} AS REAL) AS amount,
+                   l.rowid AS legacy_rowid
+            FROM "{schema}".Account AS l
+            {joins}
+            WHERE {chunk}
+        ) AS n
+        WHERE children_id IS NOT NULL AND amount IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM main.Account AS a
+              WHERE a.children_id = n.children_id AND a.date = n.date
+                AND a.description IS n.description AND a.amount = n.amount
+                AND a.id <= :baseline
+          )
+          AND NOT EXISTS (
+              SELECT 1 FROM main.ArchiveManifest
+              WHERE year = CAST(substr(n.date, 1, 4) AS INTEGER)
+          )
+        ORDER BY legacy_rowid
+    """
+
+
+def source_path(db: Session, source: str) -> str:
+    """
+    Resolve and check a legacy database path.
+    
+    Args:
+        db: Database session of the target ledger.
+        source: Path of the legacy database.
+    
+    Returns:
+        str: Absolute path.
+    
+    Raises:
+        ValueError: If the file does not exist or is the target ledger.
+    """
+    path = os.path.abspath(source)
+    if not os.path.isfile(path):
+        raise ValueError(f"No such legacy database: {source}")
+    target = database_path(session_engine(db))
+    if target and os.path.exists(target):
+        if os.path.samefile(path, target):
+            raise ValueError("Cannot import a ledger into itself")
+    return path
+
+
+@serialized_write
+def import_chunk(db: Session, source: str, table: str, chunk_size: int = CHUNK_SIZE) -> Tuple[int, int]:
+    """
+    Import the next chunk of a legacy table.
+    
+    The rows and the advanced ImportProgress row commit together.
+    
+    Args:
+        db: Database session.
+        source: Absolute path of the legacy database.
+        table: Table to import, one of ``TABLES``.
+        chunk_size: Legacy rows to read.
+    
+    Returns:
+        Tuple[int, int]: Legacy rows read and rows inserted; (0, 0) once
+            the table has been read to the end.
+    
+    Raises:
+        ValueError: If the legacy table cannot be mapped.
+    """
+    schema = attach(db, source)
+    statement = insert_statement(db, schema, table)
+    if statement is None:
+        return 0, 0
+    
+    progress = db.get(models.ImportProgress, (source, table))
+    if progress is None:
+        baseline = None
+        if table == "Account":
+            baseline = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM main.Account")).scalar()
+        progress = models.ImportProgress(
+            source=source, table_name=table, last_rowid=0, scanned=0, imported=0, baseline=baseline
+        )
+        db.add(progress)
+        db.flush()
+    
+    upto, scanned = db.execute(
+        text(f"""
+            SELECT MAX(rowid), COUNT(*) FROM (
+                SELECT rowid FROM "{schema}".{table} WHERE rowid > :last ORDER BY rowid LIMIT :chunk
+            )
+        """),
+        {"last": progress.last_rowid, "chunk": chunk_size}
+    ).one()
+    imported = 0
+    if scanned:
+        imported = cast(CursorResult, db.execute(
+            text(statement), {"last": progress.last_rowid, "upto": upto, "baseline": progress.baseline}
+        )).rowcount
+        db.execute(
+            update(models.ImportProgress)
+            .where(
+                models.ImportProgress.source == source,
+                models.ImportProgress.table_name == table,
+            )
+            .values(
+                last_rowid=upto,
+                scanned=models.ImportProgress.scanned + scanned,
+                imported=models.ImportProgress.imported + imported,
+                updated_at=datetime.now().isoformat(timespec="seconds"),
+            )
+        )
+    db.commit()
+    return scanned, imported
+
+
+def import_ledger(db: Session, source: str, chunk_size: int = CHUNK_SIZE) -> List[dict]:
+    """
+    Import every table of a legacy ledger, resuming where the last run stopped.
+    
+    Args:
+        db: Database session.
+        source: Path of the legacy database.
+        chunk_size: Legacy rows read per transaction.
+    
+    Returns:
+        List[dict]: table, scanned, imported and skipped for this run,
+            one per table.
+    
+    Raises:
+        ValueError: If the source is missing, is the target ledger, or
+            cannot be mapped onto the current schema.
+    """
+    path = source_path(db, source)
+    results = []
+    for table in TABLES:
+        scanned_total = imported_total = 0
+        while True:
+            scanned, imported = import_chunk(db, path, table, chunk_size)
+            if not scanned:
+                break
+            scanned_total += scanned
+            imported_total += imported
+        results.append({
+            "table": table,
+            "scanned": scanned_total,
+            "imported": imported_total,
+            "skipped": scanned_total - imported_total,
+        })
+    return results
+
+
+def status(db: Session, source: str) -> List[dict]:
+    """
+    Report how far each table of a legacy ledger has been imported.
+    
+    Args:
+        db: Database session.
+        source: Path of the legacy database.
+    
+    Returns:
+        List[dict]: table, last_rowid, scanned, imported and updated_at
+            for each table read so far, in import order.
+    """
+    path = os.path.abspath(source)
+    rows = {
+        row.table_name: row
+        for row in db.execute(
+            select(
+                models.ImportProgress.table_name,
+                models.ImportProgress.last_rowid,
+                models.ImportProgress.scanned,
+                models.ImportProgress.imported,
+                models.ImportProgress.updated_at,
+            ).where(models.ImportProgress.source == path)
+        )
+    }
+    return [
+        {
+            "table": table,
+            "last_rowid": rows[table].last_rowid,
+            "scanned": rows[table].scanned,
+            "imported": rows[table].imported,
+            "updated_at": rows[table].updated_at,
+        }
+        for table in TABLES if table in rows
+    ]
+
+
+@serialized_write
+def restart(db: Session, source: str) -> int:
+    """
+    Forget the progress of a legacy ledger so it is read from the start.
+    
+    Rows imported before are not duplicated, since they now count as
+    already in the ledger.
+    
+    Args:
+        db: Database session.
+        source: Path of the legacy database.
+    
+    Returns:
+        int: Number of progress rows removed.
+    """
+    removed = db.query(models.ImportProgress).filter(
+        models.ImportProgress.source == os.path.abspath(source)
+    ).delete()
+    db.commit()
+    return removed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Import a legacy ledger database")
+    parser.add_argument("source", help="legacy ledger file")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="legacy rows per transaction")
+    parser.add_argument("--tenant", help="household database to import into (see app.tenants)")
+    parser.add_argument("--status", action="store_true", help="only show how far the import has got")
+    parser.add_argument("--restart", action="store_true", help="read the legacy file from the start again")
+    args = parser.parse_args(argv)
+    
+    try:
+        db = tenants.command_sessionmaker(args.tenant)()
+    except (LookupError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    try:
+        if args.status:
+            for row in status(db, args.source):
+                print(f"{row['table']}\t{row['scanned']} read\t{row['imported']} imported\t{row['updated_at']}")
+            return 0
+        if args.restart:
+            restart(db, args.source)
+        for result in import_ledger(db, args.source, max(1, args.chunk_size)):
+            print(
+                f"{result['table']}\t{result['scanned']} read\t"
+                f"{result['imported']} imported\t{result['skipped']} skipped"
+            )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
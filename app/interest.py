@@ -0,0 +1,214 @@
+"""
+Savings interest on average daily balances.
+
+Interest for a month is paid on each child's average daily balance
+(ADB). With opening balance B (every amount dated before the month) and
+amounts a_i on days d_i within a month of N days ending on day E:
+
+    ADB = B + sum(a_i * (E - d_i + 1)) / N
+
+because an amount counts towards the balance from its day to the month
+end. The sums are NumPy bincounts over the columnar ledger from
+app/analytics.py, so one pass over the rows prices every child at once.
+Interest is ADB * rate * N / 365, rounded to cents, posted on the last
+day of the month for children whose ADB is positive.
+
+Usage:
+    python -m app.interest 2025-01 --rate 0.05 [--preview]
+"""
+
+import argparse
+import calendar
+import os
+import re
+import sys
+from datetime import date
+from typing import List, Optional, Sequence, cast
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from app import analytics, crud, models
+from app.database import SessionLocal, init_db, serialized_write
+
+# Annual rate used when none is given
+DEFAULT_RATE = float(os.environ.get("LEDGER_INTEREST_RATE", "0.05"))
+
+_PERIOD = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+def month_bounds(period: str) -> tuple:
+    """
+    Get the first and last day of a month.
+    
+    Args:
+        period: Month (YYYY-MM).
+    
+    Returns:
+        tuple: (first day, last day) as dates.
+    
+    Raises:
+        ValueError: If the period is malformed.
+    """
+    if not _PERIOD.match(period):
+        raise ValueError(f"Invalid month: {period}")
+    year, month = int(period[:4]), int(period[5:])
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def compute_interest(columns: analytics.LedgerSnapshot, period: str, rate: float) -> List[dict]:
+    """
+    Price a month's interest for every child.
+    
+    Args:
+        columns: Columnar ledger.
+        period: Month (YYYY-MM).
+        rate: Annual interest rate, e.g. 0.05 for 5%.
+    
+    Returns:
+        List[dict]: child_id, average_daily_balance and interest (dollars)
+            for each child owed at least one cent, by child ID.
+    """
+    first, last = month_bounds(period)
+    start = (first - date(1970, 1, 1)).days
+    end = (last - date(1970, 1, 1)).days
+    ndays = end - start + 1
+    
+    size = int(columns.child_ids.max()) + 1 if len(columns.ids) else 1
+    before = columns.days < start
+    during = (columns.days >= start) & (columns.days <= end)
+    opening = np.bincount(columns.child_ids[before], weights=columns.cents[before], minlength=size)
+    weighted = np.bincount(
+        columns.child_ids[during],
+        weights=columns.cents[during] * (end - columns.days[during] + 1),
+        minlength=size
+    )
+    adb = opening + weighted / ndays
+    interest = np.round(np.maximum(adb, 0) * rate * ndays / 365)
+    
+    owed = np.flatnonzero(interest >= 1)
+    owed = owed[owed > 0]  # ID 0 collects rows without a child
+    return [
+        {"child_id": child, "average_daily_balance": round(balance / 100, 2), "interest": cents / 100}
+        for child, balance, cents in zip(owed.tolist(), adb[owed].tolist(), interest[owed].tolist())
+    ]
+
+
+@serialized_write
+def post_interest(
+    db: Session,
+    period: str,
+    rate: float = DEFAULT_RATE,
+    today: Optional[date] = None
+) -> Optional[models.InterestRun]:
+    """
+    Post a month's interest for every child in one transaction.
+    
+    Args:
+        db: Database session.
+        period: Month to pay (YYYY-MM); must have ended.
+        rate: Annual interest rate.
+        today: Reference date, defaults to today.
+    
+    Returns:
+        Optional[models.InterestRun]: The new run, or None if the month
+            was already paid.
+    
+    Raises:
+        ValueError: If the period is malformed or has not ended.
+    """
+    _, last = month_bounds(period)
+    if last >= (today or date.today()):
+        raise ValueError(f"{period} has not ended yet")
+    
+    # Claiming the month first makes reruns and concurrent runs no-ops.
+    claimed = cast(CursorResult, db.execute(text(
+        "INSERT INTO InterestRuns (period, rate) VALUES (:period, :rate) "
+        "ON CONFLICT (period) DO NOTHING"
+    ), {"period": period, "rate": rate})).rowcount
+    if not claimed:
+        db.rollback()
+        return None
+    
+    payouts = compute_interest(analytics.get_columns(db), period, rate)
+    last_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM Account")).scalar_one()
+    if payouts:
+        db.execute(
+            text(
+                "INSERT INTO Account (children_id, date, description, amount) "
+                "VALUES (:child_id, :date, :description, :interest)"
+            ),
+            [
+                dict(payout, date=last.isoformat(), description=f"Interest {period}")
+                for payout in payouts
+            ]
+        )
+    db.execute(text(
+        "UPDATE InterestRuns SET transactions = :count, total = :total WHERE period = :period"
+    ), {
+        "count": len(payouts),
+        "total": round(sum(p["interest"] for p in payouts), 2),
+        "period": period
+    })
+    db.commit()
+    if payouts:
+        crud.publish_new_transactions(db, last_id, [payout["child_id"] for payout in payouts])
+    return db.get(models.InterestRun, period)
+
+
+def get_runs(db: Session) -> List[models.InterestRun]:
+    """
+    Get every interest run.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[models.InterestRun]: Runs by month.
+    """
+    return db.query(models.InterestRun).order_by(models.InterestRun.period).all()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Pay monthly savings interest")
+    parser.add_argument("period", help="month to pay, YYYY-MM")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="annual rate")
+    parser.add_argument("--preview", action="store_true", help="print payouts without posting")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.preview:
+            payouts = compute_interest(analytics.get_columns(db), args.period, args.rate)
+            for payout in payouts:
+                print(f"{payout['child_id']}\t{payout['average_daily_balance']:.2f}\t{payout['interest']:.2f}")
+            print(f"{len(payouts)} payouts, total {sum(p['interest'] for p in payouts):.2f}")
+            return 0
+        run = post_interest(db, args.period, args.rate)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+    
+    if run is None:
+        print(f"Interest for {args.period} was already posted")
+    else:
+        print(f"Posted {run.transactions} interest transactions totalling {run.total:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Top-N leaderboards.
+
+Reads the trigger-maintained LeaderboardTotals and LeaderboardPeriods
+tables (see app/models.py). Every board is an ordered scan of an index
+that stops after N rows, so the cost does not grow with the number of
+children.
+"""
+
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Upper bound on entries returned by a single leaderboard
+MAX_ENTRIES = 100
+
+# Board name -> (all-time column, per-period column or None, skip zero values)
+BOARDS = {
+    "savers": ("balance", "net", False),
+    "completions": ("completions", "completions", True),
+    "streaks": ("best_streak", None, True),
+}
+
+_PERIOD_KEY = re.compile(r"^\d{4}(-Q[1-4]|-(0[1-9]|1[0-2]))?$")
+
+
+def resolve_period(period: Optional[str], today: Optional[date] = None) -> Optional[str]:
+    """
+    Turn a period argument into a LeaderboardPeriods key.
+    
+    Args:
+        period: None or "all" for all time; "year", "term" or "month" for
+            the current one; or an explicit YYYY, YYYY-Qn or YYYY-MM key.
+        today: Reference date for relative periods, defaults to today.
+    
+    Returns:
+        Optional[str]: Period key, or None for all time.
+    
+    Raises:
+        ValueError: If the period is not recognised.
+    """
+    if period is None or period == "all":
+        return None
+    today = today or date.today()
+    if period == "year":
+        return f"{today.year}"
+    if period == "term":
+        return f"{today.year}-Q{(today.month + 2) // 3}"
+    if period == "month":
+        return f"{today.year}-{today.month:02d}"
+    if _PERIOD_KEY.match(period):
+        return period
+    raise ValueError(f"Unknown period: {period}")
+
+
+def top(
+    db: Session,
+    board: str,
+    period: Optional[str] = None,
+    limit: int = 10
+) -> List[dict]:
+    """
+    Get the top children on a leaderboard.
+    
+    Args:
+        db: Database session.
+        board: "savers", "completions" or "streaks".
+        period: Period argument accepted by resolve_period.
+        limit: Number of entries (capped at MAX_ENTRIES).
+    
+    Returns:
+        List[dict]: rank, child_id, child_name and value, best first.
+            Ties share the order of their child IDs.
+    
+    Raises:
+        ValueError: If the board or period is unknown, or the board has
+            no per-period values.
+    """
+    if board not in BOARDS:
+        raise ValueError(f"Unknown leaderboard: {board}")
+    total_column, period_column, skip_zero = BOARDS[board]
+    key = resolve_period(period)
+    params: Dict[str, object] = {"limit": min(limit, MAX_ENTRIES)}
+    
+    if key is None:
+        column, source, where = total_column, "LeaderboardTotals", ""
+    elif period_column is None:
+        raise ValueError(f"The {board} leaderboard has no periods")
+    else:
+        column, source, where = period_column, "LeaderboardPeriods", "AND b.period = :period"
+        params["period"] = key
+    if skip_zero:
+        where += f" AND b.{column} > 0"
+    
+    rows = db.execute(text(f"""
+        SELECT b.children_id, c.name, b.{column}
+        FROM {source} AS b
+        JOIN Children AS c ON c.id = b.children_id
+        WHERE 1 {where}
+        ORDER BY b.{column} DESC, b.children_id
+        LIMIT :limit
+    """), params).all()
+    return [
+        {"rank": rank, "child_id": child_id, "child_name": name, "value": round(value, 2)}
+        for rank, (child_id, name, value) in enumerate(rows, start=1)
+    ]
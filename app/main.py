@@ -3,37 +3,144 @@ FastAPI main application.
 
 This module contains the FastAPI application with all routes
 for the children's ledger web interface.
+
+The application is built by ``create_app``. Importing this module has no
+database side effects: tables are created by the lifespan hook when the
+server starts, so workers boot quickly and tests never touch the
+production database file.
 """
 
-from fastapi import FastAPI, Request, Depends, HTTPException, Form
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+from datetime import date
+
+from fastapi import APIRouter, FastAPI, Request, Depends, HTTPException, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import date
-
-from app import crud, models, schemas
-from app.database import engine, get_db, init_db
+from starlette.concurrency import run_in_threadpool
+
+from app import __version__, admission, backup, catalog, crud, metrics, reports, scheduler, schemas, tenants
+from app.cache import SingleFlight
+from app.database import get_db, init_db, session_engine
+from app.routers import allowances
+from app.routers import analytics as analytics_routes
+from app.routers import catalog as catalog_routes
+from app.routers import events as event_routes
+from app.routers import interest as interest_routes
+from app.routers import leaderboard as leaderboard_routes
+from app.routers import reports as report_routes
+from app.routers import search
+from app.routers import stats as stats_routes
+from app.templating import APP_DIR, templates
+
+# Routes are registered on a router and attached by create_app
+router = APIRouter()
+
+# Concurrent loads of the children list share one query; a TTL above 0
+# also reuses the result for that long (writes by other processes may
+# then show up that much later).
+children_flights = SingleFlight(ttl=float(os.environ.get("LEDGER_COALESCE_TTL", "0")))
+
+metrics.register("coalesce.children", children_flights.stats)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Application lifespan hook.
+    
+    Initializes database tables on startup instead of at import time
+    and runs the allowance scheduler and backups while serving.
+    
+    Args:
+        app: FastAPI application being started.
+        
+    Yields:
+        None: Control while the application is serving.
+    """
+    init_db()
+    task = scheduler.start_background()
+    backup_task = backup.start_background()
+    yield
+    await scheduler.stop_background(backup_task)
+    await scheduler.stop_background(task)
+    reports.shutdown_pool()
 
-# Initialize database tables
-models.Base.metadata.create_all(bind=engine)
 
-# Create FastAPI app
-app = FastAPI(
-    title="Children's Ledger",
-    description="Web application for managing children's bank accounts and workbook completions",
-    version="1.0.0"
-)
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application.
+    
+    Returns:
+        FastAPI: Configured application with routes and static files.
+    """
+    application = FastAPI(
+        title="Children's Ledger",
+        description="Web application for managing children's bank accounts and workbook completions",
+        version=__version__,
+        lifespan=lifespan
+    )
+    
+    # The middleware added last runs first: tenants are resolved before
+    # admission so each household's writes queue separately.
+    if admission.WRITE_CONCURRENCY > 0:
+        application.add_middleware(admission.AdmissionMiddleware)
+    if tenants.TENANT_MODE:
+        application.add_middleware(tenants.TenantMiddleware, mode=tenants.TENANT_MODE)
+    
+    # Mount static files
+    application.mount(
+        "/static",
+        StaticFiles(directory=str(APP_DIR / "static")),
+        name="static"
+    )
+    application.include_router(router)
+    application.include_router(search.router)
+    application.include_router(allowances.router)
+    application.include_router(event_routes.router)
+    application.include_router(catalog_routes.router)
+    application.include_router(analytics_routes.router)
+    application.include_router(interest_routes.router)
+    application.include_router(leaderboard_routes.router)
+    application.include_router(report_routes.router)
+    application.include_router(stats_routes.router)
+    return application
+
+
+def _load_children_with_balances(bind: Engine) -> List[crud.ChildBalance]:
+    """Run the balance query on a session of its own, closed when done."""
+    db = Session(bind=bind)
+    try:
+        return crud.get_children_with_balances(db)
+    finally:
+        db.close()
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-# Setup templates
-templates = Jinja2Templates(directory="app/templates")
+async def _children_with_balances(db: Session) -> List[crud.ChildBalance]:
+    """
+    Load every child's balance, sharing the query with concurrent callers.
+    
+    Requests for the same database and write generation (see
+    crud.read_version) wait on one query run in the threadpool. The
+    shared query outlives a caller that disconnects, so it opens its own
+    session on the caller's engine instead of borrowing the request's.
+    
+    Args:
+        db: Database session of the request, identifying the database.
+    
+    Returns:
+        List[crud.ChildBalance]: Children in ID order; shared, not to be modified.
+    """
+    bind = session_engine(db)
+    return await children_flights.run(
+        crud.read_version(db), lambda: run_in_threadpool(_load_children_with_balances, bind)
+    )
 
 
-@app.get("/", response_class=HTMLResponse)
+@router.get("/", response_class=HTMLResponse)
 async def home(request: Request, db: Session = Depends(get_db)):
     """
     Home page showing all children with their current balances.
@@ -45,27 +152,20 @@ async def home(request: Request, db: Session = Depends(get_db)):
     Returns:
         HTMLResponse: Rendered home page template.
     """
-    children = crud.get_children(db)
-    children_with_balance = []
-    
-    for child in children:
-        balance = crud.get_child_balance(db, child.id)
-        children_with_balance.append({
-            'id': child.id,
-            'name': child.name,
-            'balance': balance
-        })
+    children = await _children_with_balances(db)
     
     return templates.TemplateResponse(
         "index.html",
-        {"request": request, "children": children_with_balance}
+        {"request": request, "children": children}
     )
 
 
-@app.get("/child/{child_id}", response_class=HTMLResponse)
+@router.get("/child/{child_id}", response_class=HTMLResponse)
 async def child_dashboard(
     request: Request,
     child_id: int,
+    archived: bool = False,
+    page: int = Query(1, ge=1),
     db: Session = Depends(get_db)
 ):
     """
@@ -74,6 +174,8 @@ async def child_dashboard(
     Args:
         request: FastAPI request object.
         child_id: Child ID.
+        archived: Show archived years instead of their opening balances.
+        page: Transaction page, 1 being the newest.
         db: Database session.
         
     Returns:
@@ -82,40 +184,29 @@ async def child_dashboard(
     Raises:
         HTTPException: If child not found.
     """
-    child = crud.get_child(db, child_id)
-    if not child:
+    dashboard = crud.load_dashboard(db, child_id, page=page, include_archived=archived)
+    if dashboard is None:
         raise HTTPException(status_code=404, detail="Child not found")
     
-    transactions = crud.get_child_transactions(db, child_id)
-    completed_workbooks = crud.get_child_completed_workbooks(db, child_id)
-    balance = crud.get_child_balance(db, child_id)
-    
-    # Calculate cumulative balance for each transaction
-    transactions_with_balance = []
-    cumulative = 0.0
-    for transaction in transactions:
-        cumulative += transaction.amount
-        transactions_with_balance.append({
-            'id': transaction.id,
-            'date': transaction.date,
-            'description': transaction.description,
-            'amount': transaction.amount,
-            'cumulative': cumulative
-        })
-    
     return templates.TemplateResponse(
         "child_dashboard.html",
         {
             "request": request,
-            "child": child,
-            "transactions": transactions_with_balance,
-            "completed_workbooks": completed_workbooks,
-            "balance": balance
+            "child": dashboard.child,
+            "transactions": dashboard.transactions,
+            "transaction_count": dashboard.transaction_count,
+            "page": dashboard.page,
+            "pages": dashboard.pages,
+            "completed_workbooks": dashboard.completions,
+            "progress": dashboard.progress,
+            "balance": dashboard.balance,
+            "archived_years": dashboard.archived_years,
+            "show_archived": archived
         }
     )
 
 
-@app.get("/child/{child_id}/transaction/new", response_class=HTMLResponse)
+@router.get("/child/{child_id}/transaction/new", response_class=HTMLResponse)
 async def new_transaction_form(
     request: Request,
     child_id: int,
@@ -135,7 +226,7 @@ async def new_transaction_form(
     Raises:
         HTTPException: If child not found.
     """
-    child = crud.get_child(db, child_id)
+    child = crud.lookup_child(db, child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
     
@@ -148,8 +239,8 @@ async def new_transaction_form(
     )
 
 
-@app.post("/child/{child_id}/transaction")
-async def create_transaction(
+@router.post("/child/{child_id}/transaction")
+def create_transaction(
     child_id: int,
     date: str = Form(...),
     description: str = Form(...),
@@ -172,7 +263,7 @@ async def create_transaction(
     Raises:
         HTTPException: If child not found or validation fails.
     """
-    child = crud.get_child(db, child_id)
+    child = crud.lookup_child(db, child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
     
@@ -192,7 +283,7 @@ async def create_transaction(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/child/{child_id}/workbook/new", response_class=HTMLResponse)
+@router.get("/child/{child_id}/workbook/new", response_class=HTMLResponse)
 async def new_workbook_completion_form(
     request: Request,
     child_id: int,
@@ -212,26 +303,27 @@ async def new_workbook_completion_form(
     Raises:
         HTTPException: If child not found.
     """
-    child = crud.get_child(db, child_id)
+    child = crud.lookup_child(db, child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
     
-    workbooks = crud.get_workbooks(db)
     today = date.today().strftime("%Y-%m-%d")
     
+    # The form autocompletes from /api/workbooks/suggest rather than
+    # rendering the whole catalog.
     return templates.TemplateResponse(
         "add_workbook_completion.html",
         {
             "request": request,
             "child": child,
-            "workbooks": workbooks,
+            "has_workbooks": catalog.has_workbooks(db),
             "today": today
         }
     )
 
 
-@app.post("/child/{child_id}/workbook")
-async def create_workbook_completion(
+@router.post("/child/{child_id}/workbook")
+def create_workbook_completion(
     child_id: int,
     workbook_id: int = Form(...),
     date: str = Form(...),
@@ -250,39 +342,39 @@ async def create_workbook_completion(
         RedirectResponse: Redirect to child dashboard.
         
     Raises:
-        HTTPException: If child not found, workbook not found, or already completed.
+        HTTPException: If child or workbook not found (404), the data is
+            invalid (400) or the workbook was already completed (409).
     """
-    child = crud.get_child(db, child_id)
+    child = crud.lookup_child(db, child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
     
-    workbook = crud.get_workbook(db, workbook_id)
+    workbook = crud.lookup_workbook(db, workbook_id)
     if not workbook:
         raise HTTPException(status_code=404, detail="Workbook not found")
     
-    # Check if already completed
-    if crud.check_workbook_already_completed(db, child_id, workbook_id):
-        raise HTTPException(
-            status_code=400,
-            detail="This workbook has already been completed by this child"
-        )
-    
     try:
         completion_data = schemas.CompletedWorkbookCreate(
             children_id=child_id,
             workbooks_id=workbook_id,
             date=date
         )
-        crud.create_completed_workbook(db, completion_data)
-        return RedirectResponse(
-            url=f"/child/{child_id}",
-            status_code=303
-        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    if not crud.record_completed_workbook(db, completion_data):
+        raise HTTPException(
+            status_code=409,
+            detail="This workbook has already been completed by this child"
+        )
+    
+    return RedirectResponse(
+        url=f"/child/{child_id}",
+        status_code=303
+    )
 
 
-@app.get("/children/new", response_class=HTMLResponse)
+@router.get("/children/new", response_class=HTMLResponse)
 async def new_child_form(request: Request):
     """
     Form to add a new child.
@@ -299,8 +391,8 @@ async def new_child_form(request: Request):
     )
 
 
-@app.post("/children")
-async def create_child(
+@router.post("/children")
+def create_child(
     name: str = Form(...),
     db: Session = Depends(get_db)
 ):
@@ -333,7 +425,7 @@ async def create_child(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/workbooks/new", response_class=HTMLResponse)
+@router.get("/workbooks/new", response_class=HTMLResponse)
 async def new_workbook_form(request: Request):
     """
     Form to add a new workbook.
@@ -350,8 +442,8 @@ async def new_workbook_form(request: Request):
     )
 
 
-@app.post("/workbooks")
-async def create_workbook(
+@router.post("/workbooks")
+def create_workbook(
     name: str = Form(...),
     db: Session = Depends(get_db)
 ):
@@ -376,7 +468,7 @@ async def create_workbook(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/workbooks", response_class=HTMLResponse)
+@router.get("/workbooks", response_class=HTMLResponse)
 async def list_workbooks(request: Request, db: Session = Depends(get_db)):
     """
     List all workbooks.
@@ -397,7 +489,7 @@ async def list_workbooks(request: Request, db: Session = Depends(get_db)):
 
 # API endpoints for JSON responses
 
-@app.get("/api/children", response_model=List[schemas.ChildResponse])
+@router.get("/api/children", response_model=List[schemas.ChildResponse])
 async def api_get_children(db: Session = Depends(get_db)):
     """
     API endpoint to get all children with balances.
@@ -408,27 +500,22 @@ async def api_get_children(db: Session = Depends(get_db)):
     Returns:
         List[schemas.ChildResponse]: List of children with balances.
     """
-    children = crud.get_children(db)
-    response = []
-    for child in children:
-        balance = crud.get_child_balance(db, child.id)
-        response.append(
-            schemas.ChildResponse(
-                id=child.id,
-                name=child.name,
-                balance=balance
-            )
-        )
-    return response
+    return [child._asdict() for child in await _children_with_balances(db)]
 
 
-@app.get("/api/child/{child_id}/transactions", response_model=List[schemas.TransactionResponse])
-async def api_get_transactions(child_id: int, db: Session = Depends(get_db)):
+@router.get("/api/child/{child_id}/transactions", response_model=List[schemas.TransactionResponse])
+async def api_get_transactions(
+    child_id: int,
+    include_archived: bool = False,
+    db: Session = Depends(get_db)
+):
     """
     API endpoint to get all transactions for a child.
     
     Args:
         child_id: Child ID.
+        include_archived: Include archived years instead of their
+            opening balances.
         db: Database session.
         
     Returns:
@@ -437,11 +524,25 @@ async def api_get_transactions(child_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If child not found.
     """
-    child = crud.get_child(db, child_id)
+    child = crud.lookup_child(db, child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
     
-    return crud.get_child_transactions(db, child_id)
+    return crud.get_child_transactions(db, child_id, include_archived=include_archived)
+
+
+@router.get("/api/metrics")
+async def api_get_metrics():
+    """
+    API endpoint reporting in-process metrics such as cache hit ratios.
+    
+    Returns:
+        dict: Metrics keyed by section name.
+    """
+    return metrics.snapshot()
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
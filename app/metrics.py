@@ -0,0 +1,37 @@
+"""
+Application metrics registry.
+
+Subsystems register a callable that returns a dict of their current
+counters; ``snapshot`` collects them all for the ``/api/metrics``
+endpoint.
+"""
+
+import threading
+from typing import Callable, Dict
+
+_providers: Dict[str, Callable[[], dict]] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Register a metrics provider.
+    
+    Args:
+        name: Section name in the metrics snapshot.
+        provider: Callable returning the section's counters.
+    """
+    with _lock:
+        _providers[name] = provider
+
+
+def snapshot() -> dict:
+    """
+    Collect the current value of every registered provider.
+    
+    Returns:
+        dict: Metrics keyed by section name.
+    """
+    with _lock:
+        providers = dict(_providers)
+    return {name: provider() for name, provider in sorted(providers.items())}
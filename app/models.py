@@ -6,9 +6,27 @@ Defines database models matching the existing schema:
 - Workbooks: Available workbook tasks
 - Members: Many-to-many relationship for completed workbooks
 - Account: Financial transactions
+- AllowanceRules: Recurring credits posted by app/scheduler.py
+- InterestRuns: Months for which savings interest was posted
+- ArchiveManifest: Closed years moved to the archive by app/archive.py
+- ArchiveOpenings: Opening-balance rows carried forward from archived years
+- ImportProgress: How far app/importer.py has read each legacy table
+
+Also defines FTS5 full-text indexes kept in sync by triggers:
+- Account_fts: Transaction descriptions
+- Workbooks_fts: Workbook titles (trigram, for substring autocomplete)
+
+and derived tables kept in sync by triggers:
+- WorkbookFacets: Grade and subject parsed from each workbook title
+- LeaderboardTotals: All-time balance, completions and best streak per child
+- LeaderboardPeriods: Net, earnings and completions per child per period
+- ChildStats: Activity counts, credits, debits and last activity per child
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, Text, event, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -49,6 +67,36 @@ class Workbook(Base):
     
     # Relationships
     completions = relationship("Member", back_populates="workbook")
+    
+    # Case-insensitive prefix lookups for autocomplete
+    __table_args__ = (
+        Index("ix_Workbooks_name_nocase", text("name COLLATE NOCASE")),
+    )
+
+
+class WorkbookFacets(Base):
+    """
+    Grade and subject parsed from a workbook title.
+    
+    "Grade 4 Decimals and Fractions Volume 2" has grade 4 and subject
+    "Decimals and Fractions". Titles not starting with "Grade N" have
+    neither. Maintained by triggers on Workbooks; never written directly.
+    
+    Attributes:
+        workbook_id: Foreign key to Workbooks
+        grade: Grade number, or None
+        subject: Subject name, or None
+    """
+    __tablename__ = "WorkbookFacets"
+    
+    workbook_id = Column(Integer, ForeignKey('Workbooks.id'), primary_key=True)
+    grade = Column(Integer)
+    subject = Column(Text)
+    
+    # Covers the progress report's GROUP BY in index order
+    __table_args__ = (
+        Index("ix_WorkbookFacets_grade_subject", grade, subject, workbook_id),
+    )
 
 
 class Member(Base):
@@ -96,5 +144,645 @@ class Account(Base):
     
     # Relationships
     child = relationship("Child", back_populates="account_entries")
+    
+    # A child's history in date order without a sort (rowid breaks ties)
+    __table_args__ = (
+        Index("ix_Account_children_date", children_id, date),
+    )
+
+
+class AllowanceRule(Base):
+    """
+    A recurring transaction posted by the scheduler.
+    
+    Attributes:
+        id: Primary key
+        children_id: Foreign key to Children, or None for every child
+        description: Description of the posted transactions
+        amount: Amount of each posted transaction
+        frequency: "weekly" or "monthly"
+        next_date: Date of the next posting (YYYY-MM-DD format)
+    """
+    __tablename__ = "AllowanceRules"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True, unique=True, nullable=False)
+    children_id = Column(Integer, ForeignKey('Children.id'))
+    description = Column(Text, nullable=False)
+    amount = Column(Float, nullable=False)
+    frequency = Column(Text, nullable=False)
+    next_date = Column(Text, nullable=False, index=True)
+
+
+class InterestRun(Base):
+    """
+    Savings interest posted for one month.
+    
+    The primary key makes each month's payout happen at most once.
+    
+    Attributes:
+        period: Month paid (YYYY-MM format)
+        rate: Annual interest rate applied
+        transactions: Number of interest transactions posted
+        total: Sum of interest posted
+    """
+    __tablename__ = "InterestRuns"
+    
+    period = Column(Text, primary_key=True)
+    rate = Column(Float, nullable=False)
+    transactions = Column(Integer, nullable=False, server_default="0")
+    total = Column(Float, nullable=False, server_default="0")
+
+
+class ArchiveManifest(Base):
+    """
+    A closed year moved out of Account into the archive database.
+    
+    Attributes:
+        year: Calendar year archived
+        table_name: Archive table holding the year's rows
+        rows: Number of Account rows moved
+        checksum: SHA-256 of the moved rows, verified on both copies
+        archived_at: When the year was archived (ISO timestamp)
+    """
+    __tablename__ = "ArchiveManifest"
+    
+    year = Column(Integer, primary_key=True)
+    table_name = Column(Text, nullable=False)
+    rows = Column(Integer, nullable=False)
+    checksum = Column(Text, nullable=False)
+    archived_at = Column(Text, nullable=False)
+
+
+class ArchiveOpening(Base):
+    """
+    An opening-balance transaction carried forward from an archived year.
+    
+    Opening rows stand in for the archived history in balances; reads
+    that include archived history skip them so nothing is counted twice.
+    
+    Attributes:
+        account_id: ID of the opening-balance Account row
+        year: Archived year the balance was carried from
+        children_id: Foreign key to Children
+    """
+    __tablename__ = "ArchiveOpenings"
+    
+    account_id = Column(Integer, primary_key=True, autoincrement=False)
+    year = Column(Integer, nullable=False)
+    children_id = Column(Integer, ForeignKey('Children.id'), nullable=False)
+
+
+class ImportProgress(Base):
+    """
+    How far a legacy ledger table has been imported.
+    
+    Updated in the same transaction as each imported chunk, so an
+    interrupted import resumes after the last committed chunk.
+    
+    Attributes:
+        source: Absolute path of the legacy database
+        table_name: Legacy table being read
+        last_rowid: Highest legacy rowid read so far
+        scanned: Legacy rows read
+        imported: Rows inserted (the rest were duplicates or orphans)
+        baseline: Highest Account ID before the import started; only
+            rows up to it count as duplicates of imported transactions
+        updated_at: When the last chunk was committed (ISO timestamp)
+    """
+    __tablename__ = "ImportProgress"
+    
+    source = Column(Text, primary_key=True)
+    table_name = Column(Text, primary_key=True)
+    last_rowid = Column(Integer, nullable=False, server_default="0")
+    scanned = Column(Integer, nullable=False, server_default="0")
+    imported = Column(Integer, nullable=False, server_default="0")
+    baseline = Column(Integer)
+    updated_at = Column(Text)
+
+
+class LeaderboardTotals(Base):
+    """
+    All-time leaderboard aggregates for a child.
+    
+    Maintained by triggers on Account and Members; never written directly.
+    
+    Attributes:
+        children_id: Foreign key to Children
+        balance: Sum of all transaction amounts
+        completions: Number of completed workbooks
+        best_streak: Longest run of consecutive months with a completion
+    """
+    __tablename__ = "LeaderboardTotals"
+    
+    children_id = Column(Integer, ForeignKey('Children.id'), primary_key=True)
+    balance = Column(Float, nullable=False, server_default="0")
+    completions = Column(Integer, nullable=False, server_default="0")
+    best_streak = Column(Integer, nullable=False, server_default="0")
+    
+    # Each leaderboard is an ordered index scan that stops after N rows
+    __table_args__ = (
+        Index("ix_LeaderboardTotals_balance", balance.desc(), children_id),
+        Index("ix_LeaderboardTotals_completions", completions.desc(), children_id),
+        Index("ix_LeaderboardTotals_best_streak", best_streak.desc(), children_id),
+    )
+
+
+class LeaderboardPeriods(Base):
+    """
+    Leaderboard aggregates for a child within one calendar period.
+    
+    Every transaction and completion counts towards its year (YYYY),
+    quarter (YYYY-Qn) and month (YYYY-MM). Maintained by triggers on
+    Account and Members; never written directly.
+    
+    Attributes:
+        children_id: Foreign key to Children
+        period: Period key (YYYY, YYYY-Qn or YYYY-MM)
+        net: Sum of transaction amounts in the period
+        earned: Sum of positive transaction amounts in the period
+        completions: Number of workbooks completed in the period
+    """
+    __tablename__ = "LeaderboardPeriods"
+    
+    children_id = Column(Integer, ForeignKey('Children.id'), primary_key=True)
+    period = Column(Text, primary_key=True)
+    net = Column(Float, nullable=False, server_default="0")
+    earned = Column(Float, nullable=False, server_default="0")
+    completions = Column(Integer, nullable=False, server_default="0")
+    
+    __table_args__ = (
+        Index("ix_LeaderboardPeriods_net", period, net.desc(), children_id),
+        Index("ix_LeaderboardPeriods_completions", period, completions.desc(), children_id),
+    )
+
+
+class ChildStats(Base):
+    """
+    All-time activity statistics for a child.
+    
+    Archived years stay counted and carried-forward opening balances are
+    not counted. Maintained by triggers on Account and Members; never
+    written directly (see app/stats.py to verify or rebuild).
+    
+    Attributes:
+        children_id: Foreign key to Children
+        transactions: Number of transactions
+        credits: Sum of positive transaction amounts
+        debits: Sum of negative transaction amounts, as a positive number
+        completions: Number of completed workbooks
+        last_activity: Latest transaction or completion date, or None
+    """
+    __tablename__ = "ChildStats"
+    
+    children_id = Column(Integer, ForeignKey('Children.id'), primary_key=True)
+    transactions = Column(Integer, nullable=False, server_default="0")
+    credits = Column(Float, nullable=False, server_default="0")
+    debits = Column(Float, nullable=False, server_default="0")
+    completions = Column(Integer, nullable=False, server_default="0")
+    last_activity = Column(Text)
+
+
+# Full-text search indexes
+#
+# Each index is an external-content FTS5 table: it stores only the index
+# and reads text from its source table. Triggers keep it in sync with
+# every insert, update and delete, including writes made by the legacy
+# CLI that bypasses the ORM.
+
+def _fts_ddl(index: str, table: str, column: str, tokenize: str) -> list:
+    """Build the DDL for an external-content FTS5 index and its triggers."""
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+            {column},
+            content='{table}',
+            content_rowid='id',
+            tokenize='{tokenize}'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {index} (rowid, {column}) VALUES (new.id, new.{column});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {column})
+            VALUES ('delete', old.id, old.{column});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {column} ON {table}
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {column})
+            VALUES ('delete', old.id, old.{column});
+            INSERT INTO {index} (rowid, {column}) VALUES (new.id, new.{column});
+        END""",
+    ]
+
+
+# Index name -> (source table, DDL)
+SEARCH_INDEXES = {
+    "Account_fts": ("Account", _fts_ddl("Account_fts", "Account", "description", "porter unicode61")),
+    "Workbooks_fts": ("Workbooks", _fts_ddl("Workbooks_fts", "Workbooks", "name", "trigram")),
+}
+
+# Names of the triggers keeping the indexes in sync
+SEARCH_TRIGGERS = [
+    f"{index}_{event}" for index in SEARCH_INDEXES for event in ("insert", "delete", "update")
+]
+
+
+def install_search_index(connection: Connection, table: Optional[str] = None) -> None:
+    """
+    Create missing full-text indexes.
+    
+    An index created over an existing table is rebuilt from its current
+    rows.
+    
+    Args:
+        connection: Open connection to the ledger database.
+        table: Only install indexes over this table; all tables if None.
+    """
+    for index, (source, statements) in SEARCH_INDEXES.items():
+        if table is not None and source != table:
+            continue
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {"name": index}).first()
+        for statement in statements:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text(f"INSERT INTO {index} ({index}) VALUES ('rebuild')"))
+
+
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection, target.name)
+
+
+def _drop_search_index(target, connection, **kw):
+    for index, (source, _) in SEARCH_INDEXES.items():
+        if source == target.name:
+            connection.execute(text(f"DROP TABLE IF EXISTS {index}"))
+
+
+for _table in (Account.__table__, Workbook.__table__):
+    event.listen(_table, "after_create", _create_search_index)
+    event.listen(_table, "before_drop", _drop_search_index)
+
+
+# Leaderboard aggregates
+#
+# Triggers on Account and Members keep LeaderboardTotals and
+# LeaderboardPeriods current, so leaderboards never rescan the ledger.
+
+def _period_keys(date: str) -> str:
+    """Build a subquery yielding the year, quarter and month keys of a date."""
+    return (
+        f"SELECT substr({date}, 1, 4) AS period "
+        f"UNION ALL SELECT substr({date}, 1, 4) || '-Q' || "
+        f"((CAST(substr({date}, 6, 2) AS INTEGER) + 2) / 3) "
+        f"UNION ALL SELECT substr({date}, 1, 7)"
+    )
+
+
+def _best_streak(child: str) -> str:
+    """Build a scalar subquery for a child's longest monthly completion streak."""
+    # Gaps and islands: consecutive months share month - row_number.
+    return f"""(
+        SELECT COALESCE(MAX(length), 0) FROM (
+            SELECT COUNT(*) AS length FROM (
+                SELECT month - ROW_NUMBER() OVER (ORDER BY month) AS island FROM (
+                    SELECT CAST(substr(period, 1, 4) AS INTEGER) * 12
+                           + CAST(substr(period, 6, 2) AS INTEGER) AS month
+                    FROM LeaderboardPeriods
+                    WHERE children_id = {child}
+                      AND period GLOB '????-[0-9][0-9]' AND completions > 0
+                )
+            ) GROUP BY island
+        )
+    )"""
+
+
+def _counts_in_periods(row: str) -> str:
+    """
+    SQL condition for whether an Account row moves its period aggregates.
+    
+    Opening balances carried forward by archival are not activity in the
+    period they are dated, and rows of an archived year leave the ledger
+    without changing that year's (closed) leaderboards.
+    """
+    return f"""NOT EXISTS (SELECT 1 FROM ArchiveOpenings WHERE account_id = {row}.id)
+            AND NOT EXISTS (SELECT 1 FROM ArchiveManifest
+                            WHERE year = CAST(substr({row}.date, 1, 4) AS INTEGER))"""
+
+
+def _account_delta(row: str, sign: str) -> list:
+    """Build statements adding (+) or removing (-) an Account row's amounts."""
+    return [
+        f"""INSERT INTO LeaderboardTotals (children_id, balance)
+            VALUES ({row}.children_id, {sign}{row}.amount)
+            ON CONFLICT (children_id) DO UPDATE SET balance = balance + excluded.balance""",
+        f"""INSERT INTO LeaderboardPeriods (children_id, period, net, earned)
+            SELECT {row}.children_id, period, {sign}{row}.amount, {sign}MAX({row}.amount, 0)
+            FROM ({_period_keys(f"{row}.date")})
+            WHERE period IS NOT NULL AND {_counts_in_periods(row)}
+            ON CONFLICT (children_id, period) DO UPDATE SET
+                net = net + excluded.net, earned = earned + excluded.earned""",
+    ]
+
+
+def _member_delta(row: str, sign: str) -> list:
+    """Build statements adding (+) or removing (-) a completion."""
+    return [
+        f"""INSERT INTO LeaderboardTotals (children_id, completions)
+            VALUES ({row}.children_id, {sign}1)
+            ON CONFLICT (children_id) DO UPDATE SET completions = completions + excluded.completions""",
+        f"""INSERT INTO LeaderboardPeriods (children_id, period, completions)
+            SELECT {row}.children_id, period, {sign}1
+            FROM ({_period_keys(f"{row}.date")}) WHERE period IS NOT NULL
+            ON CONFLICT (children_id, period) DO UPDATE SET
+                completions = completions + excluded.completions""",
+        f"""UPDATE LeaderboardTotals SET best_streak = {_best_streak(f"{row}.children_id")}
+            WHERE children_id = {row}.children_id""",
+    ]
+
+
+def _trigger(name: str, event_sql: str, condition: str, statements: list) -> str:
+    """Build a CREATE TRIGGER statement."""
+    body = ";\n".join(statements)
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {name} {event_sql} "
+        f"WHEN {condition}\nBEGIN\n{body};\nEND"
+    )
+
+
+# Trigger name -> DDL
+LEADERBOARD_TRIGGERS = {
+    name: _trigger(name, event_sql, condition, statements)
+    for name, event_sql, condition, statements in [
+        ("Leaderboard_account_insert", "AFTER INSERT ON Account",
+         "new.children_id IS NOT NULL", _account_delta("new", "")),
+        ("Leaderboard_account_delete", "AFTER DELETE ON Account",
+         "old.children_id IS NOT NULL", _account_delta("old", "-")),
+        ("Leaderboard_account_update", "AFTER UPDATE OF children_id, date, amount ON Account",
+         "1", _account_delta("old", "-") + _account_delta("new", "")),
+        ("Leaderboard_member_insert", "AFTER INSERT ON Members",
+         "new.children_id IS NOT NULL", _member_delta("new", "")),
+        ("Leaderboard_member_delete", "AFTER DELETE ON Members",
+         "old.children_id IS NOT NULL", _member_delta("old", "-")),
+    ]
+}
+
+LEADERBOARD_BACKFILL = [
+    "DELETE FROM LeaderboardTotals",
+    "DELETE FROM LeaderboardPeriods",
+    """INSERT INTO LeaderboardTotals (children_id, balance, completions)
+        SELECT children_id, SUM(balance), SUM(completions) FROM (
+            SELECT children_id, amount AS balance, 0 AS completions FROM Account
+            UNION ALL
+            SELECT children_id, 0, 1 FROM Members
+        ) WHERE children_id IS NOT NULL GROUP BY children_id""",
+    # Rows are summed per month first; quarters and years roll up months.
+    """INSERT INTO LeaderboardPeriods (children_id, period, net, earned, completions)
+        WITH months AS (
+            SELECT children_id, substr(date, 1, 7) AS month, SUM(net) AS net,
+                   SUM(earned) AS earned, SUM(completions) AS completions
+            FROM (
+                SELECT children_id, date, amount AS net, MAX(amount, 0) AS earned,
+                       0 AS completions FROM Account
+                WHERE id NOT IN (SELECT account_id FROM ArchiveOpenings)
+                UNION ALL
+                SELECT children_id, date, 0, 0, 1 FROM Members
+            ) WHERE children_id IS NOT NULL AND month IS NOT NULL
+            GROUP BY children_id, month
+        )
+        SELECT children_id, period, SUM(net), SUM(earned), SUM(completions) FROM (
+            SELECT children_id, substr(month, 1, 4) AS period, net, earned, completions FROM months
+            UNION ALL
+            SELECT children_id,
+                   substr(month, 1, 4) || '-Q' || ((CAST(substr(month, 6, 2) AS INTEGER) + 2) / 3),
+                   net, earned, completions FROM months
+            UNION ALL
+            SELECT children_id, month, net, earned, completions FROM months
+        ) GROUP BY children_id, period""",
+    f"UPDATE LeaderboardTotals SET best_streak = {_best_streak('LeaderboardTotals.children_id')}",
+]
+
+
+def install_leaderboards(connection: Connection) -> None:
+    """
+    Create missing leaderboard triggers.
+    
+    When the triggers are first installed the aggregate tables are rebuilt
+    from the current ledger, so bulk loaders can drop the triggers, load,
+    and call this once instead of paying for the triggers on every row.
+    
+    Args:
+        connection: Open connection to the ledger database.
+    """
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+        "AND name = 'Leaderboard_account_insert'"
+    )).first()
+    for statement in LEADERBOARD_TRIGGERS.values():
+        connection.execute(text(statement))
+    if not exists:
+        for statement in LEADERBOARD_BACKFILL:
+            connection.execute(text(statement))
+
+
+# Child statistics
+#
+# Triggers on Account and Members keep ChildStats current, including for
+# rows written by the legacy CLI. Opening balances never count, and rows
+# leaving the ledger for the archive keep counting.
+
+def _is_opening(row: str) -> str:
+    """SQL condition for whether an Account row is a carried-forward opening balance."""
+    return f"EXISTS (SELECT 1 FROM ArchiveOpenings WHERE account_id = {row}.id)"
+
+
+def _latest(current: str, candidate: str) -> str:
+    """SQL expression for the later of two dates, either of which may be NULL."""
+    return f"CASE WHEN {current} IS NULL OR {candidate} > {current} THEN {candidate} ELSE {current} END"
+
+
+def _last_activity(child: str) -> str:
+    """Build a scalar subquery for a child's latest transaction or completion date."""
+    return f"""(
+        SELECT MAX(date) FROM (
+            SELECT MAX(date) AS date FROM Account
+            WHERE children_id = {child} AND id NOT IN (SELECT account_id FROM ArchiveOpenings)
+            UNION ALL
+            SELECT MAX(date) FROM Members WHERE children_id = {child}
+        )
+    )"""
+
+
+def _stats_account_delta(row: str, sign: str) -> str:
+    """Build a statement adding (+) or removing (-) an Account row's counts."""
+    amount = f"COALESCE({row}.amount, 0)"
+    return f"""INSERT INTO ChildStats (children_id, transactions, credits, debits, last_activity)
+        VALUES ({row}.children_id, {sign}1, {sign}MAX({amount}, 0), {sign}MAX(-{amount}, 0), {row}.date)
+        ON CONFLICT (children_id) DO UPDATE SET
+            transactions = transactions + excluded.transactions,
+            credits = credits + excluded.credits,
+            debits = debits + excluded.debits,
+            last_activity = {_latest("last_activity", "excluded.last_activity") if not sign else "last_activity"}"""
+
+
+def _stats_member_delta(row: str, sign: str) -> str:
+    """Build a statement adding (+) or removing (-) a completion's counts."""
+    return f"""INSERT INTO ChildStats (children_id, completions, last_activity)
+        VALUES ({row}.children_id, {sign}1, {row}.date)
+        ON CONFLICT (children_id) DO UPDATE SET
+            completions = completions + excluded.completions,
+            last_activity = {_latest("last_activity", "excluded.last_activity") if not sign else "last_activity"}"""
+
+
+def _stats_refresh_last_activity(row: str) -> str:
+    """Build a statement recomputing a child's last activity after a removal."""
+    return (
+        f"UPDATE ChildStats SET last_activity = {_last_activity(f'{row}.children_id')} "
+        f"WHERE children_id = {row}.children_id"
+    )
+
+
+# Trigger name -> DDL
+CHILD_STATS_TRIGGERS = {
+    name: _trigger(name, event_sql, condition, statements)
+    for name, event_sql, condition, statements in [
+        ("ChildStats_account_insert", "AFTER INSERT ON Account",
+         f"new.children_id IS NOT NULL AND NOT {_is_opening('new')}",
+         [_stats_account_delta("new", "")]),
+        ("ChildStats_account_delete", "AFTER DELETE ON Account",
+         f"old.children_id IS NOT NULL AND {_counts_in_periods('old')}",
+         [_stats_account_delta("old", "-"), _stats_refresh_last_activity("old")]),
+        ("ChildStats_account_update", "AFTER UPDATE OF children_id, date, amount ON Account",
+         f"old.children_id IS NOT NULL AND new.children_id IS NOT NULL AND NOT {_is_opening('new')}",
+         [_stats_account_delta("old", "-"), _stats_account_delta("new", ""),
+          _stats_refresh_last_activity("old"), _stats_refresh_last_activity("new")]),
+        ("ChildStats_member_insert", "AFTER INSERT ON Members",
+         "new.children_id IS NOT NULL", [_stats_member_delta("new", "")]),
+        ("ChildStats_member_delete", "AFTER DELETE ON Members",
+         "old.children_id IS NOT NULL",
+         [_stats_member_delta("old", "-"), _stats_refresh_last_activity("old")]),
+    ]
+}
+
+# Statistics recomputed from the ledger, as (children_id, transactions,
+# credits, debits, completions, last_activity) rows. {account} is the
+# Account-shaped source, so app/stats.py can include archived years.
+CHILD_STATS_QUERY = """
+    SELECT children_id, SUM(transactions), SUM(credits), SUM(debits), SUM(completions), MAX(date)
+    FROM (
+        SELECT children_id, 1 AS transactions, MAX(COALESCE(amount, 0), 0) AS credits,
+               MAX(-COALESCE(amount, 0), 0) AS debits, 0 AS completions, date
+        FROM {account}
+        WHERE id NOT IN (SELECT account_id FROM main.ArchiveOpenings)
+        UNION ALL
+        SELECT children_id, 0, 0, 0, 1, date FROM main.Members
+    )
+    WHERE children_id IS NOT NULL
+    GROUP BY children_id
+"""
+
+CHILD_STATS_BACKFILL = [
+    "DELETE FROM ChildStats",
+    "INSERT INTO ChildStats (children_id, transactions, credits, debits, completions, last_activity)"
+    + CHILD_STATS_QUERY.format(account="main.Account"),
+]
+
+
+def install_child_stats(connection: Connection) -> None:
+    """
+    Create missing child statistics triggers.
+    
+    When the triggers are first installed the statistics are computed
+    from the current ledger (archived years are added by
+    ``python -m app.stats --rebuild``).
+    
+    Args:
+        connection: Open connection to the ledger database.
+    """
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+        "AND name = 'ChildStats_account_insert'"
+    )).first()
+    for statement in CHILD_STATS_TRIGGERS.values():
+        connection.execute(text(statement))
+    if not exists:
+        for statement in CHILD_STATS_BACKFILL:
+            connection.execute(text(statement))
+
+
+# Workbook facets
+#
+# The title is parsed in SQL so the triggers and the backfill share one
+# definition and titles added by the legacy CLI are covered too.
+
+def _facet_values(name: str) -> str:
+    """Build SELECT expressions for the grade and subject of a title."""
+    graded = f"(lower(substr({name}, 1, 6)) = 'grade ' AND substr({name}, 7, 1) GLOB '[0-9]')"
+    # Title after "Grade N ", then without any " Volume N" suffix
+    rest = f"trim(substr({name}, 7 + length(CAST(CAST(substr({name}, 7) AS INTEGER) AS TEXT))))"
+    subject = (
+        f"CASE WHEN instr({rest}, ' Volume ') > 0 "
+        f"THEN substr({rest}, 1, instr({rest}, ' Volume ') - 1) ELSE {rest} END"
+    )
+    return (
+        f"CASE WHEN {graded} THEN CAST(substr({name}, 7) AS INTEGER) END, "
+        f"CASE WHEN {graded} THEN NULLIF({subject}, '') END"
+    )
+
+
+FACET_TRIGGERS = {
+    "WorkbookFacets_insert": f"""CREATE TRIGGER IF NOT EXISTS WorkbookFacets_insert
+        AFTER INSERT ON Workbooks
+        BEGIN
+            INSERT OR REPLACE INTO WorkbookFacets (workbook_id, grade, subject)
+            SELECT new.id, {_facet_values("new.name")};
+        END""",
+    "WorkbookFacets_update": f"""CREATE TRIGGER IF NOT EXISTS WorkbookFacets_update
+        AFTER UPDATE OF name ON Workbooks
+        BEGIN
+            INSERT OR REPLACE INTO WorkbookFacets (workbook_id, grade, subject)
+            SELECT new.id, {_facet_values("new.name")};
+        END""",
+    "WorkbookFacets_delete": """CREATE TRIGGER IF NOT EXISTS WorkbookFacets_delete
+        AFTER DELETE ON Workbooks
+        BEGIN
+            DELETE FROM WorkbookFacets WHERE workbook_id = old.id;
+        END""",
+}
+
+FACET_BACKFILL = [
+    "DELETE FROM WorkbookFacets",
+    f"""INSERT INTO WorkbookFacets (workbook_id, grade, subject)
+        SELECT id, {_facet_values("name")} FROM Workbooks""",
+]
+
+
+def install_workbook_facets(connection: Connection) -> None:
+    """
+    Create missing workbook facet triggers.
+    
+    When the triggers are first installed every existing title is parsed.
+    
+    Args:
+        connection: Open connection to the ledger database.
+    """
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+        "AND name = 'WorkbookFacets_insert'"
+    )).first()
+    for statement in FACET_TRIGGERS.values():
+        connection.execute(text(statement))
+    if not exists:
+        for statement in FACET_BACKFILL:
+            connection.execute(text(statement))
+
+
+def _install_derived_tables(target, connection, **kw):
+    install_leaderboards(connection)
+    install_child_stats(connection)
+    install_workbook_facets(connection)
 
 
+event.listen(Base.metadata, "after_create", _install_derived_tables)
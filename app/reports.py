@@ -0,0 +1,293 @@
+"""
+Organization-wide reports across many household ledgers.
+
+Each household's ledger file is summarized by a worker process that opens
+it read-only, runs a few aggregate queries inside one short read
+transaction and returns a partial result; the parent streams the
+partials as they finish and merges them into the report total. With WAL
+journaling readers never block a household's writer, and no file is
+open for longer than its own queries take.
+
+Only the standard library is imported at module level so spawned worker
+processes start quickly.
+
+Usage:
+    python -m app.reports balances                 # every tenant ledger
+    python -m app.reports grades --processes 8
+    python -m app.reports balances a.sqlite b.sqlite --ndjson
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing import get_context
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Report name -> (value name, query); single-value queries return one row
+# with one column, keyed queries return (key, value) rows.
+REPORTS = {
+    "balances": [
+        ("children", "SELECT COUNT(*) FROM Children"),
+        ("balance", "SELECT round(COALESCE(SUM(balance), 0), 2) FROM LeaderboardTotals"),
+        ("in_debt", "SELECT COUNT(*) FROM LeaderboardTotals WHERE balance < 0"),
+        ("transactions", "SELECT COUNT(*) FROM Account"),
+    ],
+    "grades": [
+        ("completions", "SELECT COUNT(*) FROM Members"),
+        ("by_grade", """
+            SELECT COALESCE(CAST(f.grade AS TEXT), 'ungraded'), COUNT(*)
+            FROM Members AS m
+            JOIN WorkbookFacets AS f ON f.workbook_id = m.workbooks_id
+            GROUP BY f.grade
+        """),
+    ],
+}
+
+# Values whose query returns (key, value) rows
+KEYED_VALUES = {"by_grade"}
+
+# Worker processes, defaulting to one per core
+DEFAULT_PROCESSES = int(os.environ.get("LEDGER_REPORT_PROCESSES", "0")) or os.cpu_count() or 1
+
+# Seconds a worker waits on a busy ledger before reporting an error
+BUSY_TIMEOUT_SECONDS = 5
+
+# Bearer token operators send to read reports over HTTP; without one the
+# routes are refused under LEDGER_TENANT_MODE (see app/routers/reports.py)
+REPORT_TOKEN = os.environ.get("LEDGER_REPORT_TOKEN", "")
+
+
+def household_name(path: str) -> str:
+    """Name a household after its ledger file."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def summarize(path: str, report: str) -> dict:
+    """
+    Compute one household's partial report; runs in a worker process.
+    
+    Args:
+        path: Ledger file.
+        report: Report name in REPORTS.
+    
+    Returns:
+        dict: household and values, or household and error if the
+            ledger could not be read.
+    """
+    partial: Dict[str, Any] = {"household": household_name(path)}
+    try:
+        connection = sqlite3.connect(
+            f"file:{os.path.abspath(path)}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_SECONDS
+        )
+    except sqlite3.Error as e:
+        partial["error"] = str(e)
+        return partial
+    try:
+        values: Dict[str, Any] = {}
+        # One read transaction, so the values are a consistent snapshot
+        connection.execute("BEGIN")
+        for name, query in REPORTS[report]:
+            rows = connection.execute(query).fetchall()
+            if name in KEYED_VALUES:
+                values[name] = {str(key): value for key, value in rows}
+            else:
+                values[name] = rows[0][0]
+        connection.execute("COMMIT")
+        partial["values"] = values
+    except sqlite3.Error as e:
+        partial["error"] = str(e)
+    finally:
+        connection.close()
+    return partial
+
+
+def merge(partials: Iterable[dict]) -> dict:
+    """
+    Merge partial reports into a total.
+    
+    Numbers are summed; keyed values are summed per key.
+    
+    Args:
+        partials: Results of ``summarize``.
+    
+    Returns:
+        dict: households (merged), errors (household names) and values.
+    """
+    total: Dict[str, Any] = {}
+    households = 0
+    errors = []
+    for partial in partials:
+        if "error" in partial:
+            errors.append(partial["household"])
+            continue
+        households += 1
+        for name, value in partial["values"].items():
+            if isinstance(value, dict):
+                merged = total.setdefault(name, {})
+                for key, count in value.items():
+                    merged[key] = merged.get(key, 0) + count
+            else:
+                total[name] = total.get(name, 0) + value
+    if isinstance(total.get("balance"), float):
+        total["balance"] = round(total["balance"], 2)
+    return {"households": households, "errors": sorted(errors), "values": total}
+
+
+def ledger_files(directory: Optional[str] = None) -> List[str]:
+    """
+    Find the household ledgers to report on.
+    
+    Args:
+        directory: Tenant directory, defaults to LEDGER_TENANT_DIR.
+    
+    Returns:
+        List[str]: Ledger files, or the single application database when
+            no tenant ledgers exist.
+    """
+    from app import tenants
+    from app.database import database_path, engine
+    
+    tenant_engines = tenants.TenantEngines(directory or tenants.TENANT_DIR)
+    paths = [tenants.tenant_path(name, tenant_engines.directory) for name in tenant_engines.tenants()]
+    path = database_path(engine)
+    if not paths and path:
+        paths = [path]
+    return paths
+
+
+def summarize_many(paths: Sequence[str], report: str) -> List[dict]:
+    """Summarize a chunk of ledgers; one pool task per chunk."""
+    return [summarize(path, report) for path in paths]
+
+
+_pool_instance: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _pool() -> ProcessPoolExecutor:
+    """
+    Get the shared pool of DEFAULT_PROCESSES workers, started on first use.
+    
+    Workers are spawned rather than forked: the server process has
+    threads and open database connections that must not be copied.
+    """
+    global _pool_instance
+    with _pool_lock:
+        if _pool_instance is None:
+            _pool_instance = ProcessPoolExecutor(
+                max_workers=DEFAULT_PROCESSES, mp_context=get_context("spawn")
+            )
+        return _pool_instance
+
+
+def shutdown_pool() -> None:
+    """Stop the worker pool."""
+    global _pool_instance
+    with _pool_lock:
+        pool, _pool_instance = _pool_instance, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def fan_out(paths: Sequence[str], report: str, processes: Optional[int] = None) -> Iterator[dict]:
+    """
+    Summarize ledgers in parallel, yielding partials as they finish.
+    
+    Ledgers are handed out in chunks (about four per worker) so the
+    per-task overhead stays small however many households there are.
+    Every report shares one pool; ``processes`` only limits how many of
+    its chunks are in flight at once.
+    
+    Args:
+        paths: Ledger files.
+        report: Report name in REPORTS.
+        processes: Chunks in flight, capped at DEFAULT_PROCESSES; with one
+            (or one ledger) the work runs in this process.
+    
+    Yields:
+        dict: Partial result per ledger, in completion order.
+    
+    Raises:
+        ValueError: If the report is unknown.
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report: {report}")
+    workers = min(processes or DEFAULT_PROCESSES, DEFAULT_PROCESSES, len(paths))
+    if workers <= 1:
+        for path in paths:
+            yield summarize(path, report)
+        return
+    
+    size = max(1, len(paths) // (workers * 4))
+    chunks = (paths[i:i + size] for i in range(0, len(paths), size))
+    pool = _pool()
+    pending = {pool.submit(summarize_many, chunk, report) for chunk in islice(chunks, workers)}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for chunk in islice(chunks, len(done)):
+                pending.add(pool.submit(summarize_many, chunk, report))
+            for future in done:
+                yield from future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def stream(paths: Sequence[str], report: str, processes: Optional[int] = None) -> Iterator[dict]:
+    """
+    Yield each household's partial, then the merged total.
+    
+    Args:
+        paths: Ledger files.
+        report: Report name in REPORTS.
+        processes: Chunks in flight, capped at DEFAULT_PROCESSES.
+    
+    Yields:
+        dict: {"type": "household", ...} per ledger, then
+            {"type": "total", ...}.
+    
+    Raises:
+        ValueError: If the report is unknown.
+    """
+    partials = []
+    for partial in fan_out(paths, report, processes):
+        partials.append(partial)
+        yield {"type": "household", **partial}
+    yield {"type": "total", "report": report, **merge(partials)}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Report across household ledgers")
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("paths", nargs="*", help="ledger files, defaults to every tenant")
+    parser.add_argument("--dir", help="tenant directory")
+    parser.add_argument("--processes", type=int, help="worker processes, at most LEDGER_REPORT_PROCESSES")
+    parser.add_argument("--ndjson", action="store_true", help="print every partial as JSON lines")
+    args = parser.parse_args(argv)
+    
+    paths = args.paths or ledger_files(args.dir)
+    for line in stream(paths, args.report, args.processes):
+        if args.ndjson:
+            print(json.dumps(line), flush=True)
+        elif line["type"] == "total":
+            print(json.dumps(line, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
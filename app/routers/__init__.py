@@ -0,0 +1,5 @@
+"""
+Feature routers.
+
+Each module defines a ``router`` that ``app.main.create_app`` includes.
+"""
@@ -0,0 +1,95 @@
+"""
+Bulk posting routes.
+
+Provides fan-out posting of one transaction to many children and the
+management API for recurring allowance rules.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.database import get_db
+
+router = APIRouter()
+
+
+@router.post("/api/transactions/fanout", response_model=schemas.FanoutResult)
+def api_fanout_transaction(
+    fanout: schemas.TransactionFanout,
+    db: Session = Depends(get_db)
+):
+    """
+    API endpoint posting one transaction to many children in one commit.
+    
+    Args:
+        fanout: Transaction data and child IDs; omit children_ids to post
+            to every child.
+        db: Database session.
+    
+    Returns:
+        schemas.FanoutResult: Number of transactions created.
+    
+    Raises:
+        HTTPException: If any child ID does not exist.
+    """
+    if fanout.children_ids is not None:
+        missing = crud.get_missing_children(db, fanout.children_ids)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Children not found: {missing}")
+    return {"posted": crud.create_fanout_transactions(db, fanout)}
+
+
+@router.get("/api/allowance-rules", response_model=List[schemas.AllowanceRuleResponse])
+async def api_get_allowance_rules(db: Session = Depends(get_db)):
+    """
+    API endpoint listing allowance rules.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[schemas.AllowanceRuleResponse]: Rules by next posting date.
+    """
+    return crud.get_allowance_rules(db)
+
+
+@router.post("/api/allowance-rules", response_model=schemas.AllowanceRuleResponse, status_code=201)
+def api_create_allowance_rule(
+    rule: schemas.AllowanceRuleCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    API endpoint creating a recurring allowance.
+    
+    Args:
+        rule: Rule data; omit children_id to pay every child.
+        db: Database session.
+    
+    Returns:
+        schemas.AllowanceRuleResponse: Created rule.
+    
+    Raises:
+        HTTPException: If the child does not exist.
+    """
+    if rule.children_id is not None and not crud.lookup_child(db, rule.children_id):
+        raise HTTPException(status_code=404, detail="Child not found")
+    return crud.create_allowance_rule(db, rule)
+
+
+@router.delete("/api/allowance-rules/{rule_id}", status_code=204)
+def api_delete_allowance_rule(rule_id: int, db: Session = Depends(get_db)):
+    """
+    API endpoint deleting an allowance rule.
+    
+    Args:
+        rule_id: Rule ID.
+        db: Database session.
+    
+    Raises:
+        HTTPException: If the rule does not exist.
+    """
+    if not crud.delete_allowance_rule(db, rule_id):
+        raise HTTPException(status_code=404, detail="Allowance rule not found")
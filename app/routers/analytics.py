@@ -0,0 +1,100 @@
+"""
+Ledger analytics routes.
+
+Serves reports computed by the columnar engine in app/analytics.py.
+NumPy is imported on first use so it does not slow application startup.
+With LEDGER_REPORT_SNAPSHOT=1 the reports read the latest backup snapshot.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.backup import get_report_db
+
+router = APIRouter(prefix="/api/analytics")
+
+
+def _columns(db: Session):
+    """Load the refreshed columnar ledger."""
+    from app import analytics
+    return analytics, analytics.get_columns(db)
+
+
+@router.get("/monthly-spend")
+def api_monthly_spend(child_id: Optional[int] = None, db: Session = Depends(get_report_db)):
+    """
+    API endpoint for total purchases per child per month.
+    
+    Args:
+        child_id: Optional child to report on.
+        db: Database session.
+        
+    Returns:
+        list: child_id, month and spend rows.
+    """
+    analytics, columns = _columns(db)
+    return analytics.monthly_spend(columns, child_id=child_id)
+
+
+@router.get("/reward-ratio")
+def api_reward_ratio(db: Session = Depends(get_report_db)):
+    """
+    API endpoint comparing rewards with purchases for every child.
+    
+    Args:
+        db: Database session.
+        
+    Returns:
+        list: child_id, rewards, purchases and ratio rows.
+    """
+    analytics, columns = _columns(db)
+    return analytics.reward_ratio(columns)
+
+
+@router.get("/rolling-net")
+def api_rolling_net(
+    child_id: Optional[int] = None,
+    window: int = Query(90, ge=1, le=3660),
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    db: Session = Depends(get_report_db)
+):
+    """
+    API endpoint for the net amount over a trailing window of days.
+    
+    Args:
+        child_id: Optional child to report on; all children if omitted.
+        window: Window length in days.
+        start: First day reported (YYYY-MM-DD).
+        end: Last day reported (YYYY-MM-DD).
+        db: Database session.
+        
+    Returns:
+        list: date and net rows, one per day.
+    """
+    analytics, columns = _columns(db)
+    try:
+        return analytics.rolling_net(columns, child_id=child_id, window=window, start=start, end=end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/percentiles")
+def api_percentiles(
+    metric: str = Query("balance", pattern="^(balance|credit|debit)$"),
+    db: Session = Depends(get_report_db)
+):
+    """
+    API endpoint for p50/p90/p99 of balances or transaction sizes.
+    
+    Args:
+        metric: "balance", "credit" or "debit".
+        db: Database session.
+        
+    Returns:
+        dict: Values keyed by percentile.
+    """
+    analytics, columns = _columns(db)
+    return analytics.percentiles(columns, metric=metric)
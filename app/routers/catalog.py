@@ -0,0 +1,58 @@
+"""
+Workbook catalog routes.
+
+Provides the autocomplete API used by the workbook completion form and
+per-child progress by grade and subject.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import catalog, crud, schemas
+from app.database import get_db
+
+router = APIRouter()
+
+
+@router.get("/api/workbooks/suggest", response_model=List[schemas.WorkbookResponse])
+async def api_suggest_workbooks(
+    q: str = Query(..., min_length=1, max_length=200),
+    child_id: Optional[int] = None,
+    limit: int = Query(catalog.DEFAULT_SUGGESTIONS, ge=1, le=catalog.MAX_SUGGESTIONS),
+    db: Session = Depends(get_db)
+):
+    """
+    API endpoint suggesting workbooks for partially typed titles.
+    
+    Args:
+        q: Text typed so far.
+        child_id: Optional child whose completed workbooks are skipped.
+        limit: Maximum number of suggestions.
+        db: Database session.
+    
+    Returns:
+        List[schemas.WorkbookResponse]: Best matching workbooks.
+    """
+    return catalog.suggest_workbooks(db, q, child_id=child_id, limit=limit)
+
+
+@router.get("/api/child/{child_id}/progress", response_model=List[schemas.FacetProgress])
+async def api_child_progress(child_id: int, db: Session = Depends(get_db)):
+    """
+    API endpoint for a child's completions by grade and subject.
+    
+    Args:
+        child_id: Child ID.
+        db: Database session.
+    
+    Returns:
+        List[schemas.FacetProgress]: Completed and total workbooks per facet.
+    
+    Raises:
+        HTTPException: If child not found.
+    """
+    if not crud.lookup_child(db, child_id):
+        raise HTTPException(status_code=404, detail="Child not found")
+    return catalog.child_progress(db, child_id)
@@ -0,0 +1,79 @@
+"""
+Live dashboard routes.
+
+Streams a child's change events as Server-Sent Events. An idle stream
+only waits on its in-process queue; it never queries the database.
+"""
+
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.database import get_db, session_engine
+from app.events import Subscription, broker
+
+router = APIRouter()
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15.0
+
+# Milliseconds a disconnected browser waits before reconnecting
+RETRY_MILLISECONDS = 3000
+
+
+async def event_stream(subscription: Subscription) -> AsyncIterator[str]:
+    """
+    Format a subscription's events as an SSE stream.
+    
+    Args:
+        subscription: Open subscription; closed when the stream ends.
+    
+    Yields:
+        str: SSE frames.
+    """
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
+
+
+@router.get("/api/child/{child_id}/events")
+async def api_child_events(child_id: int, db: Session = Depends(get_db)):
+    """
+    API endpoint streaming a child's transactions and completions.
+    
+    Emits "transaction" events (with the new balance), "completion"
+    events, and "resync" when the client fell too far behind and should
+    reload.
+    
+    Args:
+        child_id: Child ID.
+        db: Database session.
+    
+    Returns:
+        StreamingResponse: text/event-stream response.
+    
+    Raises:
+        HTTPException: If child not found.
+    """
+    if not crud.lookup_child(db, child_id):
+        raise HTTPException(status_code=404, detail="Child not found")
+    scope = str(session_engine(db).url)
+    # The dependency would otherwise hold a pooled connection until the
+    # stream ends.
+    db.close()
+    return StreamingResponse(
+        event_stream(broker.subscribe(child_id, scope=scope)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,91 @@
+"""
+Savings interest routes.
+
+Previews and posts monthly interest computed by app/interest.py. The
+engine (and NumPy) is imported on first use so it does not slow
+application startup.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.database import get_db
+
+router = APIRouter(prefix="/api/interest")
+
+
+@router.get("/runs", response_model=List[schemas.InterestRunResponse])
+def api_interest_runs(db: Session = Depends(get_db)):
+    """
+    API endpoint listing months for which interest was posted.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[schemas.InterestRunResponse]: Runs by month.
+    """
+    from app import interest
+    return interest.get_runs(db)
+
+
+@router.get("/{period}", response_model=List[schemas.InterestPayout])
+def api_preview_interest(
+    period: str,
+    rate: float = Query(None, ge=0, le=1),
+    db: Session = Depends(get_db)
+):
+    """
+    API endpoint previewing a month's interest without posting it.
+    
+    Args:
+        period: Month (YYYY-MM).
+        rate: Annual rate, defaults to LEDGER_INTEREST_RATE.
+        db: Database session.
+    
+    Returns:
+        List[schemas.InterestPayout]: Interest owed per child.
+    
+    Raises:
+        HTTPException: If the period is malformed.
+    """
+    from app import analytics, interest
+    try:
+        return interest.compute_interest(
+            analytics.get_columns(db), period, interest.DEFAULT_RATE if rate is None else rate
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{period}", response_model=schemas.InterestRunResponse, status_code=201)
+def api_post_interest(
+    period: str,
+    rate: float = Query(None, ge=0, le=1),
+    db: Session = Depends(get_db)
+):
+    """
+    API endpoint posting a month's interest to every child.
+    
+    Args:
+        period: Month (YYYY-MM); must have ended.
+        rate: Annual rate, defaults to LEDGER_INTEREST_RATE.
+        db: Database session.
+    
+    Returns:
+        schemas.InterestRunResponse: The new run.
+    
+    Raises:
+        HTTPException: If the period is invalid or was already paid.
+    """
+    from app import interest
+    try:
+        run = interest.post_interest(db, period, interest.DEFAULT_RATE if rate is None else rate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if run is None:
+        raise HTTPException(status_code=409, detail=f"Interest for {period} was already posted")
+    return run
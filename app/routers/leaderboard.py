@@ -0,0 +1,46 @@
+"""
+Leaderboard routes.
+
+Provides top-N boards for savers, workbook completions and streaks.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import leaderboard, schemas
+from app.database import get_db
+
+router = APIRouter()
+
+
+@router.get("/api/leaderboards/{board}", response_model=List[schemas.LeaderboardEntry])
+async def api_leaderboard(
+    board: str,
+    period: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=leaderboard.MAX_ENTRIES),
+    db: Session = Depends(get_db)
+):
+    """
+    API endpoint for a top-N leaderboard.
+    
+    Args:
+        board: "savers", "completions" or "streaks".
+        period: "all" (default), "year", "term", "month", or an explicit
+            YYYY, YYYY-Qn or YYYY-MM period.
+        limit: Number of entries.
+        db: Database session.
+    
+    Returns:
+        List[schemas.LeaderboardEntry]: Top entries, best first.
+    
+    Raises:
+        HTTPException: If the board is unknown or the period is invalid.
+    """
+    if board not in leaderboard.BOARDS:
+        raise HTTPException(status_code=404, detail="Leaderboard not found")
+    try:
+        return leaderboard.top(db, board, period=period, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,74 @@
+"""
+Cross-household report routes.
+
+Streams organization-wide reports as newline-delimited JSON: one line
+per household as its ledger is summarized, then the merged total.
+
+The reports name every household, so they are for operators only: when
+LEDGER_REPORT_TOKEN is set callers must send it as a bearer token, and
+under LEDGER_TENANT_MODE without a token the routes are refused.
+"""
+
+import json
+import secrets
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app import reports, tenants
+
+
+def require_operator(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Admit only callers allowed to read every household.
+    
+    Args:
+        authorization: Authorization request header.
+    
+    Raises:
+        HTTPException: 403 if the operator token is missing or wrong, or
+            if households are served and no token is configured.
+    """
+    if not reports.REPORT_TOKEN:
+        if tenants.TENANT_MODE:
+            raise HTTPException(status_code=403, detail="Cross-household reports are disabled")
+        return
+    expected = f"Bearer {reports.REPORT_TOKEN}"
+    if not secrets.compare_digest((authorization or "").encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Operator token required")
+
+
+router = APIRouter(dependencies=[Depends(require_operator)])
+
+
+def _ndjson(lines: Iterator[dict]) -> Iterator[str]:
+    """Encode report lines as newline-delimited JSON."""
+    for line in lines:
+        yield json.dumps(line) + "\n"
+
+
+@router.get("/api/reports/{report}")
+def api_report(report: str, processes: Optional[int] = Query(None, ge=1, le=64)):
+    """
+    API endpoint for a report across every household ledger.
+    
+    Args:
+        report: "balances" or "grades".
+        processes: Ledger chunks summarized at once on the shared worker
+            pool, at most LEDGER_REPORT_PROCESSES.
+    
+    Returns:
+        StreamingResponse: application/x-ndjson lines of type "household"
+            followed by one of type "total".
+    
+    Raises:
+        HTTPException: If the report is unknown.
+    """
+    if report not in reports.REPORTS:
+        raise HTTPException(status_code=404, detail="Report not found")
+    paths = reports.ledger_files()
+    return StreamingResponse(
+        _ndjson(reports.stream(paths, report, processes)),
+        media_type="application/x-ndjson"
+    )
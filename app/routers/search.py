@@ -0,0 +1,66 @@
+"""
+Transaction search routes.
+
+Provides the JSON search API and the search results page.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy.orm import Session
+
+from app import crud, schemas, search
+from app.database import get_db
+from app.templating import templates
+
+router = APIRouter()
+
+
+@router.get("/api/search/transactions", response_model=List[schemas.TransactionSearchResult])
+async def api_search_transactions(
+    q: str = Query(..., min_length=1, max_length=200),
+    child_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=search.MAX_RESULTS),
+    db: Session = Depends(get_db)
+):
+    """
+    API endpoint for ranked full-text search over transaction descriptions.
+    
+    Args:
+        q: Search text.
+        child_id: Optional child to restrict results to.
+        limit: Maximum number of results.
+        db: Database session.
+        
+    Returns:
+        List[schemas.TransactionSearchResult]: Matches, most relevant first.
+    """
+    return search.search_transactions(db, q, child_id=child_id, limit=limit)
+
+
+@router.get("/search", response_class=HTMLResponse)
+async def search_page(
+    request: Request,
+    q: str = "",
+    child_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Search results page.
+    
+    Args:
+        request: FastAPI request object.
+        q: Search text.
+        child_id: Optional child to restrict results to.
+        db: Database session.
+        
+    Returns:
+        HTMLResponse: Rendered search results template.
+    """
+    results = search.search_transactions(db, q, child_id=child_id, limit=search.MAX_RESULTS)
+    child = crud.lookup_child(db, child_id) if child_id is not None else None
+    return templates.TemplateResponse(
+        "search.html",
+        {"request": request, "q": q, "child": child, "results": results}
+    )
@@ -0,0 +1,51 @@
+"""
+Activity statistics routes.
+
+Serves the trigger-maintained per-child statistics.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import schemas, stats
+from app.database import get_db
+
+router = APIRouter()
+
+
+@router.get("/api/stats", response_model=List[schemas.ChildStatsResponse])
+async def api_get_stats(db: Session = Depends(get_db)):
+    """
+    API endpoint listing every child's activity statistics.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[schemas.ChildStatsResponse]: Statistics by child ID.
+    """
+    return stats.get_stats(db)
+
+
+@router.get("/api/child/{child_id}/stats", response_model=schemas.ChildStatsResponse)
+async def api_get_child_stats(child_id: int, db: Session = Depends(get_db)):
+    """
+    API endpoint for one child's activity statistics.
+    
+    Args:
+        child_id: Child ID.
+        db: Database session.
+    
+    Returns:
+        schemas.ChildStatsResponse: Transaction count, credits, debits,
+            completions and last activity date.
+    
+    Raises:
+        HTTPException: If child not found.
+    """
+    rows = stats.get_stats(db, child_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Child not found")
+    return rows[0]
@@ -0,0 +1,235 @@
+"""
+Recurring allowance scheduler.
+
+Posts the transactions of every due AllowanceRule. Each due date of a
+rule is posted to all its children with one INSERT ... SELECT, and rules
+are processed in batches with one commit per batch.
+
+Every server worker runs the scheduler in the background and cron can
+run it too, so postings must happen exactly once: a rule is claimed by
+moving its next_date forward with a conditional UPDATE, and only the
+process whose UPDATE matched posts that date.
+
+Usage:
+    python -m app.scheduler [--date YYYY-MM-DD] [--batch-size 100]
+"""
+
+import argparse
+import asyncio
+import calendar
+import logging
+import os
+import sys
+from contextlib import suppress
+from datetime import date, timedelta
+from typing import Optional, Sequence, Tuple, cast
+
+from sqlalchemy import text
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from app import crud, models, tenants
+from app.database import SessionLocal, init_db, serialized_write
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background runs; 0 disables the background scheduler
+SCHEDULER_INTERVAL_SECONDS = float(os.environ.get("LEDGER_SCHEDULER_INTERVAL", "3600"))
+
+# Rules processed per transaction
+DEFAULT_BATCH_SIZE = 100
+
+
+def next_occurrence(current: str, frequency: str) -> str:
+    """
+    Get the posting date after the given one.
+    
+    Args:
+        current: Posting date (YYYY-MM-DD).
+        frequency: "weekly" or "monthly".
+    
+    Returns:
+        str: Next posting date (YYYY-MM-DD).
+    
+    Raises:
+        ValueError: If the frequency is unknown.
+    """
+    day = date.fromisoformat(current)
+    if frequency == "weekly":
+        return (day + timedelta(days=7)).isoformat()
+    if frequency == "monthly":
+        year, month = divmod(day.year * 12 + day.month, 12)
+        month += 1
+        last_day = calendar.monthrange(year, month)[1]
+        return date(year, month, min(day.day, last_day)).isoformat()
+    raise ValueError(f"Unknown frequency: {frequency}")
+
+
+@serialized_write
+def _run_batch(db: Session, today: str, after_id: int, batch_size: int) -> Tuple[int, int, int]:
+    """
+    Post due dates for one batch of rules in a single transaction.
+    
+    Args:
+        db: Database session.
+        today: Post every occurrence on or before this date.
+        after_id: Only consider rules with a higher ID.
+        batch_size: Maximum rules in the batch.
+    
+    Returns:
+        Tuple[int, int, int]: Rules read, transactions posted, last rule ID.
+    """
+    rules = db.query(*models.AllowanceRule.__table__.c).filter(
+        models.AllowanceRule.next_date <= today,
+        models.AllowanceRule.id > after_id
+    ).order_by(models.AllowanceRule.id).limit(batch_size).all()
+    
+    last_posted_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM Account")).scalar_one()
+    posted = 0
+    for rule in rules:
+        dates = []
+        upcoming = rule.next_date
+        while upcoming <= today:
+            dates.append(upcoming)
+            upcoming = next_occurrence(upcoming, rule.frequency)
+        
+        claimed = cast(CursorResult, db.execute(text(
+            "UPDATE AllowanceRules SET next_date = :upcoming "
+            "WHERE id = :id AND next_date = :current"
+        ), {"upcoming": upcoming, "id": rule.id, "current": rule.next_date})).rowcount
+        if not claimed:
+            # Another worker posted these dates first.
+            continue
+        
+        where = "WHERE id = :child" if rule.children_id is not None else ""
+        for posting_date in dates:
+            posted += cast(CursorResult, db.execute(text(f"""
+                INSERT INTO Account (children_id, date, description, amount)
+                SELECT id, :date, :description, :amount FROM Children {where}
+                ORDER BY id
+            """), {
+                "child": rule.children_id,
+                "date": posting_date,
+                "description": rule.description,
+                "amount": rule.amount
+            })).rowcount
+    db.commit()
+    if posted:
+        crud.publish_new_transactions(db, last_posted_id)
+    last_id = rules[-1].id if rules else after_id
+    return len(rules), posted, last_id
+
+
+def run_due(db: Session, today: Optional[date] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Post every due allowance.
+    
+    Rules that fell behind (e.g. the server was down) catch up by posting
+    each missed date.
+    
+    Args:
+        db: Database session.
+        today: Post occurrences up to this date, defaults to today.
+        batch_size: Rules processed per transaction.
+    
+    Returns:
+        int: Number of transactions posted.
+    """
+    until = (today or date.today()).isoformat()
+    total = 0
+    after_id = 0
+    while True:
+        count, posted, after_id = _run_batch(db, until, after_id, batch_size)
+        total += posted
+        if count < batch_size:
+            return total
+
+
+def run_once() -> int:
+    """
+    Post due allowances in the application database, or every tenant's.
+    
+    Returns:
+        int: Number of transactions posted.
+    """
+    posted = 0
+    for session_factory in tenants.session_factories():
+        db = session_factory()
+        try:
+            posted += run_due(db)
+        finally:
+            db.close()
+    return posted
+
+
+async def run_forever(interval: float = SCHEDULER_INTERVAL_SECONDS) -> None:
+    """
+    Post due allowances now and then every interval seconds.
+    
+    Args:
+        interval: Seconds between runs.
+    """
+    while True:
+        try:
+            posted = await asyncio.to_thread(run_once)
+            if posted:
+                logger.info("Posted %d scheduled transactions", posted)
+        except Exception:
+            logger.exception("Scheduled allowance run failed")
+        await asyncio.sleep(interval)
+
+
+def start_background() -> Optional[asyncio.Task]:
+    """
+    Start the background scheduler unless it is disabled.
+    
+    Returns:
+        Optional[asyncio.Task]: Running task, or None if disabled.
+    """
+    if SCHEDULER_INTERVAL_SECONDS <= 0:
+        return None
+    return asyncio.create_task(run_forever(SCHEDULER_INTERVAL_SECONDS))
+
+
+async def stop_background(task: Optional[asyncio.Task]) -> None:
+    """
+    Stop a task returned by start_background.
+    
+    Args:
+        task: Scheduler task, or None.
+    """
+    if task is None:
+        return
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Post due allowances")
+    parser.add_argument("--date", type=date.fromisoformat, default=None,
+                        help="post occurrences up to this date (default today)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        posted = run_due(db, today=args.date, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Posted {posted} transactions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ These schemas define the structure of data for API requests and responses,
 providing automatic validation and serialization.
 """
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List
 from datetime import date
 
@@ -102,6 +102,55 @@ class TransactionResponse(TransactionBase):
         from_attributes = True
 
 
+class TransactionFanout(TransactionBase):
+    """Schema for posting one transaction to many children."""
+    children_ids: Optional[List[int]] = Field(None, max_length=100_000)
+
+
+class FanoutResult(BaseModel):
+    """Schema for the outcome of a fan-out posting."""
+    posted: int
+
+
+class AllowanceRuleCreate(TransactionBase):
+    """
+    Schema for creating a recurring allowance.
+    
+    ``date`` is the first posting date. Monthly rules repeat on the same
+    day of the month, so they must start on day 28 or earlier.
+    """
+    children_id: Optional[int] = None
+    frequency: str = Field(..., pattern=r'^(weekly|monthly)$')
+    
+    @model_validator(mode='after')
+    def validate_monthly_day(self) -> 'AllowanceRuleCreate':
+        """
+        Validate that monthly rules fall on a day every month has.
+        
+        Returns:
+            AllowanceRuleCreate: Validated rule.
+        
+        Raises:
+            ValueError: If a monthly rule starts after day 28.
+        """
+        if self.frequency == 'monthly' and int(self.date[8:10]) > 28:
+            raise ValueError("Monthly allowances must start on day 28 or earlier")
+        return self
+
+
+class AllowanceRuleResponse(BaseModel):
+    """Schema for allowance rule response."""
+    id: int
+    children_id: Optional[int]
+    description: str
+    amount: float
+    frequency: str
+    next_date: str
+    
+    class Config:
+        from_attributes = True
+
+
 class CompletedWorkbookBase(BaseModel):
     """Base schema for completed workbook."""
     date: str = Field(..., pattern=r'^\d{4}-\d{2}-\d{2}$')
@@ -167,3 +216,59 @@ class ChildDashboard(BaseModel):
     balance: float
 
 
+
+
+class TransactionSearchResult(BaseModel):
+    """Schema for a transaction matched by full-text search."""
+    id: int
+    children_id: int
+    child_name: str
+    date: str
+    description: str
+    amount: float
+    rank: float
+
+
+class LeaderboardEntry(BaseModel):
+    """Schema for one place on a leaderboard."""
+    rank: int
+    child_id: int
+    child_name: str
+    value: float
+
+
+class ChildStatsResponse(BaseModel):
+    """Schema for a child's all-time activity statistics."""
+    child_id: int
+    child_name: str
+    transactions: int
+    credits: float
+    debits: float
+    completions: int
+    last_activity: Optional[str]
+
+
+class FacetProgress(BaseModel):
+    """Schema for a child's completions within one grade and subject."""
+    grade: Optional[int]
+    subject: Optional[str]
+    completed: int
+    total: int
+
+
+class InterestRunResponse(BaseModel):
+    """Schema for a month of posted interest."""
+    period: str
+    rate: float
+    transactions: int
+    total: float
+    
+    class Config:
+        from_attributes = True
+
+
+class InterestPayout(BaseModel):
+    """Schema for one child's interest in a preview."""
+    child_id: int
+    average_daily_balance: float
+    interest: float
@@ -0,0 +1,94 @@
+"""
+Full-text search over transaction descriptions.
+
+Queries the Account_fts FTS5 index (see app/models.py) and returns
+matches ranked by BM25 relevance.
+"""
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Upper bound on results returned by a single search
+MAX_RESULTS = 100
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+    
+    Every word becomes a quoted prefix term, so punctuation in user
+    input can never be parsed as FTS5 syntax. Terms are ANDed.
+    
+    Args:
+        query: Search text as typed by the user.
+        
+    Returns:
+        Optional[str]: MATCH expression, or None if there are no words.
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_transactions(
+    db: Session,
+    query: str,
+    child_id: Optional[int] = None,
+    limit: int = 20
+) -> List[dict]:
+    """
+    Search transaction descriptions.
+    
+    Args:
+        db: Database session.
+        query: Search text, e.g. "kung fu xp".
+        child_id: Restrict results to one child.
+        limit: Maximum number of results (capped at MAX_RESULTS).
+        
+    Returns:
+        List[dict]: Matching transactions with child names, best first.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    
+    params = {
+        "match": match,
+        "child_id": child_id,
+        "limit": max(1, min(limit, MAX_RESULTS))
+    }
+    if child_id is None:
+        # Rank inside the index first so only the top rows are joined.
+        matches = """
+            SELECT rowid, rank FROM Account_fts
+            WHERE Account_fts MATCH :match
+            ORDER BY rank
+            LIMIT :limit
+        """
+    else:
+        matches = """
+            SELECT Account_fts.rowid, Account_fts.rank FROM Account_fts
+            JOIN Account ON Account.id = Account_fts.rowid
+            WHERE Account_fts MATCH :match AND Account.children_id = :child_id
+            ORDER BY Account_fts.rank
+            LIMIT :limit
+        """
+    rows = db.execute(
+        text(f"""
+            SELECT Account.id, Account.children_id, Children.name AS child_name,
+                   Account.date, Account.description, Account.amount,
+                   matches.rank AS rank
+            FROM ({matches}) AS matches
+            JOIN Account ON Account.id = matches.rowid
+            JOIN Children ON Children.id = Account.children_id
+            ORDER BY matches.rank, Account.date DESC
+        """),
+        params
+    )
+    return [dict(row) for row in rows.mappings()]
@@ -0,0 +1,354 @@
+"""
+Deterministic synthetic ledger generator.
+
+Writes families of children, the workbook catalog and realistic
+transaction streams straight into a SQLite file using bulk
+``executemany`` inserts. The same seed and parameters always produce
+byte-for-byte identical table contents, so benchmarks run against
+generated ledgers are comparable.
+
+Usage:
+    python -m app.seed synthetic.sqlite --families 1000 --children 3 \\
+        --transactions 200 --seed 42
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app import models
+
+
+# Subjects per grade, extending the titles loaded by project1.py.
+GRADE_SUBJECTS = {
+    1: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Addition", "Subtraction"],
+    2: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Addition", "Subtraction"],
+    3: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Addition and Subtraction", "Multiplication", "Division"],
+    4: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Multiplication", "Division", "Decimals and Fractions"],
+    5: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Decimals and Fractions"],
+    6: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Fractions"],
+    7: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Ratios and Proportions", "Pre-Algebra"],
+    8: ["Writing", "Reading", "Word Problems", "Geometry and Measurement",
+        "Algebra", "Statistics and Probability"],
+}
+
+GIVEN_NAMES = [
+    "River", "Summer", "Autumn", "Sky", "Ocean", "Willow", "Rowan", "Sage",
+    "Hazel", "Jasper", "Luna", "Felix", "Iris", "Milo", "Nora", "Oscar",
+]
+
+FAMILY_NAMES = [
+    "Holt", "Chen", "Garcia", "Nguyen", "Smith", "Okafor", "Kowalski",
+    "Haddad", "Silva", "Tanaka", "Murphy", "Larsen",
+]
+
+# (description, minimum, maximum) in dollars; rewards and purchases
+# seen in the historical ledger.
+REWARDS = [
+    ("Kung Fu XP", 30, 100),
+    ("Babulian Form Complete", 20, 20),
+    ("Lost tooth", 5, 25),
+    ("Halloween Candy Buyback", 10, 25),
+    ("Chinese New Year", 20, 20),
+    ("Won Chapters Gift Card for Study", 25, 25),
+    ("Completed Piano Book", 25, 25),
+]
+
+PURCHASES = [
+    ("Cozy Grotto", 2, 25),
+    ("Scholastic Book order", 10, 25),
+    ("Purchase Fountain Pen", 20, 45),
+    ("Horse Stickers", 3, 8),
+    ("Washii Tape", 5, 15),
+    ("Necklace Purchase", 15, 30),
+    ("Snake stuffy and stickers", 10, 20),
+]
+
+COMPLETION_REWARD = 25.00
+MONTHLY_ALLOWANCE = ("Bare Minimum Workbooks", 10.00, 20.00)
+
+CHUNK_SIZE = 50_000
+
+
+def workbook_catalog(volumes: int = 1) -> List[str]:
+    """
+    Build the workbook catalog titles.
+
+    Args:
+        volumes: Number of volumes per grade/subject pair. Volumes beyond
+            the first are suffixed "Volume N" to grow the catalog.
+
+    Returns:
+        List[str]: Workbook titles in insertion order.
+    """
+    titles = []
+    for volume in range(1, volumes + 1):
+        for grade, subjects in GRADE_SUBJECTS.items():
+            for subject in subjects:
+                title = f"Grade {grade} {subject}"
+                if volume > 1:
+                    title = f"{title} Volume {volume}"
+                titles.append(title)
+    return titles
+
+
+def child_names(families: int, children: int) -> Iterator[str]:
+    """
+    Yield unique child names, grouped by family.
+
+    Args:
+        families: Number of families.
+        children: Number of children per family.
+
+    Yields:
+        str: Child name such as "Summer Chen 1-1".
+    """
+    for family in range(1, families + 1):
+        surname = FAMILY_NAMES[family % len(FAMILY_NAMES)]
+        for child in range(children):
+            given = GIVEN_NAMES[(family + child) % len(GIVEN_NAMES)]
+            yield f"{given} {surname} {family}-{child + 1}"
+
+
+def _child_stream(
+    rng: random.Random,
+    child_id: int,
+    catalog: Sequence[Tuple[int, str]],
+    transactions: int,
+    start: date,
+    days: int,
+) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Generate one child's completions and transactions in date order.
+
+    Args:
+        rng: Seeded random generator for this child.
+        child_id: Child ID the rows belong to.
+        catalog: (workbook_id, title) pairs.
+        transactions: Target number of transactions.
+        start: First date of the ledger.
+        days: Number of days the ledger spans.
+
+    Returns:
+        Tuple[List[tuple], List[tuple]]: Members rows and Account rows.
+    """
+    if transactions < 1:
+        return [], []
+    step = max(days // transactions, 1)
+    completions_wanted = min(len(catalog), max(transactions // 8, 1))
+    completed = rng.sample(range(len(catalog)), completions_wanted)
+    completed_at = set(
+        rng.randrange(transactions) for _ in range(completions_wanted)
+    )
+
+    members = []
+    account = []
+    day = rng.randrange(step)
+    for n in range(transactions):
+        day = min(day + rng.randint(1, 2 * step), days - 1)
+        when = (start + timedelta(days=day)).isoformat()
+        if n in completed_at and completed:
+            workbook_id, title = catalog[completed.pop()]
+            members.append((child_id, workbook_id, 1, when))
+            account.append(
+                (child_id, when, f"Completed {title}", COMPLETION_REWARD)
+            )
+            continue
+        roll = rng.random()
+        if roll < 0.15:
+            label, low, high = MONTHLY_ALLOWANCE
+            month = (start + timedelta(days=day)).strftime("%B %Y")
+            amount = rng.choice((low, high))
+            account.append((child_id, when, f"{label} {month}", amount))
+        elif roll < 0.6:
+            label, low, high = rng.choice(REWARDS)
+            amount = round(rng.uniform(low, high) * 2) / 2
+            account.append((child_id, when, label, amount))
+        else:
+            label, low, high = rng.choice(PURCHASES)
+            amount = -round(rng.uniform(low, high) * 2) / 2
+            account.append((child_id, when, label, amount))
+    return members, account
+
+
+def generate(
+    path: str,
+    families: int,
+    children: int,
+    transactions: int,
+    seed: int = 0,
+    volumes: int = 1,
+    start_year: int = 2021,
+    years: int = 4,
+) -> dict:
+    """
+    Generate a synthetic ledger into a new SQLite file.
+
+    Args:
+        path: Target SQLite file; must not already exist.
+        families: Number of families.
+        children: Children per family.
+        transactions: Transactions per child.
+        seed: Random seed; identical seeds produce identical ledgers.
+        volumes: Catalog volumes per grade/subject pair.
+        start_year: First calendar year of generated activity.
+        years: Number of years the ledger spans.
+
+    Returns:
+        dict: Row counts per table and elapsed seconds.
+
+    Raises:
+        FileExistsError: If the target file already exists.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists")
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    cur = conn.cursor()
+    # Derived tables are rebuilt once after loading instead of per row.
+    # The search indexes go entirely, so reinstalling them rebuilds them.
+    for name in (*models.SEARCH_TRIGGERS, *models.LEADERBOARD_TRIGGERS,
+                 *models.CHILD_STATS_TRIGGERS, *models.FACET_TRIGGERS):
+        cur.execute(f"DROP TRIGGER {name}")
+    for index in models.SEARCH_INDEXES:
+        cur.execute(f"DROP TABLE {index}")
+
+    titles = workbook_catalog(volumes)
+    cur.executemany(
+        "INSERT INTO Workbooks (id, name) VALUES (?, ?)",
+        enumerate(titles, start=1),
+    )
+    catalog = list(enumerate(titles, start=1))
+
+    names = list(child_names(families, children))
+    cur.executemany(
+        "INSERT INTO Children (id, name) VALUES (?, ?)",
+        enumerate(names, start=1),
+    )
+
+    start = date(start_year, 1, 1)
+    days = (date(start_year + years, 1, 1) - start).days
+    counts: Dict[str, float] = {"Children": len(names), "Workbooks": len(titles),
+                              "Members": 0, "Account": 0}
+    members_buffer: List[tuple] = []
+    account_buffer: List[tuple] = []
+    for child_id in range(1, len(names) + 1):
+        # Per-child generators keep output stable regardless of chunking.
+        rng = random.Random(seed * 1_000_003 + child_id)
+        members, account = _child_stream(
+            rng, child_id, catalog, transactions, start, days
+        )
+        members_buffer.extend(members)
+        account_buffer.extend(account)
+        if len(account_buffer) >= CHUNK_SIZE:
+            counts["Members"] += _flush(cur, members_buffer, account_buffer)
+            counts["Account"] += len(account_buffer)
+            members_buffer.clear()
+            account_buffer.clear()
+    counts["Members"] += _flush(cur, members_buffer, account_buffer)
+    counts["Account"] += len(account_buffer)
+
+    conn.commit()
+    conn.close()
+    with engine.begin() as connection:
+        models.install_search_index(connection)
+        models.install_leaderboards(connection)
+        models.install_child_stats(connection)
+        models.install_workbook_facets(connection)
+    engine.dispose()
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    return counts
+
+
+def _flush(cur: sqlite3.Cursor, members: List[tuple], account: List[tuple]) -> int:
+    """
+    Bulk insert buffered rows.
+
+    Args:
+        cur: Open cursor on the target database.
+        members: Buffered Members rows.
+        account: Buffered Account rows.
+
+    Returns:
+        int: Number of Members rows written.
+    """
+    cur.executemany(
+        "INSERT INTO Members (children_id, workbooks_id, completed, date) "
+        "VALUES (?, ?, ?, ?)",
+        members,
+    )
+    cur.executemany(
+        "INSERT INTO Account (children_id, date, description, amount) "
+        "VALUES (?, ?, ?, ?)",
+        account,
+    )
+    return len(members)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("path", help="SQLite file to create")
+    parser.add_argument("--families", type=int, default=100)
+    parser.add_argument("--children", type=int, default=3,
+                        help="children per family")
+    parser.add_argument("--transactions", type=int, default=200,
+                        help="transactions per child")
+    parser.add_argument("--volumes", type=int, default=1,
+                        help="catalog volumes per grade/subject")
+    parser.add_argument("--start-year", type=int, default=2021)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        counts = generate(
+            args.path, args.families, args.children, args.transactions,
+            seed=args.seed, volumes=args.volumes,
+            start_year=args.start_year, years=args.years,
+        )
+    except FileExistsError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    rows = sum(counts[table] for table in ("Children", "Workbooks", "Members", "Account"))
+    rate = rows / counts["seconds"] if counts["seconds"] else float("inf")
+    print(
+        f"Children: {counts['Children']}  Workbooks: {counts['Workbooks']}  "
+        f"Members: {counts['Members']}  Account: {counts['Account']}"
+    )
+    print(f"Wrote {rows} rows in {counts['seconds']}s ({rate:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
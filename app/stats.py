@@ -0,0 +1,159 @@
+"""
+Per-child activity statistics.
+
+Reads the trigger-maintained ChildStats table (see app/models.py):
+transaction count, total credits and debits, completions and the date of
+the last activity, all-time with archived years included. The triggers
+also see writes from the legacy CLI; anything that bypassed them (rows
+edited with the triggers dropped, a restored backup, ...) shows up as
+drift in ``verify`` and is repaired by ``rebuild``.
+
+Usage:
+    python -m app.stats            # print every child's statistics
+    python -m app.stats --verify   # compare with the ledger, exit 1 on drift
+    python -m app.stats --rebuild  # recompute from the ledger
+"""
+
+import argparse
+import sys
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import archive, models, tenants
+from app.database import serialized_write
+
+COLUMNS = ("transactions", "credits", "debits", "completions", "last_activity")
+
+# Sums are kept by the triggers one amount at a time, so they are
+# compared to the cent
+TOLERANCE = 0.005
+
+
+def get_stats(db: Session, child_id: Optional[int] = None) -> List[dict]:
+    """
+    Get activity statistics, with zeros for children without any activity.
+    
+    Args:
+        db: Database session.
+        child_id: Only this child; every child if None.
+    
+    Returns:
+        List[dict]: child_id, child_name and ``COLUMNS`` per child, in ID order.
+    """
+    where = "WHERE c.id = :child_id" if child_id is not None else ""
+    rows = db.execute(text(f"""
+        SELECT c.id AS child_id, c.name AS child_name,
+               COALESCE(s.transactions, 0) AS transactions,
+               round(COALESCE(s.credits, 0), 2) AS credits,
+               round(COALESCE(s.debits, 0), 2) AS debits,
+               COALESCE(s.completions, 0) AS completions,
+               s.last_activity
+        FROM Children AS c LEFT JOIN ChildStats AS s ON s.children_id = c.id
+        {where} ORDER BY c.id
+    """), {"child_id": child_id})
+    return [dict(row) for row in rows.mappings()]
+
+
+def _expected_query(db: Session) -> str:
+    """Build the statistics query over the hot ledger and every archived year."""
+    tables = db.execute(text("SELECT table_name FROM ArchiveManifest ORDER BY year")).scalars().all()
+    sources = ["SELECT id, children_id, date, amount FROM main.Account"]
+    if tables and archive.attach(db):
+        sources += [
+            f"SELECT id, children_id, date, amount FROM {archive.SCHEMA}.{name}" for name in tables
+        ]
+    return models.CHILD_STATS_QUERY.format(account=f"({' UNION ALL '.join(sources)})")
+
+
+def verify(db: Session) -> List[dict]:
+    """
+    Compare the stored statistics with the ledger.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        List[dict]: child_id, column, stored and expected for every
+            value that differs; empty if the statistics are current.
+    """
+    expected = {row[0]: row[1:] for row in db.execute(text(_expected_query(db)))}
+    stored = {
+        row[0]: row[1:]
+        for row in db.execute(text(f"SELECT children_id, {', '.join(COLUMNS)} FROM ChildStats"))
+    }
+    empty = (0, 0.0, 0.0, 0, None)
+    drift = []
+    for child_id in sorted(expected.keys() | stored.keys()):
+        for column, have, want in zip(COLUMNS, stored.get(child_id, empty), expected.get(child_id, empty)):
+            if isinstance(want, float) or isinstance(have, float):
+                same = abs((have or 0) - (want or 0)) < TOLERANCE
+            else:
+                same = have == want
+            if not same:
+                drift.append({"child_id": child_id, "column": column, "stored": have, "expected": want})
+    return drift
+
+
+@serialized_write
+def rebuild(db: Session) -> int:
+    """
+    Recompute every child's statistics from the ledger.
+    
+    Args:
+        db: Database session.
+    
+    Returns:
+        int: Number of children with statistics.
+    """
+    query = _expected_query(db)
+    db.execute(text("DELETE FROM ChildStats"))
+    db.execute(text(
+        f"INSERT INTO ChildStats (children_id, {', '.join(COLUMNS)}) {query}"
+    ))
+    db.commit()
+    return db.execute(text("SELECT COUNT(*) FROM ChildStats")).scalar_one()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Per-child activity statistics")
+    parser.add_argument("--tenant", help="household database (see app.tenants)")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--verify", action="store_true", help="compare with the ledger, exit 1 on drift")
+    action.add_argument("--rebuild", action="store_true", help="recompute from the ledger")
+    args = parser.parse_args(argv)
+    
+    try:
+        db = tenants.command_sessionmaker(args.tenant)()
+    except (LookupError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    try:
+        if args.verify:
+            drift = verify(db)
+            for row in drift:
+                print(f"{row['child_id']}\t{row['column']}\tstored {row['stored']}\texpected {row['expected']}")
+            print("Statistics are current" if not drift else f"{len(drift)} values differ; run --rebuild")
+            return 1 if drift else 0
+        if args.rebuild:
+            print(f"Rebuilt statistics for {rebuild(db)} children")
+            return 0
+        for row in get_stats(db):
+            print("\t".join(str(row[key]) for key in ("child_id", "child_name") + COLUMNS))
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
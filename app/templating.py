@@ -0,0 +1,15 @@
+"""
+Shared Jinja2 template configuration.
+
+Routers import ``templates`` from here so every page renders from the
+same template directory.
+"""
+
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+
+APP_DIR = Path(__file__).resolve().parent
+
+# Setup templates
+templates = Jinja2Templates(directory=str(APP_DIR / "templates"))
@@ -0,0 +1,466 @@
+"""
+Multi-tenant routing to per-household SQLite files.
+
+Each household (tenant) gets its own ledger file in ``TENANT_DIR``, so
+families never share a write lock and capacity grows with the number of
+files rather than queueing on one. ``TenantMiddleware`` picks the tenant
+for each request from a header, a ``/t/<tenant>/`` path prefix or the
+first label of the Host name, and points ``get_db`` at that tenant's
+engine for the duration of the request.
+
+Engines are kept in a bounded LRU: a tenant's file is opened on first
+use and its pool is disposed (closing idle connections) when it falls
+out of the cache, so the number of open files stays bounded however
+many households are hosted. Schema upgrades run once per tenant per
+process, not on every reopen, and background jobs visiting every
+household open short-lived engines instead of churning the LRU.
+
+The web pages link with absolute paths, so browsers should be routed by
+host or by a header added at the proxy; path routing suits API clients.
+
+Usage:
+    python -m app.tenants create smith   # create tenants/smith.sqlite
+    python -m app.tenants list
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence, Set
+
+from sqlalchemy.orm import sessionmaker
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import metrics
+from app.database import SessionLocal, current_sessionmaker, init_db, make_engine
+
+# How requests name their tenant: "header", "path" or "host"; empty
+# serves the single database at LEDGER_DATABASE_URL.
+TENANT_MODE = os.environ.get("LEDGER_TENANT_MODE", "").lower()
+
+# Directory holding one <tenant>.sqlite file per household
+TENANT_DIR = os.environ.get("LEDGER_TENANT_DIR", "./tenants")
+
+TENANT_HEADER = os.environ.get("LEDGER_TENANT_HEADER", "X-Ledger-Tenant")
+
+# Tenant engines kept open at once, and pooled connections per engine
+MAX_ENGINES = int(os.environ.get("LEDGER_TENANT_ENGINES", "64"))
+POOL_SIZE = int(os.environ.get("LEDGER_TENANT_POOL_SIZE", "2"))
+
+MODES = ("header", "path", "host")
+
+PATH_PREFIX = "/t/"
+
+# Paths served without a tenant; reports span every household and are
+# gated by the operator token instead (see app/routers/reports.py)
+EXEMPT_PATHS = ("/static/", "/docs", "/openapi.json", "/api/metrics", "/api/reports/")
+
+# Lowercase DNS label, so names are safe as file names and host labels
+TENANT_NAME = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$")
+
+
+def tenant_path(tenant: str, directory: str = TENANT_DIR) -> str:
+    """
+    Get a tenant's database file.
+    
+    Args:
+        tenant: Tenant name.
+        directory: Tenant directory.
+    
+    Returns:
+        str: Path of the tenant's SQLite file.
+    
+    Raises:
+        ValueError: If the name is not a valid tenant name.
+    """
+    if not TENANT_NAME.match(tenant):
+        raise ValueError(f"Invalid tenant name: {tenant!r}")
+    return os.path.join(directory, f"{tenant}.sqlite")
+
+
+class TenantEngines:
+    """
+    Bounded LRU of per-tenant engines.
+    
+    Attributes:
+        directory: Directory holding the tenant files.
+        capacity: Maximum number of engines kept open.
+        hits: Requests served by an open engine.
+        opened: Engines opened (cache misses).
+        evicted: Engines disposed to make room.
+    """
+    
+    def __init__(self, directory: str = TENANT_DIR, capacity: int = MAX_ENGINES,
+                 pool_size: int = POOL_SIZE):
+        """
+        Create an empty engine cache.
+        
+        Args:
+            directory: Directory holding the tenant files.
+            capacity: Maximum number of engines kept open.
+            pool_size: Pooled connections per engine.
+        """
+        self.directory = directory
+        self.capacity = max(1, capacity)
+        self.pool_size = pool_size
+        self.hits = 0
+        self.opened = 0
+        self.evicted = 0
+        self._entries: "OrderedDict[str, sessionmaker]" = OrderedDict()
+        # Tenants whose schema this process has brought up to date
+        self._migrated: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    def exists(self, tenant: str) -> bool:
+        """Check whether a tenant's database file exists."""
+        try:
+            return os.path.exists(tenant_path(tenant, self.directory))
+        except ValueError:
+            return False
+    
+    def tenants(self) -> List[str]:
+        """
+        List tenants with a database file.
+        
+        Returns:
+            List[str]: Tenant names, sorted.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        names = (name[:-len(".sqlite")] for name in os.listdir(self.directory) if name.endswith(".sqlite"))
+        return sorted(name for name in names if TENANT_NAME.match(name))
+    
+    def create(self, tenant: str) -> str:
+        """
+        Create a tenant's database with every table.
+        
+        Args:
+            tenant: Tenant name.
+        
+        Returns:
+            str: Path of the tenant's SQLite file.
+        
+        Raises:
+            ValueError: If the name is invalid.
+        """
+        path = tenant_path(tenant, self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+        engine = make_engine(f"sqlite:///{path}")
+        try:
+            init_db(engine)
+        finally:
+            engine.dispose()
+        with self._lock:
+            self._migrated.add(tenant)
+        return path
+    
+    def _open(self, tenant: str, **options) -> sessionmaker:
+        """
+        Open a session factory on an existing tenant's file.
+        
+        Files created by older versions are brought up to the current
+        schema the first time this process opens them; reopening a tenant
+        after eviction skips the DDL.
+        
+        Raises:
+            LookupError: If the tenant has no database file.
+        """
+        if not self.exists(tenant):
+            raise LookupError(f"Unknown tenant: {tenant}")
+        engine = make_engine(f"sqlite:///{tenant_path(tenant, self.directory)}", **options)
+        with self._lock:
+            migrated = tenant in self._migrated
+        if not migrated:
+            init_db(engine)
+            with self._lock:
+                self._migrated.add(tenant)
+        return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    def session_factory(self, tenant: str) -> sessionmaker:
+        """
+        Get the session factory for an existing tenant, opening it if needed.
+        
+        Args:
+            tenant: Tenant name.
+        
+        Returns:
+            sessionmaker: Factory bound to the tenant's engine.
+        
+        Raises:
+            LookupError: If the tenant has no database file.
+        """
+        with self._lock:
+            factory = self._entries.get(tenant)
+            if factory is not None:
+                self._entries.move_to_end(tenant)
+                self.hits += 1
+                return factory
+        
+        factory = self._open(tenant, pool_size=self.pool_size)
+        
+        evicted = []
+        with self._lock:
+            current = self._entries.get(tenant)
+            if current is not None:
+                # Another thread opened it first; use theirs.
+                evicted.append(factory)
+                factory = current
+            else:
+                self._entries[tenant] = factory
+                self.opened += 1
+                while len(self._entries) > self.capacity:
+                    evicted.append(self._entries.popitem(last=False)[1])
+                    self.evicted += 1
+            self._entries.move_to_end(tenant)
+        for stale in evicted:
+            # Checked-out connections finish their request and are then closed.
+            stale.kw["bind"].dispose()
+        return factory
+    
+    @contextmanager
+    def transient(self, tenant: str) -> Iterator[sessionmaker]:
+        """
+        Open a tenant for one job, outside the request LRU.
+        
+        Background jobs visit every household; going through the LRU would
+        evict the engines requests are using.
+        
+        Args:
+            tenant: Tenant name.
+        
+        Yields:
+            sessionmaker: Factory bound to an engine disposed on exit.
+        
+        Raises:
+            LookupError: If the tenant has no database file.
+        """
+        factory = self._open(tenant)
+        try:
+            yield factory
+        finally:
+            factory.kw["bind"].dispose()
+    
+    def clear(self, close: bool = True) -> None:
+        """
+        Drop every cached engine.
+        
+        Args:
+            close: Close pooled connections; False after a fork, where
+                the parent still owns them.
+        """
+        with self._lock:
+            factories = list(self._entries.values())
+            self._entries.clear()
+        for factory in factories:
+            factory.kw["bind"].dispose(close=close)
+    
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+        
+        Returns:
+            dict: open, capacity, hits, opened and evicted counts.
+        """
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "open": size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "opened": self.opened,
+            "evicted": self.evicted
+        }
+
+
+engines = TenantEngines()
+
+metrics.register("tenants", engines.stats)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engines.clear(close=False))
+
+
+def session_factories() -> Iterator[sessionmaker]:
+    """
+    Yield a session factory per database this process serves.
+    
+    Used by background jobs that must visit every household. Tenants are
+    opened one at a time outside the request LRU, and each engine is
+    disposed before the next tenant is opened.
+    
+    Yields:
+        sessionmaker: SessionLocal, or one factory per tenant.
+    """
+    if TENANT_MODE not in MODES:
+        yield SessionLocal
+        return
+    for tenant in engines.tenants():
+        try:
+            with engines.transient(tenant) as factory:
+                yield factory
+        except LookupError:
+            continue
+
+
+def command_sessionmaker(tenant: Optional[str] = None) -> sessionmaker:
+    """
+    Get the session factory a command line tool works on.
+    
+    Args:
+        tenant: Household to open; the application database if None.
+    
+    Returns:
+        sessionmaker: The tenant's factory, or SessionLocal once its
+            tables exist.
+    
+    Raises:
+        LookupError: If the tenant has no database file.
+        ValueError: If the tenant name is invalid.
+    """
+    if tenant:
+        return engines.session_factory(tenant)
+    init_db()
+    return SessionLocal
+
+
+def _header(scope: Scope, name: str) -> Optional[str]:
+    """Get a request header from an ASGI scope."""
+    wanted = name.lower().encode("latin-1")
+    for key, value in scope.get("headers", ()):
+        if key == wanted:
+            return value.decode("latin-1")
+    return None
+
+
+class TenantMiddleware:
+    """
+    ASGI middleware routing each request to its tenant's database.
+    
+    Requests naming no tenant, or one without a database file, get a 404;
+    paths in ``EXEMPT_PATHS`` are served without a tenant.
+    """
+    
+    def __init__(self, app: ASGIApp, mode: str = TENANT_MODE,
+                 tenant_engines: Optional[TenantEngines] = None,
+                 header: str = TENANT_HEADER):
+        """
+        Wrap an ASGI application.
+        
+        Args:
+            app: Application to wrap.
+            mode: "header", "path" or "host".
+            tenant_engines: Engine cache, defaults to the shared one.
+            header: Header naming the tenant in header mode.
+        
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown tenant mode: {mode!r}")
+        self.app = app
+        self.mode = mode
+        self.engines = tenant_engines or engines
+        self.header = header
+    
+    def resolve(self, scope: Scope) -> Optional[str]:
+        """
+        Find the tenant a request names, rewriting path-routed scopes.
+        
+        Args:
+            scope: ASGI connection scope.
+        
+        Returns:
+            Optional[str]: Tenant name, or None if the request names none.
+        """
+        if self.mode == "header":
+            return _header(scope, self.header)
+        if self.mode == "host":
+            host = _header(scope, "host") or ""
+            label = host.split(":", 1)[0].split(".", 1)[0]
+            return label.lower() if "." in host else None
+        
+        path = scope["path"]
+        if not path.startswith(PATH_PREFIX):
+            return None
+        tenant, _, rest = path[len(PATH_PREFIX):].partition("/")
+        prefix = PATH_PREFIX + tenant
+        scope["path"] = "/" + rest
+        scope["raw_path"] = scope["path"].encode()
+        scope["root_path"] = scope.get("root_path", "") + prefix
+        return tenant
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        
+        tenant = self.resolve(scope)
+        if tenant is None and scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+        try:
+            factory = self.engines.session_factory(tenant or "")
+        except LookupError:
+            await _not_found(send, "Unknown tenant" if tenant else "No tenant given")
+            return
+        
+        token = current_sessionmaker.set(factory)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_sessionmaker.reset(token)
+
+
+async def _not_found(send: Send, detail: str) -> None:
+    """Send a JSON 404 response."""
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 404,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Manage per-household ledgers")
+    parser.add_argument("--dir", default=TENANT_DIR, help="tenant directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="create a tenant database")
+    create.add_argument("tenant")
+    commands.add_parser("list", help="list tenants")
+    args = parser.parse_args(argv)
+    
+    tenant_engines = TenantEngines(args.dir)
+    if args.command == "list":
+        for tenant in tenant_engines.tenants():
+            print(tenant)
+        return 0
+    try:
+        path = tenant_engines.create(args.tenant)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"Created {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+Benchmark and profiling scripts for Children's Ledger.
+
+Each module is runnable with ``python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,142 @@
+"""
+Columnar analytics versus equivalent SQL.
+
+Generates a synthetic ledger and times each report from app/analytics.py
+against a SQL query producing the same result, after checking that both
+agree. The initial column load and an incremental refresh are reported
+separately.
+
+Usage:
+    python -m benchmarks.analytics --families 500 --transactions 300 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app import analytics, seed
+from app.database import make_engine
+
+SQL_MONTHLY_SPEND = """
+    SELECT children_id, substr(date, 1, 7) AS month, -SUM(amount)
+    FROM Account WHERE amount < 0
+    GROUP BY children_id, month ORDER BY children_id, month
+"""
+
+SQL_REWARD_RATIO = """
+    SELECT children_id,
+           SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+           SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END)
+    FROM Account GROUP BY children_id ORDER BY children_id
+"""
+
+SQL_ROLLING_NET = """
+    WITH RECURSIVE
+    daily(day, total) AS (
+        SELECT date, SUM(amount) FROM Account
+        WHERE children_id = :child GROUP BY date
+    ),
+    days(day) AS (
+        SELECT MIN(day) FROM daily
+        UNION ALL
+        SELECT date(day, '+1 day') FROM days WHERE day < (SELECT MAX(day) FROM daily)
+    )
+    SELECT days.day, SUM(COALESCE(daily.total, 0)) OVER (
+        ORDER BY days.day ROWS BETWEEN 89 PRECEDING AND CURRENT ROW
+    )
+    FROM days LEFT JOIN daily ON daily.day = days.day
+    ORDER BY days.day
+"""
+
+
+def _best(func: Callable, repeat: int) -> float:
+    """Return the fastest of several runs in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return min(samples) * 1000
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Analytics benchmark")
+    parser.add_argument("--families", type=int, default=500)
+    parser.add_argument("--children", type=int, default=3)
+    parser.add_argument("--transactions", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "analytics.sqlite")
+        summary = seed.generate(path, args.families, args.children, args.transactions, seed=1)
+        engine = make_engine(f"sqlite:///{path}")
+        db = sessionmaker(bind=engine)()
+        print(f"Ledger: {summary['Account']} transactions, {summary['Children']} children")
+        
+        columns = analytics.LedgerColumns()
+        started = time.perf_counter()
+        columns.refresh(db)
+        print(f"  initial column load   {(time.perf_counter() - started) * 1000:9.1f} ms")
+        
+        db.execute(text(
+            "INSERT INTO Account (children_id, date, description, amount) "
+            "SELECT children_id, date, description, amount FROM Account ORDER BY id DESC LIMIT 1000"
+        ))
+        db.commit()
+        started = time.perf_counter()
+        added = columns.refresh(db)
+        print(f"  refresh (+{added} rows)  {(time.perf_counter() - started) * 1000:9.1f} ms")
+        snapshot = columns.snapshot
+        
+        spend = analytics.monthly_spend(snapshot)
+        sql_spend = db.execute(text(SQL_MONTHLY_SPEND)).all()
+        assert len(spend) == len(sql_spend)
+        assert all(abs(row["spend"] - total) < 0.01 for row, (_, _, total) in zip(spend, sql_spend))
+        
+        ratio = analytics.reward_ratio(snapshot)
+        sql_ratio = db.execute(text(SQL_REWARD_RATIO)).all()
+        assert [row["child_id"] for row in ratio] == [child for child, _, _ in sql_ratio]
+        
+        child = int(snapshot.child_ids[0])
+        rolling = analytics.rolling_net(snapshot, child_id=child)
+        sql_rolling = db.execute(text(SQL_ROLLING_NET), {"child": child}).all()
+        assert [row["date"] for row in rolling] == [day for day, _ in sql_rolling]
+        assert all(abs(row["net"] - net) < 0.01 for row, (_, net) in zip(rolling, sql_rolling))
+        
+        cases = [
+            ("monthly spend", lambda: analytics.monthly_spend(snapshot),
+             lambda: db.execute(text(SQL_MONTHLY_SPEND)).all()),
+            ("reward ratio", lambda: analytics.reward_ratio(snapshot),
+             lambda: db.execute(text(SQL_REWARD_RATIO)).all()),
+            ("rolling 90-day net", lambda: analytics.rolling_net(snapshot, child_id=child),
+             lambda: db.execute(text(SQL_ROLLING_NET), {"child": child}).all()),
+        ]
+        print(f"{'report':<20}{'numpy ms':>12}{'sql ms':>12}")
+        for name, columnar, sql in cases:
+            print(f"{name:<20}{_best(columnar, args.repeat):>12.2f}{_best(sql, args.repeat):>12.2f}")
+        print(f"{'balance percentiles':<20}"
+              f"{_best(lambda: analytics.percentiles(snapshot), args.repeat):>12.2f}{'-':>12}")
+        
+        db.close()
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
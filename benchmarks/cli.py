@@ -0,0 +1,111 @@
+"""
+Legacy CLI actions: a connection per action versus persistent mode.
+
+Generates a synthetic ledger and runs each project.py menu action the
+way the default mode does (a new connection, the full workbook list and
+every transaction) and the way ``--persistent`` does (one connection
+with cached statements, a cached workbook list and only the recent
+transactions), printing the median time of each.
+
+Usage:
+    python -m benchmarks.cli --transactions 2000 --repeat 50
+"""
+
+import argparse
+import builtins
+import contextlib
+import io
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Optional, Sequence
+
+import project
+from app import seed
+
+
+def _median(action: Callable, repeat: int) -> float:
+    """Return the median of several runs in milliseconds, output discarded."""
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            project.run_action("", action, commit=True)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Legacy CLI benchmark")
+    parser.add_argument("--transactions", type=int, default=2000, help="transactions per child")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cli.sqlite")
+        seed.generate(path, families=1, children=2, transactions=args.transactions)
+        connection = sqlite3.connect(path)
+        child_id, workbook_id = connection.execute(
+            "SELECT (SELECT MIN(id) FROM Children), (SELECT MIN(id) FROM Workbooks)"
+        ).fetchone()
+        connection.close()
+        project.DATABASE = path
+
+        # Answers for the prompts of the insert actions
+        answers = {
+            "Please insert the transaction date in the following format YYYY-MM-DD: ": "2025-06-01",
+            "Please enter a text description of the Transaction: ": "Benchmark",
+            "Please enter the amount of the transaction (negative numbers for withdrawals):": "1",
+            "Please pick the ID number of your title: ": str(workbook_id),
+        }
+        def answer(prompt: object = "") -> str:
+            return answers[str(prompt)]
+
+        original_input = builtins.input
+        builtins.input = answer
+
+        results = {}
+        try:
+            for mode in ("per-action", "persistent"):
+                persistent = mode == "persistent"
+                if persistent:
+                    persistent_conn = sqlite3.connect(path, cached_statements=project.CACHED_STATEMENTS)
+                    project.persistent_conn = persistent_conn
+                    project.workbook_cache = []
+                recent = project.RECENT_LIMIT if persistent else None
+                actions = {
+                    "list children": project.get_children,
+                    "view workbooks": lambda cur: project.view_completed_workbooks(child_id, cur),
+                    "view transactions": lambda cur: project.get_child_transactions(child_id, cur, recent),
+                    "choose workbook": project.choose_workbook,
+                    "insert transaction": lambda cur: project.insert_new_transaction(child_id, cur),
+                }
+                for name, action in actions.items():
+                    results[name, mode] = _median(action, args.repeat)
+                if persistent:
+                    persistent_conn.close()
+                    project.persistent_conn = None
+                    project.workbook_cache = None
+        finally:
+            builtins.input = original_input
+
+        print(f"{'action':>20} {'per-action ms':>14} {'persistent ms':>14}")
+        for name in dict.fromkeys(name for name, _ in results):
+            print(f"{name:>20} {results[name, 'per-action']:>14.3f} {results[name, 'persistent']:>14.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Database queries per burst of simultaneous children-list requests.
+
+Generates a synthetic ledger and sends bursts of concurrent
+``GET /api/children`` requests through the ASGI app in-process,
+counting the SQL statements the bursts cause and timing them.
+
+Usage:
+    python -m benchmarks.coalesce --viewers 1 10 50 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Optional, Sequence
+
+import httpx
+from sqlalchemy import event
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Read coalescing benchmark")
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--families", type=int, default=50)
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "coalesce.sqlite")
+        os.environ["LEDGER_DATABASE_URL"] = f"sqlite:///{database}"
+        from app import seed
+        from app.database import engine, init_db
+        from app.main import create_app
+        
+        seed.generate(database, families=args.families, children=3, transactions=200)
+        init_db()
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *_: statements.append(1))
+        app = create_app()
+        
+        async def burst(viewers: int) -> float:
+            # httpx types the ASGI scope as dict, Starlette as MutableMapping
+            transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+            async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+                started = time.perf_counter()
+                responses = await asyncio.gather(*(client.get("/api/children") for _ in range(viewers)))
+                elapsed = time.perf_counter() - started
+            assert all(response.status_code == 200 for response in responses)
+            return elapsed
+        
+        print(f"{'viewers':>8} {'statements':>11} {'ms':>8}")
+        for viewers in args.viewers:
+            statements.clear()
+            elapsed = asyncio.run(burst(viewers))
+            print(f"{viewers:>8} {len(statements):>11} {elapsed * 1000:>8.1f}")
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
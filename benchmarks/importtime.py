@@ -0,0 +1,125 @@
+"""
+Import-time profile report.
+
+Runs ``python -X importtime`` on a module in a fresh interpreter and
+summarizes the slowest imports by cumulative and self time.
+
+Usage:
+    python -m benchmarks.importtime app.main --top 15
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import List, NamedTuple, Optional, Sequence
+
+
+class ImportRecord(NamedTuple):
+    """One line of ``-X importtime`` output (times in microseconds)."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(module: str) -> List[ImportRecord]:
+    """
+    Import a module in a fresh interpreter with ``-X importtime``.
+    
+    Args:
+        module: Dotted module name to import.
+        
+    Returns:
+        List[ImportRecord]: Parsed import timings.
+        
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Parse ``-X importtime`` stderr output.
+    
+    Args:
+        output: Captured stderr text.
+        
+    Returns:
+        List[ImportRecord]: One record per imported module.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(ImportRecord(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=depth
+        ))
+    return records
+
+
+def report(records: Sequence[ImportRecord], top: int) -> str:
+    """
+    Format an import-time report.
+    
+    Args:
+        records: Parsed import timings.
+        top: Number of rows per section.
+        
+    Returns:
+        str: Human-readable report.
+    """
+    total = sum(r.self_us for r in records)
+    lines = [f"Total import time: {total / 1000:.1f} ms ({len(records)} modules)", ""]
+    
+    lines.append(f"Top {top} by cumulative time:")
+    for r in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {r.cumulative_us / 1000:8.1f} ms  {r.module}")
+    
+    lines.append("")
+    lines.append(f"Top {top} by self time:")
+    for r in sorted(records, key=lambda r: r.self_us, reverse=True)[:top]:
+        lines.append(f"  {r.self_us / 1000:8.1f} ms  {r.module}")
+    
+    app_modules = [r for r in records if r.module.split(".")[0] == "app"]
+    if app_modules:
+        lines.append("")
+        lines.append("Application modules (self time):")
+        for r in sorted(app_modules, key=lambda r: r.self_us, reverse=True):
+            lines.append(f"  {r.self_us / 1000:8.1f} ms  {r.module}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+        
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Import-time profile report")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+    
+    print(report(profile_imports(args.module), args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Dashboard reads as ORM objects versus Core rows.
+
+Generates a synthetic ledger and loads one child's history the way the
+dashboard used to (Account objects copied into dicts with a running
+balance, Member objects joined to names) and through the Core reads in
+app/crud.py, reporting the best wall time and the peak memory allocated
+by each.
+
+Usage:
+    python -m benchmarks.reads --transactions 5000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import crud, models, seed
+from app.database import make_engine
+
+
+def orm_transactions(db: Session, child_id: int) -> list:
+    """Transactions with a running balance, as the dashboard built them."""
+    transactions = db.query(models.Account).filter(
+        models.Account.children_id == child_id
+    ).order_by(models.Account.date).all()
+    rows = []
+    cumulative = 0.0
+    for transaction in transactions:
+        cumulative += float(transaction.amount)
+        rows.append({
+            'id': transaction.id,
+            'date': transaction.date,
+            'description': transaction.description,
+            'amount': transaction.amount,
+            'cumulative': cumulative
+        })
+    return rows
+
+
+def orm_completions(db: Session, child_id: int) -> list:
+    """Completed workbooks as dicts built from Member objects."""
+    results = db.query(
+        models.Member,
+        models.Child.name.label('child_name'),
+        models.Workbook.name.label('workbook_name')
+    ).join(
+        models.Child, models.Child.id == models.Member.children_id
+    ).join(
+        models.Workbook, models.Workbook.id == models.Member.workbooks_id
+    ).filter(
+        models.Member.children_id == child_id
+    ).order_by(models.Member.date).all()
+    return [
+        {
+            'children_id': member.children_id,
+            'workbooks_id': member.workbooks_id,
+            'completed': member.completed,
+            'date': member.date,
+            'child_name': child_name,
+            'workbook_name': workbook_name
+        }
+        for member, child_name, workbook_name in results
+    ]
+
+
+def _measure(Session: sessionmaker, func: Callable, child_id: int, repeat: int) -> Tuple[float, float, int]:
+    """
+    Time and trace one read, each run in a fresh session.
+    
+    Returns:
+        Tuple[float, float, int]: Best milliseconds, peak KiB allocated
+            while the result is alive, and rows returned.
+    """
+    samples = []
+    for _ in range(repeat):
+        db = Session()
+        started = time.perf_counter()
+        rows = func(db, child_id)
+        samples.append(time.perf_counter() - started)
+        db.close()
+    
+    db = Session()
+    tracemalloc.start()
+    rows = func(db, child_id)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.close()
+    return min(samples) * 1000, peak / 1024, len(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Read path benchmark")
+    parser.add_argument("--transactions", type=int, default=5000, help="transactions per child")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reads.sqlite")
+        seed.generate(path, families=1, children=2, transactions=args.transactions)
+        engine = make_engine(f"sqlite:///{path}")
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        child_id = db.query(models.Account.children_id).limit(1).scalar()
+        # The Core read must return the same history and final balance
+        expected = orm_transactions(db, child_id)
+        actual = crud.get_child_transactions(db, child_id)
+        if sorted(row["id"] for row in expected) != sorted(row.id for row in actual) or \
+                abs(expected[-1]["cumulative"] - actual[-1].cumulative) > 1e-6:
+            print("Core transactions differ from the ORM read", file=sys.stderr)
+            return 1
+        db.close()
+        
+        print(f"{'read':>14} {'path':>5} {'rows':>7} {'best ms':>9} {'peak KiB':>10}")
+        reads: Sequence[Tuple[str, Callable, Callable]] = (
+            ("transactions", orm_transactions, crud.get_child_transactions),
+            ("completions", orm_completions, crud.get_child_completed_workbooks),
+        )
+        for name, orm, core in reads:
+            for label, func in (("orm", orm), ("core", core)):
+                best, peak, rows = _measure(Session, func, child_id, args.repeat)
+                print(f"{name:>14} {label:>5} {rows:>7} {best:>9.2f} {peak:>10.0f}")
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Cross-household report wall time versus worker processes.
+
+Generates a directory of household ledgers and times each report with
+every requested process count, checking that every run merges to the
+same total.
+
+Usage:
+    python -m benchmarks.reports --households 64 --processes 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Optional, Sequence
+
+from app import reports, seed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Cross-household report benchmark")
+    parser.add_argument("--households", type=int, default=32)
+    parser.add_argument("--families", type=int, default=5, help="families per household ledger")
+    parser.add_argument("--transactions", type=int, default=400)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for household in range(args.households):
+            path = os.path.join(tmp, f"household-{household}.sqlite")
+            seed.generate(path, families=args.families, children=3,
+                          transactions=args.transactions, seed=household)
+            paths.append(path)
+        print(f"{args.households} ledgers, {os.cpu_count()} cores")
+        
+        # Size the shared pool for the largest count and start it once so
+        # the timings exclude process spawning
+        reports.DEFAULT_PROCESSES = max(args.processes)
+        reports.merge(reports.fan_out(paths, "balances"))
+        
+        print(f"{'report':>10} {'processes':>10} {'seconds':>10}")
+        for report in sorted(reports.REPORTS):
+            expected = None
+            for processes in args.processes:
+                started = time.perf_counter()
+                total = reports.merge(reports.fan_out(paths, report, processes))
+                elapsed = time.perf_counter() - started
+                if expected is None:
+                    expected = total
+                elif total != expected:
+                    print(f"{report}: totals differ with {processes} processes", file=sys.stderr)
+                    return 1
+                print(f"{report:>10} {processes:>10} {elapsed:>10.3f}")
+        reports.shutdown_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Cold-start-to-first-response benchmark.
+
+Starts the application under uvicorn in a fresh process, polls until the
+first successful response and reports the elapsed wall time.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --path /api/children
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Optional, Sequence
+
+
+def _free_port() -> int:
+    """Return an unused TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_first_response(path: str, database_url: str, timeout: float = 30.0) -> float:
+    """
+    Measure one cold start.
+    
+    Args:
+        path: URL path to request.
+        database_url: Database URL for the server process.
+        timeout: Seconds to wait before giving up.
+        
+    Returns:
+        float: Seconds from process spawn to first 200 response.
+        
+    Raises:
+        TimeoutError: If the server never answers.
+    """
+    port = _free_port()
+    env = dict(os.environ, LEDGER_DATABASE_URL=database_url)
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}{path}"
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise TimeoutError(f"No response from {url}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+        
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/api/children")
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a fresh temporary database")
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/startup.sqlite"
+        samples = [
+            time_first_response(args.path, database_url)
+            for _ in range(args.runs)
+        ]
+    
+    print(f"Cold start to first response over {args.runs} runs:")
+    print(f"  median {statistics.median(samples) * 1000:.0f} ms")
+    print(f"  min    {min(samples) * 1000:.0f} ms")
+    print(f"  max    {max(samples) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
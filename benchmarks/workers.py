@@ -0,0 +1,153 @@
+"""
+Read throughput versus uvicorn worker count.
+
+Generates a synthetic ledger, serves it with ``uvicorn --workers N`` for
+each requested worker count and hammers a read endpoint from client
+threads, optionally mixing in form posts to exercise the writer lock.
+
+Usage:
+    python -m benchmarks.workers --workers 1 2 4 --seconds 10 --clients 32
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import List, Optional, Sequence
+
+from app import seed
+
+
+def _free_port() -> int:
+    """Return an unused TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 30.0) -> None:
+    """Block until the server answers on the given port."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/children")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"Server on port {port} never became ready")
+
+
+def _client(port: int, path: str, stop: threading.Event, write_every: int,
+            results: List[int], errors: List[str]) -> None:
+    """Issue requests on one keep-alive connection until stopped."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    done = 0
+    while not stop.is_set():
+        try:
+            if write_every and done % write_every == write_every - 1:
+                body = urllib.parse.urlencode({
+                    "date": "2025-01-01", "description": "Benchmark", "amount": "1.00"
+                })
+                conn.request("POST", "/child/1/transaction", body, {
+                    "Content-Type": "application/x-www-form-urlencoded"
+                })
+            else:
+                conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(str(response.status))
+            done += 1
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    results.append(done)
+
+
+def run(database: str, workers: int, clients: int, seconds: float,
+        path: str, write_every: int) -> dict:
+    """
+    Serve a database with N workers and measure throughput.
+    
+    Args:
+        database: SQLite file to serve.
+        workers: Number of uvicorn worker processes.
+        clients: Number of concurrent client threads.
+        seconds: Measurement duration.
+        path: Read endpoint to request.
+        write_every: Send a write every Nth request per client (0 = never).
+        
+    Returns:
+        dict: Requests per second and error count.
+    """
+    port = _free_port()
+    env = dict(os.environ, LEDGER_DATABASE_URL=f"sqlite:///{database}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+    try:
+        _wait_ready(port)
+        stop = threading.Event()
+        results: List[int] = []
+        errors: List[str] = []
+        threads = [
+            threading.Thread(target=_client,
+                             args=(port, path, stop, write_every, results, errors))
+            for _ in range(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return {"rps": sum(results) / seconds, "errors": len(errors)}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+        
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Worker scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--path", default="/child/1")
+    parser.add_argument("--write-every", type=int, default=0,
+                        help="post a transaction every Nth request per client")
+    parser.add_argument("--families", type=int, default=50)
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.sqlite")
+        seed.generate(database, families=args.families, children=3, transactions=200)
+        print(f"{'workers':>8} {'req/s':>10} {'errors':>8}")
+        for workers in args.workers:
+            result = run(database, workers, args.clients, args.seconds,
+                         args.path, args.write_every)
+            print(f"{workers:>8} {result['rps']:>10.0f} {result['errors']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
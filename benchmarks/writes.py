@@ -0,0 +1,143 @@
+"""
+Read latency during a write storm, with and without admission control.
+
+Serves a synthetic ledger with one uvicorn worker per setting of
+``LEDGER_WRITE_CONCURRENCY`` (0 turns admission control off), floods it
+with form posts from writer threads while reader threads time
+``GET /api/children``, and prints read latency percentiles next to the
+writes that were accepted and shed.
+
+Usage:
+    python -m benchmarks.writes --concurrency 0 2 --writers 64 --readers 4 --seconds 10
+"""
+
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import List, Optional, Sequence
+
+from app import seed
+from benchmarks.workers import _free_port, _wait_ready
+
+
+def _writer(port: int, stop: threading.Event, statuses: List[int]) -> None:
+    """Post transactions on one connection until stopped, honouring Retry-After."""
+    body = urllib.parse.urlencode({"date": "2025-01-01", "description": "Payout", "amount": "1.00"})
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    while not stop.is_set():
+        try:
+            conn.request("POST", "/child/1/transaction", body, headers)
+            response = conn.getresponse()
+            response.read()
+            statuses.append(response.status)
+            if response.status == 503:
+                stop.wait(float(response.getheader("Retry-After", "1")))
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+
+def _reader(port: int, stop: threading.Event, latencies: List[float]) -> None:
+    """Time reads on one connection until stopped."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    while not stop.is_set():
+        started = time.perf_counter()
+        conn.request("GET", "/api/children")
+        conn.getresponse().read()
+        latencies.append(time.perf_counter() - started)
+
+
+def run(database: str, concurrency: int, writers: int, readers: int, seconds: float) -> dict:
+    """
+    Serve a database and measure reads during a write storm.
+    
+    Args:
+        database: SQLite file to serve.
+        concurrency: LEDGER_WRITE_CONCURRENCY for the server.
+        writers: Number of writer threads.
+        readers: Number of reader threads.
+        seconds: Measurement duration.
+    
+    Returns:
+        dict: Read p50, p99 and max in milliseconds, and write counts by status.
+    """
+    port = _free_port()
+    env = dict(
+        os.environ,
+        LEDGER_DATABASE_URL=f"sqlite:///{database}",
+        LEDGER_WRITE_CONCURRENCY=str(concurrency)
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+    try:
+        _wait_ready(port)
+        stop = threading.Event()
+        statuses: List[int] = []
+        latencies: List[float] = []
+        threads = [threading.Thread(target=_writer, args=(port, stop, statuses)) for _ in range(writers)]
+        threads += [threading.Thread(target=_reader, args=(port, stop, latencies)) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.terminate()
+        server.wait()
+    
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "p50": cuts[49] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(latencies) * 1000,
+        "reads": len(latencies),
+        "written": sum(1 for status in statuses if status < 400),
+        "shed": statuses.count(503)
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+    
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Write storm benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[0, 2],
+                        help="LEDGER_WRITE_CONCURRENCY values to compare (0 = off)")
+    parser.add_argument("--writers", type=int, default=64)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "writes.sqlite")
+        seed.generate(database, families=10, children=3, transactions=200)
+        print(f"{'concurrency':>11} {'reads':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'written':>8} {'shed':>6}")
+        for concurrency in args.concurrency:
+            result = run(database, concurrency, args.writers, args.readers, args.seconds)
+            print(
+                f"{concurrency:>11} {result['reads']:>7} {result['p50']:>8.1f} {result['p99']:>8.1f} "
+                f"{result['max']:>8.1f} {result['written']:>8} {result['shed']:>6}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,57 @@
+import argparse
 import sqlite3
 import sys
+import time
 
 
+DATABASE = 'ledgerdb.sqlite'
 
-def main():
-    global conn 
-    global cur
+# Transactions listed by "View all recent transactions" in persistent mode
+RECENT_LIMIT = 20
+
+# Prepared statements sqlite3 keeps per connection in persistent mode
+CACHED_STATEMENTS = 256
+
+# Shared connection and workbook list, only set in persistent mode
+persistent_conn = None
+workbook_cache = None
+
+
+def open_connection():
+    #one long-lived connection in persistent mode, a fresh one per action otherwise
+    if persistent_conn is not None:
+        return persistent_conn
+    return sqlite3.connect(DATABASE)
+
+
+def close_connection(connection):
+    if connection is not persistent_conn:
+        connection.close()
+
+
+def run_action(label, action, commit=False, timing=False):
+    #run one menu action with its own cursor, optionally printing how long it took
+    started = time.perf_counter()
+    connection = open_connection()
+    try:
+        result = action(connection.cursor())
+        if commit:
+            connection.commit()
+    finally:
+        close_connection(connection)
+    if timing:
+        print(f'[{label}: {(time.perf_counter() - started) * 1000:.1f} ms]')
+    return result
+
+
+def main(persistent=False, timing=False):
+    global persistent_conn
+    global workbook_cache
+
+    if persistent:
+        persistent_conn = sqlite3.connect(DATABASE, cached_statements=CACHED_STATEMENTS)
+        workbook_cache = []
+    recent = RECENT_LIMIT if persistent else None
     
     while True:
         print("""
@@ -22,11 +68,7 @@ def main():
 
         if menu1 == '1':
             # Retrieve List of Children From Children Table
-            conn = sqlite3.connect('ledgerdb.sqlite')
-            cur = conn.cursor()
-            cur.execute('''SELECT rowid, Children.name FROM Children''')
-            items = cur.fetchall()
-            conn.close()
+            items = run_action('list children', get_children, timing=timing)
 
     
             #create a list to contain all the children available and add all children to it
@@ -63,32 +105,28 @@ def main():
                         menu2 = input("Please Enter a menu option: ")
                         while True: 
 
+                            # prompts run before run_action so only the SQL is timed
                             if menu2 == '1':
-                                conn = sqlite3.connect('ledgerdb.sqlite')
-                                cur = conn.cursor()
-                                insert_new_completedwkbook(child_id, cur)
-                                conn.commit()
-                                conn.close()
+                                date = get_date()
+                                workbooks = run_action('list workbooks', get_workbooks, timing=timing)
+                                workbooknum = pick_workbook(workbooks)
+                                run_action('insert workbook',
+                                           lambda cur: save_completedwkbook(child_id, date, workbooknum, cur),
+                                           commit=True, timing=timing)
                                 break
                             elif menu2 == '2':
-                                conn = sqlite3.connect('ledgerdb.sqlite')
-                                cur = conn.cursor()
-                                insert_new_transaction(child_id, cur)
-                                conn.commit()
-                                conn.close()
+                                date, description, amount = ask_transaction()
+                                run_action('insert transaction',
+                                           lambda cur: save_transaction(child_id, date, description, amount, cur),
+                                           commit=True, timing=timing)
                                 break
                             elif menu2 == '3':
-                                conn = sqlite3.connect('ledgerdb.sqlite')
-                                cur = conn.cursor()
-                                view_completed_workbooks(child_id, cur)
-                                conn.close()
+                                run_action('view workbooks', lambda cur: view_completed_workbooks(child_id, cur),
+                                           timing=timing)
                                 break
                             elif menu2 =='4':
-                                
-                                conn = sqlite3.connect('ledgerdb.sqlite')
-                                cur = conn.cursor()
-                                get_child_transactions(child_id, cur)
-                                conn.close()
+                                run_action('view transactions', lambda cur: get_child_transactions(child_id, cur, recent),
+                                           timing=timing)
                                 break
                             elif menu2 == '5':
                                 print('Thanks for using the ledger, God be with you.')
@@ -104,11 +142,18 @@ def main():
             print('Invalid Selection, Please choose a number')
             continue
 
+def get_children(cur):
+    cur.execute('''SELECT rowid, Children.name FROM Children''')
+    return cur.fetchall()
+
 #function for inserting a newly completed workbook
 def insert_new_completedwkbook(child_id, cur):
     date = get_date()
     workbooknum = choose_workbook(cur)
-    
+    save_completedwkbook(child_id, date, workbooknum, cur)
+
+#write a completed workbook already chosen by the user
+def save_completedwkbook(child_id, date, workbooknum, cur):
     print()
     print(f'Inserting Child ID: {child_id} Date Completed: {date} Workbook Number: {workbooknum}')
     cur.execute("""INSERT OR IGNORE INTO Members (children_id, workbooks_id, completed, date) VALUES (?,?,?,?)""",(child_id, workbooknum, 1, date) )
@@ -119,8 +164,10 @@ def insert_new_completedwkbook(child_id, cur):
 # Get the appropriate workbook ID from the list in table
 def choose_workbook(cur)-> int:
     
-    cur.execute("""SELECT * from Workbooks""")
-    items = cur.fetchall()
+    return pick_workbook(get_workbooks(cur))
+
+# Ask for a workbook ID from an already read workbook list
+def pick_workbook(items)-> int:
     
     # Print all workbook titles with ID no.
     for item in items:
@@ -142,6 +189,17 @@ def choose_workbook(cur)-> int:
             print("Invalid input")
             continue
 
+# Workbook list, read once per session in persistent mode
+def get_workbooks(cur):
+    global workbook_cache
+    if workbook_cache:
+        return workbook_cache
+    cur.execute("""SELECT * from Workbooks""")
+    items = cur.fetchall()
+    if workbook_cache is not None:
+        workbook_cache = items
+    return items
+
 #Get appropriately formatted date for inserting new record
 def get_date()-> str:
     while True:
@@ -171,6 +229,12 @@ def get_date()-> str:
 #function for inserting a new transaction purchase or withdrawal
 def insert_new_transaction(child_id, cur):
     
+    date, description, amount = ask_transaction()
+    save_transaction(child_id, date, description, amount, cur)
+
+#ask for the date, description and amount of a new transaction
+def ask_transaction():
+    
     date = get_date()
     while True:
         description = input('Please enter a text description of the Transaction: ')
@@ -188,6 +252,10 @@ def insert_new_transaction(child_id, cur):
         except:
             print("Invalid format, please enter a number")
             continue
+    return date, description, amount
+
+#write a transaction already entered by the user
+def save_transaction(child_id, date, description, amount, cur):
     print()
     
     print(f'Child ID: {child_id} Date: {date} Description: {description} Amount: {amount}')
@@ -211,14 +279,23 @@ def view_completed_workbooks(child_id, cur):
         print(f'{child}  {workbook:40} {date:10}')
     return items
 
-def get_child_transactions(child_id, cur):
+def get_child_transactions(child_id, cur, limit=None):
     
-    cur.execute('''SELECT Children.name, Account.date, Account.description, Account.amount
-    FROM Children JOIN Account ON Children.id = Account.children_id WHERE Children.id = ?
-    ORDER BY Children.name, Account.Date''', (child_id,))
-
-    items = cur.fetchall()
     cumtot = 0
+    if limit is None:
+        cur.execute('''SELECT Children.name, Account.date, Account.description, Account.amount
+        FROM Children JOIN Account ON Children.id = Account.children_id WHERE Children.id = ?
+        ORDER BY Children.name, Account.Date''', (child_id,))
+        items = cur.fetchall()
+    else:
+        #only the most recent rows, with the running total starting from the balance before them
+        cur.execute('''SELECT Children.name, Account.date, Account.description, Account.amount
+        FROM Children JOIN Account ON Children.id = Account.children_id WHERE Children.id = ?
+        ORDER BY Account.date DESC, Account.id DESC LIMIT ?''', (child_id, limit))
+        items = cur.fetchall()[::-1]
+        cur.execute('''SELECT COALESCE(SUM(amount), 0) FROM Account WHERE children_id = ?''', (child_id,))
+        cumtot = cur.fetchone()[0] - sum(item[3] for item in items)
+
     for item in items:
         name, date, descr, amount = item
         cumtot = amount + cumtot
@@ -439,4 +516,9 @@ def get_child_transactions(child_id, cur):
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Children's ledger command line")
+    parser.add_argument('--persistent', action='store_true',
+                        help='keep one connection open, cache the workbook list and list only recent transactions')
+    parser.add_argument('--timing', action='store_true', help='print how long each action takes')
+    args = parser.parse_args()
+    main(persistent=args.persistent, timing=args.timing)
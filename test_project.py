@@ -172,5 +172,16 @@ def test_insert_new_completedwkbook(setup, monkeypatch):
     items = cur.fetchall()
     assert len(items) == 5
 
+def test_get_child_transactions_recent(setup, capsys):
+    cur = setup
+    items = project.get_child_transactions(1, cur, limit=1)
+    assert items == [('River', '2021-03-11', 'Completed Grade 4 Reading', 25.00)]
+    assert 'Cumulative Total:105.00' in capsys.readouterr().out
+
+def test_get_workbooks_cached(setup, monkeypatch):
+    cur = setup
+    monkeypatch.setattr(project, 'workbook_cache', [])
+    assert len(project.get_workbooks(cur)) == 36
+    cur.execute("""INSERT INTO Workbooks (name) VALUES ('Grade 7 Writing')""")
+    assert len(project.get_workbooks(cur)) == 36
 
-    
\ No newline at end of file
@@ -4,19 +4,38 @@ Pytest configuration and fixtures.
 This module provides shared fixtures for testing the application.
 """
 
+import os
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
-from app.main import app
-from app import models
-
-
 # Test database URL
 TEST_DATABASE_URL = "sqlite:///./test_ledger.sqlite"
 
+# Keep the application engine (used by the lifespan hook) off the
+# production database.
+os.environ.setdefault("LEDGER_DATABASE_URL", TEST_DATABASE_URL)
+
+from app.database import Base, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app import analytics, crud, models  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clear_lookup_caches():
+    """
+    Reset the lookup caches around every test.
+    
+    Each test recreates the database, so IDs are reused between tests.
+    """
+    crud.clear_caches()
+    analytics.clear_stores()
+    yield
+    crud.clear_caches()
+    analytics.clear_stores()
+
 
 @pytest.fixture(scope="function")
 def test_engine():
@@ -143,3 +162,37 @@ def sample_transaction(test_db, sample_child):
     return transaction
 
 
+
+
+@pytest.fixture(scope="function")
+def make_ledger(test_db):
+    """
+    Build a small ledger of named children.
+    
+    Args:
+        test_db: Test database session fixture.
+        
+    Returns:
+        Callable: ``make_ledger(names, transactions=(), completions=(),
+            workbooks=0)`` adding the children, workbooks "Book 1" to
+            "Book <workbooks>", (name, date, description, amount)
+            transactions and (name, workbook ID, date) completions, and
+            returning the children in the order named.
+    """
+    def make(names, transactions=(), completions=(), workbooks=0):
+        children = {name: models.Child(name=name) for name in names}
+        test_db.add_all(children.values())
+        test_db.add_all([models.Workbook(name=f"Book {n}") for n in range(1, workbooks + 1)])
+        test_db.commit()
+        test_db.add_all([
+            models.Account(children_id=children[name].id, date=day, description=description, amount=amount)
+            for name, day, description, amount in transactions
+        ])
+        test_db.add_all([
+            models.Member(children_id=children[name].id, workbooks_id=workbook_id, completed=1, date=day)
+            for name, workbook_id, day in completions
+        ])
+        test_db.commit()
+        return tuple(children.values())
+    
+    return make
@@ -0,0 +1,152 @@
+"""
+Unit tests for write admission control.
+
+Tests app/admission.py's queue directly and its middleware on a small
+application.
+"""
+
+import asyncio
+from collections import OrderedDict
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import admission, metrics, tenants
+from app.database import current_sessionmaker
+
+
+class TestAdmissionQueue:
+    """Tests for the bounded admission queue."""
+    
+    def test_admits_in_order_and_sheds_overflow(self):
+        """Test that waiters are admitted first come, first served."""
+        queue = admission.AdmissionQueue(concurrency=1, queue_size=2, timeout=5)
+        order = []
+        
+        async def request(name):
+            if await queue.acquire() is None:
+                order.append(f"{name} shed")
+                return
+            order.append(name)
+            await asyncio.sleep(0.01)
+            queue.release()
+        
+        async def scenario():
+            await asyncio.gather(*(request(name) for name in "abcd"))
+            return queue.stats()
+        
+        stats = asyncio.run(scenario())
+        
+        assert order == ["a", "d shed", "b", "c"]
+        assert (stats["admitted"], stats["shed"], stats["active"], stats["waiting"]) == (3, 1, 0, 0)
+        assert stats["queue_ms"]["max"] >= 10
+    
+    def test_wait_times_out(self):
+        """Test that a request waiting too long is shed and leaves the queue."""
+        queue = admission.AdmissionQueue(concurrency=1, queue_size=1, timeout=0.01)
+        
+        async def scenario():
+            await queue.acquire()
+            waited = await queue.acquire()
+            queue.release()
+            return waited, await queue.acquire()
+        
+        waited, next_wait = asyncio.run(scenario())
+        
+        assert waited is None
+        assert next_wait == 0.0
+        assert queue.stats()["timed_out"] == 1
+    
+    def test_cancelled_waiter_passes_slot_on(self):
+        """Test that a disconnected waiter does not strand a slot."""
+        queue = admission.AdmissionQueue(concurrency=1, queue_size=2, timeout=5)
+        
+        async def scenario():
+            await queue.acquire()
+            waiter = asyncio.ensure_future(queue.acquire())
+            follower = asyncio.ensure_future(queue.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            queue.release()
+            return await follower
+        
+        assert asyncio.run(scenario()) is not None
+        assert (queue.active, queue.stats()["waiting"]) == (1, 0)
+
+
+class TestAdmissionMiddleware:
+    """Tests for shedding write requests."""
+    
+    def test_full_queue_returns_503_for_writes_only(self):
+        """Test that writes get Retry-After while reads are still served."""
+        app = FastAPI()
+        
+        @app.get("/read")
+        def read():
+            return {"ok": True}
+        
+        @app.post("/write")
+        def write():
+            return {"ok": True}
+        
+        queue = admission.AdmissionQueue(concurrency=1, queue_size=0, timeout=5)
+        app.add_middleware(admission.AdmissionMiddleware, queue=queue, retry_after=3)
+        client = TestClient(app)
+        
+        assert client.post("/write").status_code == 200
+        assert queue.active == 0
+        
+        queue.active = 1
+        response = client.post("/write")
+        
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert client.get("/read").status_code == 200
+        assert queue.stats()["shed"] == 1
+    
+    def test_households_queue_separately(self, tmp_path, monkeypatch):
+        """Test that a full queue in one household does not shed another's writes."""
+        monkeypatch.setattr(admission, "tenant_writes", OrderedDict())
+        tenant_engines = tenants.TenantEngines(str(tmp_path))
+        tenant_engines.create("holt")
+        tenant_engines.create("chen")
+        app = FastAPI()
+        
+        @app.post("/write")
+        def write():
+            return {"ok": True}
+        
+        app.add_middleware(admission.AdmissionMiddleware)
+        app.add_middleware(tenants.TenantMiddleware, mode="header", tenant_engines=tenant_engines)
+        client = TestClient(app)
+        try:
+            assert client.post("/write", headers={"X-Ledger-Tenant": "holt"}).status_code == 200
+            holt, = admission.tenant_writes.values()
+            holt.active = holt.concurrency
+            holt.queue_size = 0
+            
+            assert client.post("/write", headers={"X-Ledger-Tenant": "holt"}).status_code == 503
+            assert client.post("/write", headers={"X-Ledger-Tenant": "chen"}).status_code == 200
+            assert len(admission.tenant_writes) == 2
+        finally:
+            tenant_engines.clear()
+    
+    def test_idle_household_queues_evicted(self, tmp_path, monkeypatch):
+        """Test that idle household queues beyond the cap are dropped and busy ones kept."""
+        monkeypatch.setattr(admission, "tenant_writes", OrderedDict())
+        monkeypatch.setattr(admission, "TENANT_QUEUES", 2)
+        queues = {}
+        for name in ("holt", "chen", "park"):
+            factory = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / name}.sqlite"))
+            token = current_sessionmaker.set(factory)
+            try:
+                queues[name] = admission.queue_for_request()
+            finally:
+                current_sessionmaker.reset(token)
+            if name == "holt":
+                queues[name].active = 1
+        
+        assert list(admission.tenant_writes.values()) == [queues["holt"], queues["park"]]
+        assert set(metrics.snapshot()["admission.tenants"]) == set(admission.tenant_writes)
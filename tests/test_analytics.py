@@ -0,0 +1,204 @@
+"""
+Unit tests for the columnar analytics engine.
+
+Tests app/analytics.py and the routes in app/routers/analytics.py.
+"""
+
+import numpy as np
+import pytest
+
+from app import analytics, models
+
+
+@pytest.fixture
+def ledger(make_ledger):
+    """Two children with rewards and purchases over a few months."""
+    return make_ledger(["River", "Summer"], transactions=[
+        ("River", "2021-01-05", "Math", 10.0),
+        ("River", "2021-01-20", "Candy", -2.5),
+        ("River", "2021-02-03", "Toy", -4.25),
+        ("River", "2021-02-10", "Toy", -1.0),
+        ("Summer", "2021-01-10", "Reading", 6.0),
+        ("Summer", "2021-03-01", "Book", -3.0),
+    ])
+
+
+class TestParseDays:
+    """Tests for date conversion."""
+    
+    def test_iso_dates(self):
+        """Test that ISO dates become day ordinals."""
+        days = analytics.parse_days(["1970-01-01", "2021-01-05"])
+        
+        assert list(days) == [0, 18632]
+        assert str(days[1].astype("datetime64[D]")) == "2021-01-05"
+    
+    def test_out_of_range_day_rolls_over(self):
+        """Test that dates the forms accept but the calendar lacks still load."""
+        days = analytics.parse_days(["2021-02-28", "2021-02-31"])
+        
+        assert str(days[1].astype("datetime64[D]")) == "2021-03-03"
+        assert str(analytics.month_of(days)[0].astype("datetime64[M]")) == "2021-02"
+
+
+class TestLedgerColumns:
+    """Tests for loading and refreshing columns."""
+    
+    def test_initial_load(self, test_db, ledger):
+        """Test that every row is loaded with amounts in cents."""
+        columns = analytics.LedgerColumns()
+        
+        assert columns.refresh(test_db) == 6
+        assert columns.snapshot.cents.sum() == 525
+        assert columns.snapshot.cents.dtype == np.int64
+    
+    def test_incremental_refresh(self, test_db, ledger):
+        """Test that only new rows are read on refresh."""
+        river, _ = ledger
+        columns = analytics.LedgerColumns()
+        columns.refresh(test_db)
+        
+        test_db.add(models.Account(children_id=river.id, date="2021-04-01", description="Chore", amount=1.0))
+        test_db.commit()
+        
+        assert columns.refresh(test_db) == 1
+        assert columns.refresh(test_db) == 0
+        assert len(columns) == 7
+    
+    def test_deleted_rows_trigger_reload(self, test_db, ledger):
+        """Test that removed rows are dropped from the columns."""
+        columns = analytics.LedgerColumns()
+        columns.refresh(test_db)
+        
+        test_db.query(models.Account).filter(models.Account.amount < 0).delete()
+        test_db.commit()
+        columns.refresh(test_db)
+        
+        assert len(columns) == 2
+        assert (columns.snapshot.cents > 0).all()
+    
+    def test_refresh_publishes_new_snapshot(self, test_db, ledger):
+        """Test that a snapshot being reported on is never changed by a refresh."""
+        river, _ = ledger
+        columns = analytics.LedgerColumns()
+        columns.refresh(test_db)
+        held = columns.snapshot
+        
+        test_db.add(models.Account(children_id=river.id, date="2021-04-01", description="Chore", amount=1.0))
+        test_db.commit()
+        columns.refresh(test_db)
+        
+        assert {len(array) for array in held} == {6}
+        assert {len(array) for array in columns.snapshot} == {7}
+    
+    def test_flags_archived_openings(self, test_db, ledger):
+        """Test that an opening balance carried from an archived year is not activity."""
+        river, _ = ledger
+        opening = models.Account(children_id=river.id, date="2022-01-01",
+                                 description="Opening balance", amount=2.25)
+        test_db.add(opening)
+        test_db.flush()
+        test_db.add(models.ArchiveOpening(account_id=opening.id, year=2021, children_id=river.id))
+        test_db.commit()
+        columns = analytics.LedgerColumns()
+        
+        assert columns.refresh(test_db) == 7
+        assert columns.refresh(test_db) == 0
+        snapshot = columns.snapshot
+        assert snapshot.ids[snapshot.openings].tolist() == [opening.id]
+        assert analytics.reward_ratio(snapshot)[0]["rewards"] == 10.0
+        assert analytics.percentiles(snapshot, "credit", points=[100]) == {"p100": 10.0}
+        assert analytics.percentiles(snapshot, "balance", points=[100]) == {"p100": 4.5}
+    
+    def test_empty_ledger(self, test_db):
+        """Test that reports over an empty ledger are empty."""
+        columns = analytics.get_columns(test_db)
+        
+        assert analytics.monthly_spend(columns) == []
+        assert analytics.reward_ratio(columns) == []
+        assert analytics.rolling_net(columns) == []
+        assert analytics.percentiles(columns) == {"p50": 0.0, "p90": 0.0, "p99": 0.0}
+
+
+class TestReports:
+    """Tests for the vectorized reports."""
+    
+    def test_monthly_spend(self, test_db, ledger):
+        """Test purchases grouped by child and month."""
+        river, summer = ledger
+        report = analytics.monthly_spend(analytics.get_columns(test_db))
+        
+        assert report == [
+            {"child_id": river.id, "month": "2021-01", "spend": 2.5},
+            {"child_id": river.id, "month": "2021-02", "spend": 5.25},
+            {"child_id": summer.id, "month": "2021-03", "spend": 3.0},
+        ]
+    
+    def test_reward_ratio(self, test_db, ledger):
+        """Test rewards divided by purchases per child."""
+        river, summer = ledger
+        report = analytics.reward_ratio(analytics.get_columns(test_db))
+        
+        assert report[0] == {"child_id": river.id, "rewards": 10.0, "purchases": 7.75,
+                             "ratio": pytest.approx(10 / 7.75)}
+        assert report[1]["ratio"] == 2.0
+    
+    def test_rolling_net_window(self, test_db, ledger):
+        """Test that amounts leave the window after the given number of days."""
+        river, _ = ledger
+        columns = analytics.get_columns(test_db)
+        report = analytics.rolling_net(columns, child_id=river.id, window=30)
+        by_day = {row["date"]: row["net"] for row in report}
+        
+        assert report[0] == {"date": "2021-01-05", "net": 10.0}
+        assert by_day["2021-02-03"] == pytest.approx(3.25)
+        assert by_day["2021-02-04"] == pytest.approx(-6.75)
+        assert len(report) == 37
+    
+    def test_rolling_net_explicit_range(self, test_db, ledger):
+        """Test that a report range before the first activity counts zero."""
+        columns = analytics.get_columns(test_db)
+        report = analytics.rolling_net(columns, start="2020-12-30", end="2021-01-06", window=90)
+        
+        assert report[0] == {"date": "2020-12-30", "net": 0.0}
+        assert report[-1] == {"date": "2021-01-06", "net": 10.0}
+    
+    def test_percentiles(self, test_db, ledger):
+        """Test percentiles of balances and transaction sizes."""
+        columns = analytics.get_columns(test_db)
+        
+        assert analytics.percentiles(columns, "balance", [0, 100]) == {"p0": 2.25, "p100": 3.0}
+        assert analytics.percentiles(columns, "debit", [50]) == {"p50": 2.75}
+    
+    def test_unknown_metric(self, test_db, ledger):
+        """Test that an unknown metric is rejected."""
+        with pytest.raises(ValueError):
+            analytics.percentiles(analytics.get_columns(test_db), "median")
+
+
+class TestAnalyticsRoutes:
+    """Tests for the analytics API endpoints."""
+    
+    def test_monthly_spend_for_child(self, client, ledger):
+        """Test the monthly spend endpoint filtered by child."""
+        _, summer = ledger
+        response = client.get(f"/api/analytics/monthly-spend?child_id={summer.id}")
+        
+        assert response.status_code == 200
+        assert response.json() == [{"child_id": summer.id, "month": "2021-03", "spend": 3.0}]
+    
+    def test_sees_new_transactions(self, client, ledger):
+        """Test that transactions posted after a report appear in the next one."""
+        river, _ = ledger
+        client.get("/api/analytics/reward-ratio")
+        client.post(f"/child/{river.id}/transaction",
+                    data={"date": "2021-05-01", "description": "Chore", "amount": "5"})
+        
+        response = client.get("/api/analytics/reward-ratio")
+        
+        assert response.json()[0]["rewards"] == 15.0
+    
+    def test_invalid_parameters(self, client, ledger):
+        """Test that malformed dates and metrics are rejected."""
+        assert client.get("/api/analytics/rolling-net?start=2021-1-1").status_code == 422
+        assert client.get("/api/analytics/percentiles?metric=mean").status_code == 422
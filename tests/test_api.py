@@ -4,8 +4,13 @@ Unit tests for API endpoints.
 Tests all API routes defined in app/main.py.
 """
 
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import main
 
 
 class TestHomeEndpoint:
@@ -56,6 +61,13 @@ class TestChildEndpoints:
         assert sample_child.name.encode() in response.content
         assert b"Current Balance" in response.content
     
+    def test_get_child_dashboard_pages(self, client, sample_transaction):
+        """Test that older transaction pages render and bad pages are rejected."""
+        child_id = sample_transaction.children_id
+        
+        assert client.get(f"/child/{child_id}?page=2").status_code == 200
+        assert client.get(f"/child/{child_id}?page=0").status_code == 422
+    
     def test_get_child_dashboard_not_found(self, client):
         """Test accessing dashboard for non-existent child."""
         response = client.get("/child/99999")
@@ -160,6 +172,28 @@ class TestTransactionEndpoints:
         
         assert response.status_code == 200
         assert b"Add Transaction" in response.content
+    
+    def test_fanout_transaction(self, client, sample_child):
+        """Test posting one transaction to a list of children."""
+        response = client.post(
+            "/api/transactions/fanout",
+            json={"children_ids": [sample_child.id], "date": "2025-01-29",
+                  "description": "Chinese New Year", "amount": 20.0}
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == {"posted": 1}
+    
+    def test_fanout_transaction_unknown_child(self, client, sample_child):
+        """Test that fan-out to a missing child posts nothing."""
+        response = client.post(
+            "/api/transactions/fanout",
+            json={"children_ids": [sample_child.id, 99999], "date": "2025-01-29",
+                  "description": "Chinese New Year", "amount": 20.0}
+        )
+        
+        assert response.status_code == 404
+        assert client.get(f"/api/child/{sample_child.id}/transactions").json() == []
 
 
 class TestWorkbookCompletionEndpoints:
@@ -198,7 +232,7 @@ class TestWorkbookCompletionEndpoints:
             }
         )
         
-        assert response.status_code == 400
+        assert response.status_code == 409  # Conflict
     
     def test_create_workbook_completion_invalid_workbook(self, client, sample_child):
         """Test recording completion for non-existent workbook."""
@@ -248,5 +282,72 @@ class TestAPIEndpoints:
         response = client.get("/api/child/99999/transactions")
         
         assert response.status_code == 404
+    
+    def test_shared_children_query_has_its_own_session(self, test_db, sample_child):
+        """Test that the coalesced query never uses the caller's request session."""
+        executed = []
+        event.listen(test_db, "do_orm_execute", executed.append)
+        
+        children = asyncio.run(main._children_with_balances(test_db))
+        
+        assert [child.name for child in children] == [sample_child.name]
+        assert executed == []
 
 
+
+
+class TestApplicationStartup:
+    """Tests for the application factory and lifespan hook."""
+    
+    def test_import_has_no_database_side_effects(self, tmp_path):
+        """Test that importing app.main does not create the database."""
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        db_file = tmp_path / "ledger.sqlite"
+        env = {"LEDGER_DATABASE_URL": f"sqlite:///{db_file}", "PATH": ""}
+        result = subprocess.run(
+            [sys.executable, "-c", "import app.main"],
+            cwd=Path(__file__).resolve().parent.parent,
+            env=env,
+            capture_output=True
+        )
+        
+        assert result.returncode == 0, result.stderr
+        assert not db_file.exists()
+    
+    def test_lifespan_initializes_database(self, monkeypatch):
+        """Test that starting the app runs database initialization."""
+        from app import main
+        
+        calls = []
+        monkeypatch.setattr(main, "init_db", lambda: calls.append(True))
+        
+        with TestClient(main.create_app()):
+            assert calls == [True]
+    
+    def test_create_app_returns_independent_apps(self):
+        """Test that the factory builds a fresh application each call."""
+        from app.main import create_app
+        
+        first, second = create_app(), create_app()
+        
+        assert first is not second
+        assert any(route.path == "/api/children" for route in first.routes)
+
+
+class TestMetricsEndpoint:
+    """Tests for the metrics endpoint."""
+    
+    def test_metrics_report_cache_hit_ratio(self, client, sample_child):
+        """Test that cache hit ratios are exposed."""
+        client.get(f"/child/{sample_child.id}/transaction/new")
+        client.get(f"/child/{sample_child.id}/transaction/new")
+        
+        response = client.get("/api/metrics")
+        
+        assert response.status_code == 200
+        children = response.json()["cache.children"]
+        assert children["hits"] >= 1
+        assert 0.0 < children["hit_ratio"] <= 1.0
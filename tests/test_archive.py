@@ -0,0 +1,155 @@
+"""
+Unit tests for yearly ledger archival.
+
+Tests app/archive.py and the include_archived reads.
+"""
+
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app import analytics, archive, crud, interest
+
+TODAY = date(2026, 3, 1)
+
+
+@pytest.fixture
+def archive_file(test_engine):
+    """Remove the archive database beside the test ledger afterwards."""
+    path = archive.archive_path(test_engine)
+    yield path
+    test_engine.dispose()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+@pytest.fixture
+def ledger(make_ledger, archive_file):
+    """Two children with history across 2024-2026."""
+    return make_ledger(["River", "Summer"], transactions=[
+        ("River", "2024-03-01", "Gift", 100.0),
+        ("River", "2024-07-04", "Candy", -12.5),
+        ("Summer", "2024-05-05", "Tooth", 5.0),
+        ("Summer", "2024-06-01", "Book", -5.0),
+        ("River", "2025-02-10", "Chores", 20.0),
+        ("Summer", "2025-12-31", "Stickers", -3.0),
+        ("River", "2026-01-15", "Allowance", 10.0),
+    ])
+
+
+def _history(db, child_id):
+    """(date, description, amount) of a child's full history."""
+    return [
+        (row.date, row.description, row.amount)
+        for row in crud.get_child_transactions(db, child_id, include_archived=True)
+    ]
+
+
+class TestArchiveYear:
+    """Tests for moving a closed year."""
+    
+    def test_moves_rows_and_carries_balance(self, test_db, ledger):
+        """Test that the hot table keeps only openings and later rows."""
+        river, summer = ledger
+        before = _history(test_db, river.id)
+        
+        manifest = archive.archive_year(test_db, 2024, today=TODAY)
+        
+        assert manifest.rows == 4
+        assert manifest.table_name == "Account_2024"
+        hot = crud.get_child_transactions(test_db, river.id)
+        assert [(t.date, t.description, t.amount) for t in hot] == [
+            ("2025-01-01", "Opening balance", 87.5),
+            ("2025-02-10", "Chores", 20.0),
+            ("2026-01-15", "Allowance", 10.0),
+        ]
+        assert crud.get_child_balance(test_db, river.id) == 117.5
+        # Summer's 2024 nets to zero, so no opening row
+        assert [t.description for t in crud.get_child_transactions(test_db, summer.id)] == ["Stickers"]
+        assert _history(test_db, river.id) == before
+    
+    def test_archives_successive_years(self, test_db, ledger):
+        """Test that openings chain and archived history stays complete."""
+        river, summer = ledger
+        before = {child.id: _history(test_db, child.id) for child in ledger}
+        
+        archived = archive.archive_through(test_db, today=TODAY)
+        
+        assert [manifest.year for manifest in archived] == [2024, 2025]
+        assert archive.archived_years(test_db) == [2024, 2025]
+        hot = crud.get_child_transactions(test_db, river.id)
+        assert [(t.date, t.amount) for t in hot] == [("2026-01-01", 107.5), ("2026-01-15", 10.0)]
+        assert crud.get_child_balance(test_db, summer.id) == -3.0
+        for child in ledger:
+            assert _history(test_db, child.id) == before[child.id]
+    
+    def test_rerun_is_noop(self, test_db, ledger):
+        """Test that an archived year is not moved twice."""
+        archive.archive_year(test_db, 2024, today=TODAY)
+        
+        assert archive.archive_year(test_db, 2024, today=TODAY) is None
+        assert archive.archive_through(test_db, 2024, today=TODAY) == []
+    
+    def test_open_year_refused(self, test_db, ledger):
+        """Test that the current year cannot be archived."""
+        with pytest.raises(ValueError):
+            archive.archive_year(test_db, 2026, today=TODAY)
+        with pytest.raises(ValueError):
+            archive.archive_through(test_db, 2026, today=TODAY)
+    
+    def test_leaderboards_unchanged(self, test_db, ledger):
+        """Test that closed-year leaderboards survive and openings are not earnings."""
+        query = text("SELECT children_id, period, net, earned FROM LeaderboardPeriods ORDER BY 1, 2")
+        periods = test_db.execute(query).all()
+        totals = test_db.execute(text("SELECT * FROM LeaderboardTotals ORDER BY 1")).all()
+        
+        archive.archive_through(test_db, today=TODAY)
+        
+        assert test_db.execute(query).all() == periods
+        assert test_db.execute(text("SELECT * FROM LeaderboardTotals ORDER BY 1")).all() == totals
+    
+    def test_interest_and_balances_unchanged(self, test_db, ledger):
+        """Test that carried-forward balances keep earning interest."""
+        payouts = interest.compute_interest(analytics.get_columns(test_db), "2025-03", 0.05)
+        balances = analytics.percentiles(analytics.get_columns(test_db), "balance")
+        
+        archive.archive_through(test_db, 2024, today=TODAY)
+        
+        assert payouts
+        assert interest.compute_interest(analytics.get_columns(test_db), "2025-03", 0.05) == payouts
+        assert analytics.percentiles(analytics.get_columns(test_db), "balance") == balances
+
+
+class TestVerify:
+    """Tests for checksum verification."""
+    
+    def test_detects_tampering(self, test_db, ledger):
+        """Test that an edited archive no longer verifies."""
+        archive.archive_year(test_db, 2024, today=TODAY)
+        assert archive.verify(test_db) == [{"year": 2024, "rows": 4, "ok": True}]
+        
+        archive.attach(test_db)
+        test_db.execute(text("UPDATE archive.Account_2024 SET amount = 1000 WHERE description = 'Gift'"))
+        test_db.commit()
+        
+        assert archive.verify(test_db) == [{"year": 2024, "rows": 4, "ok": False}]
+
+
+class TestArchiveRoutes:
+    """Tests for reading archived history over HTTP."""
+    
+    def test_include_archived(self, client, test_db, ledger):
+        """Test the API and dashboard with and without archived years."""
+        river, _ = ledger
+        archive.archive_year(test_db, 2024, today=TODAY)
+        
+        hot = client.get(f"/api/child/{river.id}/transactions").json()
+        full = client.get(f"/api/child/{river.id}/transactions?include_archived=true").json()
+        
+        assert [t["description"] for t in hot] == ["Opening balance", "Chores", "Allowance"]
+        assert [t["description"] for t in full] == ["Gift", "Candy", "Chores", "Allowance"]
+        page = client.get(f"/child/{river.id}?archived=1")
+        assert page.status_code == 200
+        assert "Hide archived years" in page.text
@@ -0,0 +1,125 @@
+"""
+Unit tests for online backups.
+
+Tests app/backup.py against a file ledger in a temporary directory.
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from app import backup, models, tenants
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    """A file ledger with one child and a few hundred transactions."""
+    tenant_engines = tenants.TenantEngines(str(tmp_path / "ledgers"))
+    path = tenant_engines.create("holt")
+    db = tenant_engines.session_factory("holt")()
+    child = models.Child(name="River")
+    db.add(child)
+    db.commit()
+    db.add_all([
+        models.Account(children_id=child.id, date="2025-01-01", description="Birthday gift", amount=1.0)
+        for _ in range(300)
+    ])
+    db.commit()
+    db.close()
+    yield path
+    tenant_engines.clear()
+
+
+class TestBackup:
+    """Tests for taking and verifying snapshots."""
+    
+    def test_snapshot_is_verified(self, ledger, tmp_path):
+        """Test that a stepped copy has every row and a matching manifest."""
+        directory = str(tmp_path / "backups")
+        
+        manifest = backup.backup(ledger, directory, pages=2)
+        
+        assert manifest["steps"] > 1
+        assert manifest["tables"]["Account"] == 300
+        assert backup.verify(manifest["path"]) == {"path": manifest["path"], "ok": True, "problems": []}
+        assert os.path.samefile(manifest["path"], backup.latest_path(ledger, directory))
+        assert backup.snapshots(ledger, directory) == [manifest["path"]]
+    
+    def test_writes_during_backup(self, ledger, tmp_path, monkeypatch):
+        """Test that writers commit between page batches without waiting."""
+        writer = sqlite3.connect(ledger, timeout=0)
+        writes = []
+        
+        def write(seconds):
+            # Fails with "database is locked" if the copy held its lock
+            writer.execute(
+                "INSERT INTO Account (children_id, date, description, amount) VALUES (1, '2025-02-01', 'Chore', 2)"
+            )
+            writer.commit()
+            writes.append(seconds)
+        
+        monkeypatch.setattr(backup.time, "sleep", write)
+        try:
+            manifest = backup.backup(ledger, str(tmp_path / "backups"), pages=4, pause=0.01)
+        finally:
+            writer.close()
+        
+        assert writes
+        assert manifest["tables"]["Account"] >= 300
+        assert backup.verify(manifest["path"])["ok"]
+    
+    def test_verify_detects_changes(self, ledger, tmp_path):
+        """Test that a modified snapshot fails verification."""
+        manifest = backup.backup(ledger, str(tmp_path / "backups"))
+        
+        connection = sqlite3.connect(manifest["path"])
+        connection.execute("DELETE FROM Account WHERE id = 1")
+        connection.commit()
+        connection.close()
+        
+        result = backup.verify(manifest["path"])
+        assert not result["ok"]
+        assert result["problems"] == ["sha256 differs", "row counts differ"]
+    
+    def test_prunes_old_snapshots(self, ledger, tmp_path):
+        """Test that only the newest snapshots are kept."""
+        directory = str(tmp_path / "backups")
+        
+        paths = [backup.backup(ledger, directory, keep=2)["path"] for _ in range(3)]
+        
+        assert backup.snapshots(ledger, directory) == paths[1:]
+        assert not os.path.exists(f"{paths[0]}.json")
+
+
+class TestReportSnapshot:
+    """Tests for serving reports from the latest snapshot."""
+    
+    def test_snapshot_sessionmaker(self, ledger, tmp_path):
+        """Test that reads use the newest snapshot and cannot write."""
+        directory = str(tmp_path / "backups")
+        assert backup.snapshot_sessionmaker(ledger, directory) is None
+        backup.backup(ledger, directory)
+        
+        first = backup.snapshot_sessionmaker(ledger, directory)
+        assert backup.snapshot_sessionmaker(ledger, directory) is first
+        db = first()
+        try:
+            assert db.query(models.Account).count() == 300
+            db.add(models.Child(name="Summer"))
+            with pytest.raises(Exception, match="readonly"):
+                db.commit()
+        finally:
+            db.close()
+        
+        backup.backup(ledger, directory)
+        assert backup.snapshot_sessionmaker(ledger, directory) is not first
+    
+    def test_analytics_fall_back_to_live_database(self, client, sample_transaction, monkeypatch):
+        """Test that reports read the live database when no snapshot exists."""
+        monkeypatch.setattr(backup, "REPORT_SNAPSHOT", True)
+        
+        response = client.get("/api/analytics/reward-ratio")
+        
+        assert response.status_code == 200
+        assert len(response.json()) == 1
@@ -0,0 +1,143 @@
+"""
+Unit tests for the in-process caches.
+
+Tests the LRU cache and single-flight coalescing defined in app/cache.py.
+"""
+
+import asyncio
+
+from app.cache import LRUCache, SingleFlight
+
+
+class TestLRUCache:
+    """Tests for LRUCache."""
+    
+    def test_get_put_counts_hits_and_misses(self):
+        """Test that lookups are counted and the hit ratio reported."""
+        cache = LRUCache(maxsize=4)
+        
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+    
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        """Test that entries older than the TTL are treated as misses."""
+        import app.cache
+        
+        now = [100.0]
+        monkeypatch.setattr(app.cache.time, "monotonic", lambda: now[0])
+        cache = LRUCache(maxsize=2, ttl=5)
+        cache.put("a", 1)
+        
+        now[0] = 104.0
+        assert cache.get("a") == 1
+        now[0] = 106.0
+        assert cache.get("a") is None
+    
+    def test_invalidate_and_none_values(self):
+        """Test that invalidation drops entries and None is never stored."""
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.put("b", None)
+        cache.invalidate("a")
+        
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+    
+    def test_concurrent_callers_share_one_computation(self):
+        """Test that callers with the same key wait on one computation."""
+        flights = SingleFlight()
+        runs = []
+        
+        async def compute(key):
+            runs.append(key)
+            await asyncio.sleep(0.01)
+            return [key]
+        
+        async def scenario():
+            results = await asyncio.gather(*(
+                flights.run(key, lambda key=key: compute(key)) for key in "aaab"
+            ))
+            again = await flights.run("a", lambda: compute("a"))
+            return results, again
+        
+        results, again = asyncio.run(scenario())
+        
+        assert runs == ["a", "b", "a"]
+        assert results == [["a"], ["a"], ["a"], ["b"]]
+        assert results[0] is results[1]
+        assert again == ["a"]
+        assert flights.stats() == {"computed": 3, "joined": 2, "reused": 0, "in_flight": 0, "ttl": 0.0}
+    
+    def test_ttl_reuses_result(self):
+        """Test that a completed result is reused within the TTL."""
+        flights = SingleFlight(ttl=60)
+        runs = []
+        
+        async def compute():
+            runs.append(1)
+            return len(runs)
+        
+        async def scenario():
+            return [await flights.run("k", compute) for _ in range(3)]
+        
+        assert asyncio.run(scenario()) == [1, 1, 1]
+        assert flights.stats()["reused"] == 2
+    
+    def test_errors_reach_every_caller_and_are_not_kept(self):
+        """Test that a failed computation fails its waiters and is retried."""
+        flights = SingleFlight(ttl=60)
+        
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+        
+        async def scenario():
+            results = await asyncio.gather(
+                flights.run("k", fail), flights.run("k", fail), return_exceptions=True
+            )
+            return results, await flights.run("k", lambda: asyncio.sleep(0, result="ok"))
+        
+        results, retried = asyncio.run(scenario())
+        
+        assert [str(error) for error in results] == ["boom", "boom"]
+        assert retried == "ok"
+    
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that the first caller disconnecting leaves the computation running."""
+        flights = SingleFlight()
+        
+        async def compute():
+            await asyncio.sleep(0.01)
+            return "done"
+        
+        async def scenario():
+            first = asyncio.ensure_future(flights.run("k", compute))
+            second = asyncio.ensure_future(flights.run("k", compute))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+        
+        assert asyncio.run(scenario()) == "done"
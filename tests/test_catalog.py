@@ -0,0 +1,165 @@
+"""
+Unit tests for workbook catalog autocomplete and progress.
+
+Tests app/catalog.py and the routes in app/routers/catalog.py.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app import catalog, models, seed
+
+
+@pytest.fixture
+def workbooks(test_db):
+    """The standard grade/subject catalog."""
+    test_db.add_all(models.Workbook(name=name) for name in seed.workbook_catalog())
+    test_db.commit()
+    return test_db.query(models.Workbook).all()
+
+
+def _names(results):
+    return [r["name"] for r in results]
+
+
+class TestSuggestWorkbooks:
+    """Tests for suggest_workbooks."""
+    
+    def test_substring_match(self, test_db, workbooks):
+        """Test that titles containing the text are suggested."""
+        names = _names(catalog.suggest_workbooks(test_db, "fraction", limit=50))
+        
+        assert "Grade 4 Decimals and Fractions" in names
+        assert "Grade 6 Fractions" in names
+        assert all("fraction" in name.lower() for name in names)
+    
+    def test_prefix_matches_rank_first(self, test_db, workbooks):
+        """Test that titles starting with the text come first."""
+        test_db.add(models.Workbook(name="Reading Comprehension"))
+        test_db.commit()
+        
+        names = _names(catalog.suggest_workbooks(test_db, "readi"))
+        
+        assert names[0] == "Reading Comprehension"
+    
+    def test_short_prefix_uses_name_index(self, test_db, workbooks):
+        """Test one- and two-character queries as case-insensitive prefixes."""
+        names = _names(catalog.suggest_workbooks(test_db, "gr", limit=5))
+        
+        assert len(names) == 5
+        assert all(name.startswith("Grade") for name in names)
+        
+        plan = " ".join(str(row[-1]) for row in test_db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM Workbooks "
+            "WHERE name COLLATE NOCASE >= 'gr' AND name COLLATE NOCASE < 'gr' || char(65535)"
+        )))
+        assert "ix_Workbooks_name_nocase" in plan
+    
+    def test_skips_completed_workbooks(self, test_db, workbooks, sample_child):
+        """Test that workbooks the child completed are not suggested."""
+        done = next(w for w in workbooks if w.name == "Grade 6 Fractions")
+        test_db.add(models.Member(children_id=sample_child.id, workbooks_id=done.id, completed=1, date="2025-01-01"))
+        test_db.commit()
+        
+        names = _names(catalog.suggest_workbooks(test_db, "fractions", child_id=sample_child.id))
+        
+        assert "Grade 6 Fractions" not in names
+        assert "Grade 4 Decimals and Fractions" in names
+    
+    def test_limit_and_empty_query(self, test_db, workbooks):
+        """Test result limits and blank input."""
+        assert len(catalog.suggest_workbooks(test_db, "grade", limit=3)) == 3
+        assert catalog.suggest_workbooks(test_db, "   ") == []
+    
+    def test_new_workbooks_are_indexed(self, test_db, workbooks):
+        """Test that the trigram index follows inserts."""
+        test_db.add(models.Workbook(name="Grade 7 Astronomy"))
+        test_db.commit()
+        
+        assert _names(catalog.suggest_workbooks(test_db, "astro")) == ["Grade 7 Astronomy"]
+
+
+class TestWorkbookFacets:
+    """Tests for grade and subject parsing."""
+    
+    def test_titles_are_parsed(self, test_db):
+        """Test that grade, subject and volume suffixes are handled."""
+        test_db.add_all([
+            models.Workbook(name="Grade 4 Decimals and Fractions"),
+            models.Workbook(name="grade 10 Algebra Volume 3"),
+            models.Workbook(name="Kung Fu Form Book"),
+        ])
+        test_db.commit()
+        rows = test_db.execute(text("SELECT grade, subject FROM WorkbookFacets ORDER BY workbook_id")).all()
+        
+        assert rows == [(4, "Decimals and Fractions"), (10, "Algebra"), (None, None)]
+    
+    def test_existing_titles_are_backfilled(self, test_db, workbooks):
+        """Test that installing the facet triggers parses existing titles."""
+        connection = test_db.connection()
+        connection.execute(text("DROP TRIGGER WorkbookFacets_insert"))
+        connection.execute(text("DELETE FROM WorkbookFacets"))
+        
+        models.install_workbook_facets(connection)
+        
+        count = connection.execute(text("SELECT COUNT(*) FROM WorkbookFacets WHERE grade IS NOT NULL")).scalar()
+        assert count == len(workbooks)
+
+
+class TestChildProgress:
+    """Tests for child_progress."""
+    
+    def test_counts_by_grade_and_subject(self, test_db, workbooks, sample_child):
+        """Test completed and total counts per facet."""
+        test_db.add(models.Workbook(name="Grade 6 Fractions Volume 2"))
+        test_db.add(models.Workbook(name="Piano Book"))
+        test_db.commit()
+        fractions = [w.id for w in test_db.query(models.Workbook).filter(models.Workbook.name.like("Grade 6 Fractions%"))]
+        for workbook_id in fractions:
+            test_db.add(models.Member(children_id=sample_child.id, workbooks_id=workbook_id, completed=1, date="2024-01-01"))
+        test_db.commit()
+        
+        progress = catalog.child_progress(test_db, sample_child.id)
+        by_facet = {(p["grade"], p["subject"]): (p["completed"], p["total"]) for p in progress}
+        
+        assert by_facet[(6, "Fractions")] == (2, 2)
+        assert by_facet[(6, "Reading")] == (0, 1)
+        assert progress[0]["grade"] == 1
+        assert progress[-1] == {"grade": None, "subject": None, "completed": 0, "total": 1}
+    
+    def test_empty_catalog(self, test_db, sample_child):
+        """Test that an empty catalog reports nothing."""
+        assert catalog.child_progress(test_db, sample_child.id) == []
+
+
+class TestSuggestEndpoint:
+    """Tests for the suggest API."""
+    
+    def test_api_suggest(self, client, workbooks):
+        """Test the JSON autocomplete endpoint."""
+        response = client.get("/api/workbooks/suggest", params={"q": "division", "limit": 2})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 2
+        assert all("Division" in item["name"] for item in data)
+    
+    def test_completion_form_does_not_render_catalog(self, client, sample_child, workbooks):
+        """Test that the form autocompletes instead of listing every title."""
+        response = client.get(f"/child/{sample_child.id}/workbook/new")
+        
+        assert response.status_code == 200
+        assert b"Grade 4 Decimals and Fractions" not in response.content
+        assert b"/api/workbooks/suggest" in response.content
+    
+    def test_api_progress(self, client, sample_child, workbooks):
+        """Test the progress endpoint and its dashboard tab."""
+        response = client.get(f"/api/child/{sample_child.id}/progress")
+        
+        assert response.status_code == 200
+        assert response.json()[0] == {"grade": 1, "subject": "Addition", "completed": 0, "total": 1}
+        assert "Word Problems" in client.get(f"/child/{sample_child.id}").text
+    
+    def test_api_progress_unknown_child(self, client):
+        """Test that progress for a missing child is not found."""
+        assert client.get("/api/child/999/progress").status_code == 404
@@ -0,0 +1,97 @@
+"""
+Unit tests for the headless command line.
+
+Tests app/cli.py against the test database.
+"""
+
+import io
+import json
+
+from app import cli, models
+
+
+def _batch(test_db, *commands, chunk_size=2):
+    """Run commands through run_batch and return the result lines."""
+    lines = [command if isinstance(command, str) else json.dumps(command) for command in commands]
+    return list(cli.run_batch(test_db, lines, chunk_size=chunk_size))
+
+
+class TestBatch:
+    """Tests for NDJSON batch input."""
+    
+    def test_applies_commands_in_chunks(self, test_db, sample_child, sample_workbook):
+        """Test that postings and completions are applied and reported in order."""
+        child_id, name, workbook = sample_child.id, sample_child.name, sample_workbook.name
+        
+        results = _batch(
+            test_db,
+            {"op": "add-transaction", "child": name, "date": "2025-01-31", "description": "Allowance", "amount": 5},
+            {"op": "add-transaction", "child": child_id, "date": "2025-02-01", "description": "Toy", "amount": -2},
+            "",
+            {"op": "complete-workbook", "child": child_id, "workbook": workbook, "date": "2025-02-02"},
+            {"op": "complete-workbook", "child": name, "workbook": workbook, "date": "2025-02-03"},
+        )
+        
+        assert [(r["line"], r["ok"], r["op"]) for r in results[:-1]] == [
+            (1, True, "add-transaction"),
+            (2, True, "add-transaction"),
+            (4, True, "complete-workbook"),
+            (5, True, "complete-workbook"),
+        ]
+        assert [r["recorded"] for r in results[2:4]] == [True, False]
+        assert results[-1]["summary"]["applied"] == 4
+        assert cli.balances(test_db, child_id) == [{"child_id": child_id, "name": name, "balance": 3.0}]
+    
+    def test_rejected_commands_do_not_block_the_chunk(self, test_db, sample_child):
+        """Test that invalid lines are reported and the rest still applied."""
+        results = _batch(
+            test_db,
+            "not json",
+            {"op": "add-transaction", "child": "Nobody", "date": "2025-01-01", "description": "x", "amount": 1},
+            {"op": "add-transaction", "child": sample_child.id, "date": "2025-13-01", "description": "x", "amount": 1},
+            {"op": "refund", "child": sample_child.id},
+            {"op": "add-transaction", "child": sample_child.id, "date": "2025-01-01", "description": "Gift", "amount": 1},
+            chunk_size=10
+        )
+        
+        assert [r["ok"] for r in results[:-1]] == [False, False, False, False, True]
+        assert results[1]["error"] == "Unknown child: Nobody"
+        assert results[2]["error"].startswith("date:")
+        assert results[-1]["summary"]["failed"] == 4
+        assert test_db.query(models.Account).count() == 1
+
+
+class TestCommands:
+    """Tests for the single-command subcommands."""
+    
+    def test_export_streams_transactions(self, test_db, sample_transaction):
+        """Test that export yields every transaction as a dict."""
+        rows = list(cli.export(test_db, sample_transaction.children_id))
+        
+        assert rows == [{
+            "id": sample_transaction.id,
+            "children_id": sample_transaction.children_id,
+            "date": sample_transaction.date,
+            "description": sample_transaction.description,
+            "amount": sample_transaction.amount
+        }]
+    
+    def test_main_writes_json(self, test_db, sample_child, monkeypatch):
+        """Test that add-transaction prints the posted row as JSON."""
+        monkeypatch.setattr(cli.tenants, "command_sessionmaker", lambda tenant=None: lambda: test_db)
+        monkeypatch.setattr(test_db, "close", lambda: None)
+        out = io.StringIO()
+        
+        code = cli.main([
+            "add-transaction", "--child", str(sample_child.id),
+            "--date", "2025-03-01", "--description", "Gift", "--amount", "2.5"
+        ], stdout=out)
+        
+        assert code == 0
+        result = json.loads(out.getvalue())
+        assert result["ok"] is True
+        assert result["amount"] == 2.5
+        
+        out = io.StringIO()
+        assert cli.main(["balance", "--child", "Nobody"], stdout=out) == 2
+        assert json.loads(out.getvalue()) == {"ok": False, "error": "Unknown child: Nobody"}
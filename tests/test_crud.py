@@ -4,6 +4,8 @@ Unit tests for CRUD operations.
 Tests all database operations defined in app/crud.py.
 """
 
+import threading
+
 import pytest
 from app import crud, schemas, models
 
@@ -75,6 +77,40 @@ class TestChildCRUD:
         balance = crud.get_child_balance(test_db, sample_child.id)
         
         assert balance == 30.00
+    
+    def test_get_children_with_balances(self, test_db, sample_child, sample_transaction):
+        """Test that every child is listed with their balance, zero if none."""
+        other = crud.create_child(test_db, schemas.ChildCreate(name="Summer"))
+        
+        children = crud.get_children_with_balances(test_db)
+        
+        assert children == [
+            (sample_child.id, sample_child.name, sample_transaction.amount),
+            (other.id, "Summer", 0.0)
+        ]
+    
+    def test_commit_advances_read_version(self, test_db, sample_child):
+        """Test that a commit changes the version shared reads are keyed by."""
+        scope, before = crud.read_version(test_db)
+        crud.create_child(test_db, schemas.ChildCreate(name="Summer"))
+        
+        assert crud.read_version(test_db) == (scope, before + 1)
+    
+    def test_concurrent_commits_each_advance_the_version(self, test_db):
+        """Test that commits from several threads are never merged into one generation."""
+        scope, before = crud.read_version(test_db)
+        
+        def commit_many():
+            for _ in range(1000):
+                crud._bump_generation(test_db)
+        
+        threads = [threading.Thread(target=commit_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert crud.read_version(test_db) == (scope, before + 4000)
 
 
 class TestWorkbookCRUD:
@@ -171,6 +207,42 @@ class TestTransactionCRUD:
         # First transaction should be the earlier date
         assert transactions[0].date == "2025-01-10"
         assert transactions[1].date == "2025-01-15"
+    
+    def test_get_child_transactions_running_balance(self, test_db, sample_child):
+        """Test that each row carries the balance after it."""
+        for day, amount in [("2025-01-03", -4.0), ("2025-01-01", 10.0), ("2025-01-02", 2.5)]:
+            test_db.add(models.Account(children_id=sample_child.id, date=day, description="Entry", amount=amount))
+        test_db.commit()
+        
+        transactions = crud.get_child_transactions(test_db, sample_child.id)
+        
+        assert [t.cumulative for t in transactions] == [10.0, 12.5, 8.5]
+    
+    def test_create_fanout_transactions_all_children(self, test_db):
+        """Test posting one transaction to every child."""
+        test_db.add_all(models.Child(name=f"Child {n}") for n in range(50))
+        test_db.commit()
+        fanout = schemas.TransactionFanout(date="2025-01-29", description="Chinese New Year", amount=20.00)
+        
+        posted = crud.create_fanout_transactions(test_db, fanout)
+        
+        assert posted == 50
+        assert test_db.query(models.Account).filter(models.Account.description == "Chinese New Year").count() == 50
+    
+    def test_create_fanout_transactions_selected_children(self, test_db):
+        """Test that only listed children are posted to, once each."""
+        children = [models.Child(name=f"Child {n}") for n in range(3)]
+        test_db.add_all(children)
+        test_db.commit()
+        ids = [children[0].id, children[2].id, children[2].id]
+        fanout = schemas.TransactionFanout(children_ids=ids, date="2025-01-29", description="Kung Fu XP", amount=30.00)
+        
+        assert crud.create_fanout_transactions(test_db, fanout) == 2
+        assert crud.get_child_balance(test_db, children[1].id) == 0.0
+    
+    def test_get_missing_children(self, test_db, sample_child):
+        """Test finding unknown child IDs."""
+        assert crud.get_missing_children(test_db, [sample_child.id, 999, 998]) == [998, 999]
 
 
 class TestCompletedWorkbookCRUD:
@@ -210,6 +282,51 @@ class TestCompletedWorkbookCRUD:
             test_db, sample_child.id, sample_workbook.id
         )
     
+    def test_record_completed_workbook_reports_new_rows(self, test_db, sample_child, sample_workbook):
+        """Test that a duplicate completion is ignored and reported."""
+        first = schemas.CompletedWorkbookCreate(
+            children_id=sample_child.id,
+            workbooks_id=sample_workbook.id,
+            date="2025-01-20"
+        )
+        duplicate = schemas.CompletedWorkbookCreate(
+            children_id=sample_child.id,
+            workbooks_id=sample_workbook.id,
+            date="2025-02-20"
+        )
+        
+        assert crud.record_completed_workbook(test_db, first) is True
+        assert crud.record_completed_workbook(test_db, duplicate) is False
+        
+        completions = crud.get_child_completed_workbooks(test_db, sample_child.id)
+        assert len(completions) == 1
+        assert completions[0].date == "2025-01-20"
+    
+    def test_record_completed_workbook_concurrent(self, test_engine, sample_child, sample_workbook):
+        """Test that concurrent submissions record exactly one completion."""
+        from concurrent.futures import ThreadPoolExecutor
+        from sqlalchemy.orm import sessionmaker
+        
+        Session = sessionmaker(bind=test_engine)
+        completion = schemas.CompletedWorkbookCreate(
+            children_id=sample_child.id,
+            workbooks_id=sample_workbook.id,
+            date="2025-01-20"
+        )
+        
+        def submit(_):
+            db = Session()
+            try:
+                return crud.record_completed_workbook(db, completion)
+            finally:
+                db.close()
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(submit, range(16)))
+        
+        assert results.count(True) == 1
+        assert results.count(False) == 15
+    
     def test_get_child_completed_workbooks(self, test_db, sample_child, sample_workbook):
         """Test retrieving completed workbooks for a child."""
         # Add completion
@@ -224,9 +341,9 @@ class TestCompletedWorkbookCRUD:
         completions = crud.get_child_completed_workbooks(test_db, sample_child.id)
         
         assert len(completions) >= 1
-        assert completions[0]['children_id'] == sample_child.id
-        assert completions[0]['workbooks_id'] == sample_workbook.id
-        assert completions[0]['workbook_name'] == sample_workbook.name
+        assert completions[0].children_id == sample_child.id
+        assert completions[0].workbooks_id == sample_workbook.id
+        assert completions[0].workbook_name == sample_workbook.name
     
     def test_get_child_completed_workbooks_empty(self, test_db, sample_child):
         """Test retrieving completed workbooks when none exist."""
@@ -235,3 +352,74 @@ class TestCompletedWorkbookCRUD:
         assert len(completions) == 0
 
 
+
+
+class TestLookupCache:
+    """Tests for cached child and workbook lookups."""
+    
+    def test_lookup_child_served_from_cache(self, test_db, sample_child):
+        """Test that a repeated child lookup does not hit the database."""
+        first = crud.lookup_child(test_db, sample_child.id)
+        hits = crud.child_cache.hits
+        second = crud.lookup_child(test_db, sample_child.id)
+        
+        assert first == second == (sample_child.id, sample_child.name)
+        assert crud.child_cache.hits == hits + 1
+    
+    def test_lookup_child_not_found_not_cached(self, test_db):
+        """Test that missing children are not cached."""
+        assert crud.lookup_child(test_db, 99999) is None
+        child = crud.create_child(test_db, schemas.ChildCreate(name="Late"))
+        
+        assert crud.lookup_child(test_db, child.id).name == "Late"
+    
+    def test_create_workbook_invalidates_catalog(self, test_db, sample_workbook):
+        """Test that adding a workbook refreshes the cached catalog."""
+        assert len(crud.lookup_workbooks(test_db)) == 1
+        
+        crud.create_workbook(test_db, schemas.WorkbookCreate(name="Grade 2 Reading"))
+        
+        names = [w.name for w in crud.lookup_workbooks(test_db)]
+        assert names == [sample_workbook.name, "Grade 2 Reading"]
+    
+    def test_lookup_workbook(self, test_db, sample_workbook):
+        """Test cached workbook lookup by ID."""
+        workbook = crud.lookup_workbook(test_db, sample_workbook.id)
+        
+        assert workbook.name == sample_workbook.name
+        assert crud.lookup_workbook(test_db, 99999) is None
+
+
+class TestDashboard:
+    """Tests for the single-statement dashboard loader."""
+    
+    def test_load_dashboard_pages(self, test_db, test_engine, sample_child, sample_workbook):
+        """Test that every section comes from one statement, newest page first."""
+        from sqlalchemy import event
+        
+        for day in range(1, 6):
+            test_db.add(models.Account(
+                children_id=sample_child.id, date=f"2025-01-0{day}", description=f"Day {day}", amount=float(day)
+            ))
+        test_db.add(models.Member(children_id=sample_child.id, workbooks_id=sample_workbook.id, completed=1, date="2025-01-02"))
+        test_db.commit()
+        child = crud.ChildRef(sample_child.id, sample_child.name)
+        statements = []
+        event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        
+        newest = crud.load_dashboard(test_db, sample_child.id, page=1, page_size=2)
+        
+        assert len(statements) == 1
+        assert newest.child == child
+        assert newest.balance == 15.0
+        assert (newest.transaction_count, newest.pages) == (5, 3)
+        assert [(t.date, t.cumulative) for t in newest.transactions] == [("2025-01-04", 10.0), ("2025-01-05", 15.0)]
+        assert [c.workbook_name for c in newest.completions] == [sample_workbook.name]
+        assert newest.archived_years == []
+        
+        oldest = crud.load_dashboard(test_db, sample_child.id, page=3, page_size=2)
+        assert [(t.date, t.cumulative) for t in oldest.transactions] == [("2025-01-01", 1.0)]
+    
+    def test_load_dashboard_missing_child(self, test_db):
+        """Test that an unknown child loads nothing."""
+        assert crud.load_dashboard(test_db, 99999) is None
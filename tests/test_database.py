@@ -0,0 +1,123 @@
+"""
+Unit tests for database configuration.
+
+Tests engine setup and write serialization defined in app/database.py.
+"""
+
+import multiprocessing
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, database, models, schemas
+
+
+def _locked_error():
+    """Build the error SQLAlchemy raises for a locked database."""
+    import sqlite3
+    return OperationalError("INSERT", {}, sqlite3.OperationalError("database is locked"))
+
+
+def _write_transactions(url, child_id, count):
+    """Insert transactions from a separate process."""
+    engine = database.make_engine(url)
+    db = sessionmaker(bind=engine)()
+    for n in range(count):
+        crud.create_transaction(db, schemas.TransactionCreate(
+            children_id=child_id,
+            date="2025-01-01",
+            description=f"Write {n}",
+            amount=1.0
+        ))
+    db.close()
+    engine.dispose()
+
+
+class TestEngineConfiguration:
+    """Tests for SQLite connection settings."""
+    
+    def test_file_database_uses_wal(self, tmp_path):
+        """Test that file databases are switched to WAL journaling."""
+        engine = database.make_engine(f"sqlite:///{tmp_path / 'ledger.sqlite'}")
+        
+        with engine.connect() as conn:
+            mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+            timeout = conn.execute(text("PRAGMA busy_timeout")).scalar()
+        
+        assert mode == "wal"
+        assert timeout == int(database.BUSY_TIMEOUT_SECONDS * 1000)
+    
+    def test_memory_database_detected(self):
+        """Test that in-memory engines need no lock file."""
+        engine = database.make_engine("sqlite://")
+        
+        assert database.is_memory_database(engine)
+        assert database._lock_path(engine) is None
+
+
+class TestSerializedWrite:
+    """Tests for the write retry decorator."""
+    
+    def test_retries_locked_database(self, test_db, monkeypatch):
+        """Test that a locked write is rolled back and retried."""
+        monkeypatch.setattr(database, "WRITE_RETRY_BACKOFF_SECONDS", 0)
+        calls = []
+        
+        @database.serialized_write
+        def flaky_write(db):
+            calls.append(1)
+            if len(calls) < 3:
+                raise _locked_error()
+            return "written"
+        
+        assert flaky_write(test_db) == "written"
+        assert len(calls) == 3
+    
+    def test_gives_up_after_retries(self, test_db, monkeypatch):
+        """Test that a persistently locked write raises."""
+        monkeypatch.setattr(database, "WRITE_RETRY_BACKOFF_SECONDS", 0)
+        
+        @database.serialized_write
+        def locked_write(db):
+            raise _locked_error()
+        
+        with pytest.raises(OperationalError):
+            locked_write(test_db)
+    
+    def test_other_errors_not_retried(self, test_db):
+        """Test that unrelated operational errors fail immediately."""
+        import sqlite3
+        calls = []
+        
+        @database.serialized_write
+        def broken_write(db):
+            calls.append(1)
+            raise OperationalError("INSERT", {}, sqlite3.OperationalError("no such table"))
+        
+        with pytest.raises(OperationalError):
+            broken_write(test_db)
+        assert len(calls) == 1
+    
+    def test_concurrent_processes_do_not_lose_writes(self, tmp_path):
+        """Test that writers in several processes all succeed."""
+        url = f"sqlite:///{tmp_path / 'ledger.sqlite'}"
+        engine = database.make_engine(url)
+        database.init_db(engine)
+        db = sessionmaker(bind=engine)()
+        child = crud.create_child(db, schemas.ChildCreate(name="Writer"))
+        
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=_write_transactions, args=(url, child.id, 25))
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+        
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert db.query(models.Account).count() == 75
+        db.close()
@@ -0,0 +1,212 @@
+"""
+Unit tests for the live dashboard change feed.
+
+Tests app/events.py, the publishing hooks in app/crud.py and the stream
+in app/routers/events.py.
+"""
+
+import asyncio
+import json
+import threading
+from datetime import date
+
+from app import crud, events, interest, scheduler, schemas
+from app.routers.events import event_stream
+
+
+def _drain(subscription):
+    """Return every queued event without waiting."""
+    items = []
+    while not subscription.queue.empty():
+        items.append(subscription.queue.get_nowait())
+    return items
+
+
+class TestBroker:
+    """Tests for the in-process broker."""
+    
+    def test_delivers_to_child_subscribers_only(self):
+        """Test that events reach only subscribers of their child."""
+        async def scenario():
+            broker = events.Broker()
+            river = broker.subscribe(1)
+            summer = broker.subscribe(2)
+            broker.publish(1, {"type": "transaction"})
+            return _drain(river), _drain(summer)
+        
+        river_events, summer_events = asyncio.run(scenario())
+        
+        assert river_events == [{"type": "transaction"}]
+        assert summer_events == []
+    
+    def test_scopes_isolate_databases(self):
+        """Test that child 1 of one database does not see another's events."""
+        async def scenario():
+            broker = events.Broker()
+            holt = broker.subscribe(1, scope="holt")
+            chen = broker.subscribe(1, scope="chen")
+            broker.publish(1, {"type": "transaction"}, scope="holt")
+            return _drain(holt), _drain(chen), broker.subscribed_children(scope="chen")
+        
+        holt_events, chen_events, watched = asyncio.run(scenario())
+        
+        assert holt_events == [{"type": "transaction"}]
+        assert chen_events == []
+        assert watched == {1}
+    
+    def test_full_queue_becomes_resync(self):
+        """Test that a slow subscriber gets one resync instead of a backlog."""
+        async def scenario():
+            broker = events.Broker(queue_size=2)
+            subscription = broker.subscribe(1)
+            for n in range(5):
+                broker.publish(1, {"type": "transaction", "n": n})
+            return _drain(subscription), broker.stats()
+        
+        queued, stats = asyncio.run(scenario())
+        
+        assert queued[0] == events.RESYNC
+        assert stats["dropped"] >= 1
+    
+    def test_publish_from_worker_thread(self):
+        """Test that writes in threadpool workers reach the event loop."""
+        async def scenario():
+            broker = events.Broker()
+            subscription = broker.subscribe(1)
+            thread = threading.Thread(target=broker.publish, args=(1, {"type": "completion"}))
+            thread.start()
+            thread.join()
+            return await subscription.get(timeout=1)
+        
+        assert asyncio.run(scenario()) == {"type": "completion"}
+    
+    def test_close_unsubscribes(self):
+        """Test that closed subscriptions are forgotten."""
+        async def scenario():
+            broker = events.Broker()
+            broker.subscribe(1).close()
+            return broker.has_subscribers(1), broker.stats()["subscribers"]
+        
+        assert asyncio.run(scenario()) == (False, 0)
+
+
+class TestPublishing:
+    """Tests for events published by CRUD writes."""
+    
+    def test_transaction_event_carries_balance(self, test_db, sample_child, sample_transaction):
+        """Test that a committed transaction is published with the balance."""
+        async def scenario():
+            subscription = events.broker.subscribe(sample_child.id, scope=str(test_db.get_bind().url))
+            try:
+                crud.create_transaction(test_db, schemas.TransactionCreate(
+                    children_id=sample_child.id, date="2025-02-01", description="Chores", amount=5.0
+                ))
+                return _drain(subscription)
+            finally:
+                subscription.close()
+        
+        published = asyncio.run(scenario())
+        
+        assert len(published) == 1
+        assert published[0]["transaction"]["description"] == "Chores"
+        assert published[0]["balance"] == sample_transaction.amount + 5.0
+    
+    def test_completion_event(self, test_db, sample_child, sample_workbook):
+        """Test that a recorded completion is published with its workbook."""
+        async def scenario():
+            subscription = events.broker.subscribe(sample_child.id, scope=str(test_db.get_bind().url))
+            try:
+                crud.record_completed_workbook(test_db, schemas.CompletedWorkbookCreate(
+                    children_id=sample_child.id, workbooks_id=sample_workbook.id, date="2025-02-01"
+                ))
+                return _drain(subscription)
+            finally:
+                subscription.close()
+        
+        published = asyncio.run(scenario())
+        
+        assert published[0]["type"] == "completion"
+        assert published[0]["workbook"]["name"] == sample_workbook.name
+    
+    def test_fanout_publishes_to_watched_children(self, test_db, sample_child):
+        """Test that fan-out postings reach watchers of the children posted to."""
+        async def scenario():
+            subscription = events.broker.subscribe(sample_child.id, scope=str(test_db.get_bind().url))
+            try:
+                crud.create_fanout_transactions(test_db, schemas.TransactionFanout(
+                    date="2025-02-01", description="Chinese New Year", amount=20.0
+                ))
+                return _drain(subscription)
+            finally:
+                subscription.close()
+        
+        published = asyncio.run(scenario())
+        
+        assert [e["transaction"]["description"] for e in published] == ["Chinese New Year"]
+    
+    def test_scheduled_allowance_publishes(self, test_db, sample_child):
+        """Test that allowances posted by the scheduler reach watchers."""
+        crud.create_allowance_rule(test_db, schemas.AllowanceRuleCreate(
+            date="2025-01-01", description="Allowance", amount=10.0, frequency="monthly"
+        ))
+        
+        async def scenario():
+            subscription = events.broker.subscribe(sample_child.id, scope=str(test_db.get_bind().url))
+            try:
+                scheduler.run_due(test_db, today=date(2025, 2, 1))
+                return _drain(subscription)
+            finally:
+                subscription.close()
+        
+        published = asyncio.run(scenario())
+        
+        assert [e["transaction"]["date"] for e in published] == ["2025-01-01", "2025-02-01"]
+        assert published[-1]["balance"] == 20.0
+    
+    def test_interest_publishes(self, test_db, sample_child, sample_transaction):
+        """Test that posted interest reaches watchers of the children paid."""
+        async def scenario():
+            subscription = events.broker.subscribe(sample_child.id, scope=str(test_db.get_bind().url))
+            try:
+                interest.post_interest(test_db, "2025-01", rate=1.0, today=date(2025, 2, 15))
+                return _drain(subscription)
+            finally:
+                subscription.close()
+        
+        published = asyncio.run(scenario())
+        
+        assert [e["transaction"]["description"] for e in published] == ["Interest 2025-01"]
+    
+    def test_unwatched_writes_publish_nothing(self, test_db, sample_child):
+        """Test that writes nobody watches skip publishing entirely."""
+        before = events.broker.published
+        crud.create_transaction(test_db, schemas.TransactionCreate(
+            children_id=sample_child.id, date="2025-02-01", description="Chores", amount=5.0
+        ))
+        
+        assert events.broker.published == before
+
+
+class TestEventStream:
+    """Tests for the SSE stream."""
+    
+    def test_formats_events(self):
+        """Test the retry preamble and event frames."""
+        async def scenario():
+            subscription = events.broker.subscribe(42)
+            stream = event_stream(subscription)
+            frames = [await stream.__anext__()]
+            events.broker.publish(42, {"type": "transaction", "balance": 1.5})
+            frames.append(await stream.__anext__())
+            await stream.aclose()
+            return frames, events.broker.has_subscribers(42)
+        
+        frames, still_subscribed = asyncio.run(scenario())
+        
+        assert frames[0].startswith("retry:")
+        assert frames[1] == f"event: transaction\ndata: {json.dumps({'type': 'transaction', 'balance': 1.5})}\n\n"
+        assert not still_subscribed
+    
+    def test_unknown_child(self, client):
+        """Test that streams for missing children are not found."""
+        assert client.get("/api/child/99999/events").status_code == 404
@@ -0,0 +1,170 @@
+"""
+Unit tests for the legacy ledger importer.
+
+Tests app/importer.py with legacy files built like project1.py does.
+"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from app import importer, models
+
+LEGACY_SCHEMA = """
+    CREATE TABLE Children (id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT UNIQUE, name TEXT UNIQUE);
+    CREATE TABLE Workbooks (id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT UNIQUE, name TEXT);
+    CREATE TABLE Members (
+        children_id INTEGER, workbooks_id INTEGER, completed INTEGER, date TEXT,
+        PRIMARY KEY (children_id, workbooks_id)
+    );
+    CREATE TABLE Account (
+        id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT UNIQUE,
+        children_id INTEGER, date TEXT, description TEXT, amount REAL
+    );
+"""
+
+
+@pytest.fixture
+def legacy(tmp_path):
+    """A legacy ledger with two children, three workbooks and seven transactions."""
+    path = str(tmp_path / "legacy.sqlite")
+    connection = sqlite3.connect(path)
+    connection.executescript(LEGACY_SCHEMA)
+    connection.executemany("INSERT INTO Children (name) VALUES (?)", [("River",), ("Summer",)])
+    connection.executemany(
+        "INSERT INTO Workbooks (name) VALUES (?)",
+        [("Grade 3 Reading",), ("Grade 4 Spelling",), ("Grade 3 Reading",)]
+    )
+    connection.executemany(
+        "INSERT INTO Members VALUES (?, ?, 1, ?)",
+        [(1, 1, "2024-01-05"), (2, 2, "2024-02-01"), (2, 3, "2024-03-01"), (9, 1, "2024-04-01")]
+    )
+    connection.executemany(
+        "INSERT INTO Account (children_id, date, description, amount) VALUES (?, ?, ?, ?)",
+        [
+            (1, "2024-01-01", "Gift", 10.0),
+            (1, "2024-01-02", "Candy", -1.5),
+            (1, "2024-01-02", "Candy", -1.5),
+            (2, "2024-01-03", "Chores", 4.0),
+            (2, "2024-01-04", "Book", -3.0),
+            (9, "2024-01-05", "Orphan", 1.0),
+            (1, "2024-01-06", "Allowance", 5.0),
+        ]
+    )
+    connection.commit()
+    connection.close()
+    return path
+
+
+def _ledger(db):
+    """Children, workbooks, completions and transactions of the target, by name."""
+    return {
+        "children": db.execute(text("SELECT name FROM Children ORDER BY name")).scalars().all(),
+        "workbooks": db.execute(text("SELECT name FROM Workbooks ORDER BY name")).scalars().all(),
+        "completions": db.execute(text("""
+            SELECT c.name, w.name FROM Members AS m
+            JOIN Children AS c ON c.id = m.children_id JOIN Workbooks AS w ON w.id = m.workbooks_id
+            ORDER BY 1, 2
+        """)).all(),
+        "transactions": db.execute(text("""
+            SELECT c.name, a.date, a.description, a.amount FROM Account AS a
+            JOIN Children AS c ON c.id = a.children_id ORDER BY a.id
+        """)).all(),
+    }
+
+
+class TestImport:
+    """Tests for importing a legacy ledger."""
+    
+    def test_imports_and_dedupes(self, test_db, legacy):
+        """Test that rows are mapped by name and duplicates and orphans skipped."""
+        test_db.add(models.Child(name="Summer"))
+        test_db.add(models.Workbook(name="Grade 4 Spelling"))
+        test_db.commit()
+        summer = test_db.query(models.Child).filter_by(name="Summer").one()
+        test_db.add(models.Account(children_id=summer.id, date="2024-01-03", description="Chores", amount=4.0))
+        test_db.commit()
+        
+        results = importer.import_ledger(test_db, legacy, chunk_size=2)
+        
+        assert [(r["table"], r["scanned"], r["imported"], r["skipped"]) for r in results] == [
+            ("Children", 2, 1, 1),
+            ("Workbooks", 3, 1, 2),
+            ("Members", 4, 3, 1),
+            ("Account", 7, 5, 2),
+        ]
+        ledger = _ledger(test_db)
+        assert ledger["children"] == ["River", "Summer"]
+        assert ledger["workbooks"] == ["Grade 3 Reading", "Grade 4 Spelling"]
+        assert [tuple(row) for row in ledger["completions"]] == [
+            ("River", "Grade 3 Reading"), ("Summer", "Grade 3 Reading"), ("Summer", "Grade 4 Spelling")
+        ]
+        assert [tuple(row)[2] for row in ledger["transactions"]] == [
+            "Chores", "Gift", "Candy", "Candy", "Book", "Allowance"
+        ]
+        totals = dict(test_db.execute(text("SELECT children_id, balance FROM LeaderboardTotals")).all())
+        assert totals[summer.id] == 1.0
+        
+        again = importer.import_ledger(test_db, legacy)
+        assert sum(r["scanned"] for r in again) == 0
+    
+    def test_resumes_after_interruption(self, test_db, legacy, monkeypatch):
+        """Test that a failed run continues after its last committed chunk."""
+        chunk = importer.import_chunk
+        calls = []
+        
+        def interrupted(db, source, table, chunk_size):
+            calls.append(table)
+            if table == "Account" and calls.count("Account") == 2:
+                raise KeyboardInterrupt
+            return chunk(db, source, table, chunk_size)
+        
+        monkeypatch.setattr(importer, "import_chunk", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            importer.import_ledger(test_db, legacy, chunk_size=3)
+        assert test_db.query(models.Account).count() == 3
+        assert importer.status(test_db, legacy)[-1]["last_rowid"] == 3
+        
+        monkeypatch.setattr(importer, "import_chunk", chunk)
+        results = importer.import_ledger(test_db, legacy, chunk_size=3)
+        
+        assert results[-1]["scanned"] == 4
+        assert test_db.query(models.Account).count() == 6
+        assert [row["imported"] for row in importer.status(test_db, legacy)] == [2, 2, 3, 6]
+    
+    def test_maps_renamed_columns(self, test_db, tmp_path):
+        """Test that aliased and missing optional columns are mapped."""
+        path = str(tmp_path / "drifted.sqlite")
+        connection = sqlite3.connect(path)
+        connection.executescript("""
+            CREATE TABLE Children (child_id INTEGER PRIMARY KEY, child_name TEXT);
+            CREATE TABLE Workbooks (id INTEGER PRIMARY KEY, title TEXT);
+            CREATE TABLE Members (child_id INTEGER, workbook_id INTEGER);
+            CREATE TABLE Account (child_id INTEGER, date TEXT, memo TEXT, amount TEXT);
+            INSERT INTO Children VALUES (7, 'River');
+            INSERT INTO Workbooks VALUES (3, 'Grade 2 Math');
+            INSERT INTO Members VALUES (7, 3);
+            INSERT INTO Account VALUES (7, '2024-05-01', 'Gift', '2.50');
+        """)
+        connection.close()
+        
+        importer.import_ledger(test_db, path)
+        
+        member = test_db.query(models.Member).one()
+        assert (member.completed, member.date) == (1, None)
+        assert [tuple(row) for row in _ledger(test_db)["transactions"]] == [("River", "2024-05-01", "Gift", 2.5)]
+    
+    def test_rejects_bad_sources(self, test_db, test_engine, tmp_path):
+        """Test that missing, unmappable and self imports are refused."""
+        with pytest.raises(ValueError, match="No such"):
+            importer.import_ledger(test_db, str(tmp_path / "missing.sqlite"))
+        with pytest.raises(ValueError, match="into itself"):
+            importer.import_ledger(test_db, test_engine.url.database)
+        
+        path = str(tmp_path / "broken.sqlite")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE Children (id INTEGER PRIMARY KEY, nickname TEXT)")
+        connection.close()
+        with pytest.raises(ValueError, match="no column for name"):
+            importer.import_ledger(test_db, path)
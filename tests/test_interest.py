@@ -0,0 +1,128 @@
+"""
+Unit tests for the savings interest engine.
+
+Tests app/interest.py and the routes in app/routers/interest.py.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app import analytics, crud, interest, models
+
+
+@pytest.fixture
+def ledger(make_ledger):
+    """A saver and a child in debt."""
+    return make_ledger(["River", "Summer"], transactions=[
+        ("River", "2024-12-20", "Gift", 100.0),
+        ("River", "2025-01-11", "Chores", 31.0),
+        ("River", "2025-02-01", "Later", 500.0),
+        ("Summer", "2025-01-05", "Candy", -10.0),
+    ])
+
+
+def _naive_adb(rows, child_id, period):
+    """Average daily balance by walking every day of the month."""
+    first, last = interest.month_bounds(period)
+    total = 0.0
+    day = first
+    while day <= last:
+        total += sum(amount for child, when, amount in rows if child == child_id and when <= day.isoformat())
+        day += timedelta(days=1)
+    return total / ((last - first).days + 1)
+
+
+class TestComputeInterest:
+    """Tests for pricing interest."""
+    
+    def test_average_daily_balance(self, test_db, ledger):
+        """Test that mid-month deposits count from their day on."""
+        saver, _ = ledger
+        payouts = interest.compute_interest(analytics.get_columns(test_db), "2025-01", 0.365)
+        
+        # 100 all month plus 31 for the 21 days from the 11th
+        assert payouts == [{"child_id": saver.id, "average_daily_balance": 121.0, "interest": 3.75}]
+    
+    def test_negative_balances_earn_nothing(self, test_db, ledger):
+        """Test that children in debt are not charged or paid."""
+        _, debtor = ledger
+        payouts = interest.compute_interest(analytics.get_columns(test_db), "2025-01", 0.05)
+        
+        assert debtor.id not in [p["child_id"] for p in payouts]
+    
+    def test_matches_day_by_day_balance(self, test_db):
+        """Test the vectorized ADB against a day-by-day walk."""
+        rng = random.Random(7)
+        children = [models.Child(name=f"Child {n}") for n in range(5)]
+        test_db.add_all(children)
+        test_db.commit()
+        rows = []
+        for _ in range(200):
+            child = rng.choice(children).id
+            when = (date(2024, 11, 1) + timedelta(days=rng.randrange(90))).isoformat()
+            amount = rng.randrange(1, 5000) / 100
+            rows.append((child, when, amount))
+            test_db.add(models.Account(children_id=child, date=when, description="x", amount=amount))
+        test_db.commit()
+        
+        payouts = interest.compute_interest(analytics.get_columns(test_db), "2024-12", 0.05)
+        
+        for payout in payouts:
+            assert payout["average_daily_balance"] == pytest.approx(
+                _naive_adb(rows, payout["child_id"], "2024-12"), abs=0.01
+            )
+        assert len(payouts) == 5
+    
+    def test_invalid_period(self, test_db):
+        """Test that malformed months are rejected."""
+        with pytest.raises(ValueError):
+            interest.compute_interest(analytics.get_columns(test_db), "2025-13", 0.05)
+
+
+class TestPostInterest:
+    """Tests for posting interest."""
+    
+    def test_posts_on_last_day(self, test_db, ledger):
+        """Test that payouts are posted as transactions at month end."""
+        saver, _ = ledger
+        run = interest.post_interest(test_db, "2025-01", 0.365, today=date(2025, 3, 1))
+        
+        assert (run.transactions, run.total) == (1, 3.75)
+        last = crud.get_child_transactions(test_db, saver.id)[-2]
+        assert (last.date, last.description, last.amount) == ("2025-01-31", "Interest 2025-01", 3.75)
+    
+    def test_rerun_is_noop(self, test_db, ledger):
+        """Test that a month is paid at most once."""
+        interest.post_interest(test_db, "2025-01", 0.05, today=date(2025, 3, 1))
+        count = test_db.query(models.Account).count()
+        
+        assert interest.post_interest(test_db, "2025-01", 0.05, today=date(2025, 3, 1)) is None
+        assert test_db.query(models.Account).count() == count
+    
+    def test_month_must_have_ended(self, test_db, ledger):
+        """Test that the current month cannot be paid."""
+        with pytest.raises(ValueError):
+            interest.post_interest(test_db, "2025-01", 0.05, today=date(2025, 1, 31))
+        assert interest.get_runs(test_db) == []
+
+
+class TestInterestRoutes:
+    """Tests for the interest API endpoints."""
+    
+    def test_preview_and_post(self, client, ledger):
+        """Test previewing, posting and listing a run."""
+        preview = client.get("/api/interest/2025-01?rate=0.365")
+        response = client.post("/api/interest/2025-01?rate=0.365")
+        
+        assert preview.json()[0]["interest"] == 3.75
+        assert response.status_code == 201
+        assert response.json() == {"period": "2025-01", "rate": 0.365, "transactions": 1, "total": 3.75}
+        assert client.post("/api/interest/2025-01").status_code == 409
+        assert [r["period"] for r in client.get("/api/interest/runs").json()] == ["2025-01"]
+    
+    def test_invalid_period(self, client):
+        """Test that malformed months are rejected."""
+        assert client.get("/api/interest/2025-1").status_code == 400
+        assert client.post("/api/interest/2999-01").status_code == 400
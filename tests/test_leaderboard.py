@@ -0,0 +1,202 @@
+"""
+Unit tests for leaderboards.
+
+Tests the trigger-maintained aggregates in app/models.py, app/leaderboard.py
+and the routes in app/routers/leaderboard.py.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import leaderboard, models
+from app.database import init_db
+
+
+@pytest.fixture
+def ledger(make_ledger):
+    """Three children with transactions and completions in 2021."""
+    return make_ledger(
+        ["River", "Summer", "Autumn"],
+        transactions=[
+            ("River", "2021-01-05", "Math", 10.0),
+            ("River", "2021-04-20", "Candy", -2.5),
+            ("Summer", "2021-02-10", "Reading", 6.0),
+            ("Autumn", "2021-05-01", "Chores", 8.0),
+        ],
+        completions=[
+            ("River", 1, "2021-01-03"),
+            ("River", 2, "2021-04-03"),
+            ("Summer", 1, "2021-01-09"),
+            ("Summer", 2, "2021-02-09"),
+            ("Summer", 3, "2021-03-09"),
+        ],
+        workbooks=4
+    )
+
+
+def _aggregates(connection):
+    """Read both aggregate tables in a stable order."""
+    return (
+        connection.execute(text("SELECT * FROM LeaderboardTotals ORDER BY 1")).all(),
+        connection.execute(text("SELECT * FROM LeaderboardPeriods ORDER BY 1, 2")).all(),
+    )
+
+
+class TestAggregates:
+    """Tests for the trigger-maintained aggregate tables."""
+    
+    def test_triggers_match_rebuild(self, test_db, ledger):
+        """Test that incremental maintenance equals a full rebuild."""
+        connection = test_db.connection()
+        maintained = _aggregates(connection)
+        for statement in models.LEADERBOARD_BACKFILL:
+            connection.execute(text(statement))
+        
+        assert _aggregates(connection) == maintained
+    
+    def test_period_keys(self, test_db, ledger):
+        """Test that amounts count towards their year, quarter and month."""
+        river, _, _ = ledger
+        rows = test_db.execute(text(
+            "SELECT period, net, earned FROM LeaderboardPeriods WHERE children_id = :id ORDER BY period"
+        ), {"id": river.id}).all()
+        
+        assert ("2021", 7.5, 10.0) in rows
+        assert ("2021-Q2", -2.5, 0.0) in rows
+        assert ("2021-04", -2.5, 0.0) in rows
+    
+    def test_delete_reverses_insert(self, test_db, ledger):
+        """Test that deleting rows removes their contribution."""
+        river, _, _ = ledger
+        test_db.query(models.Account).filter(models.Account.children_id == river.id).delete()
+        test_db.query(models.Member).filter(models.Member.children_id == river.id).delete()
+        test_db.commit()
+        totals = test_db.get(models.LeaderboardTotals, river.id)
+        
+        assert (totals.balance, totals.completions, totals.best_streak) == (0, 0, 0)
+    
+    def test_legacy_database_is_backfilled(self, tmp_path):
+        """Test that init_db builds aggregates for an existing ledger."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.sqlite'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE Children (id INTEGER PRIMARY KEY, name TEXT UNIQUE)"))
+            conn.execute(text(
+                "CREATE TABLE Account (id INTEGER PRIMARY KEY, children_id INTEGER, "
+                "date TEXT, description TEXT, amount REAL)"
+            ))
+            conn.execute(text("INSERT INTO Children (name) VALUES ('River')"))
+            conn.execute(text(
+                "INSERT INTO Account (children_id, date, description, amount) "
+                "VALUES (1, '2021-01-05', 'Math', 4.0), (1, '2021-02-05', 'Math', 5.0)"
+            ))
+        
+        init_db(engine)
+        
+        with engine.connect() as conn:
+            balance = conn.execute(text("SELECT balance FROM LeaderboardTotals")).scalar()
+        assert balance == 9.0
+
+
+class TestStreaks:
+    """Tests for monthly completion streaks."""
+    
+    def test_longest_run_of_months(self, test_db, ledger):
+        """Test that a gap month breaks a streak."""
+        river, summer, _ = ledger
+        
+        assert test_db.get(models.LeaderboardTotals, river.id).best_streak == 1
+        assert test_db.get(models.LeaderboardTotals, summer.id).best_streak == 3
+    
+    def test_backdated_completion_joins_streaks(self, test_db, ledger):
+        """Test that filling a gap merges the runs on either side."""
+        river, _, _ = ledger
+        test_db.add_all([
+            models.Member(children_id=river.id, workbooks_id=3, completed=1, date="2021-02-01"),
+            models.Member(children_id=river.id, workbooks_id=4, completed=1, date="2021-03-01"),
+        ])
+        test_db.commit()
+        
+        assert test_db.get(models.LeaderboardTotals, river.id).best_streak == 4
+
+
+class TestResolvePeriod:
+    """Tests for period arguments."""
+    
+    def test_relative_periods(self):
+        """Test that relative periods resolve against the reference date."""
+        today = date(2024, 8, 15)
+        
+        assert leaderboard.resolve_period(None, today) is None
+        assert leaderboard.resolve_period("year", today) == "2024"
+        assert leaderboard.resolve_period("term", today) == "2024-Q3"
+        assert leaderboard.resolve_period("month", today) == "2024-08"
+    
+    def test_explicit_periods(self):
+        """Test that explicit keys pass through."""
+        assert leaderboard.resolve_period("2021-Q4") == "2021-Q4"
+        assert leaderboard.resolve_period("2021-12") == "2021-12"
+    
+    def test_invalid_period(self):
+        """Test that malformed periods are rejected."""
+        with pytest.raises(ValueError):
+            leaderboard.resolve_period("2021-13")
+
+
+class TestTop:
+    """Tests for top-N queries."""
+    
+    def test_savers_all_time(self, test_db, ledger):
+        """Test the all-time balance board."""
+        entries = leaderboard.top(test_db, "savers")
+        
+        assert [(e["rank"], e["child_name"], e["value"]) for e in entries] == [
+            (1, "Autumn", 8.0), (2, "River", 7.5), (3, "Summer", 6.0)
+        ]
+    
+    def test_completions_in_period(self, test_db, ledger):
+        """Test that a period board only counts that period and skips zeros."""
+        entries = leaderboard.top(test_db, "completions", period="2021-Q1")
+        
+        assert [(e["child_name"], e["value"]) for e in entries] == [("Summer", 3.0), ("River", 1.0)]
+    
+    def test_limit(self, test_db, ledger):
+        """Test that only the top N are returned."""
+        assert len(leaderboard.top(test_db, "savers", limit=2)) == 2
+    
+    def test_streaks_have_no_periods(self, test_db, ledger):
+        """Test that asking for streaks in a period fails."""
+        with pytest.raises(ValueError):
+            leaderboard.top(test_db, "streaks", period="2021")
+    
+    def test_uses_index_order(self, test_db, ledger):
+        """Test that boards are read in index order without sorting."""
+        plan = test_db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT b.children_id, c.name, b.net "
+            "FROM LeaderboardPeriods AS b JOIN Children AS c ON c.id = b.children_id "
+            "WHERE 1 AND b.period = '2021' ORDER BY b.net DESC, b.children_id LIMIT 10"
+        )).all()
+        details = " ".join(row[-1] for row in plan)
+        
+        assert "ix_LeaderboardPeriods_net" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestLeaderboardRoutes:
+    """Tests for the leaderboard API endpoint."""
+    
+    def test_leaderboard(self, client, ledger):
+        """Test fetching a board."""
+        response = client.get("/api/leaderboards/streaks?limit=1")
+        
+        assert response.status_code == 200
+        assert response.json() == [{"rank": 1, "child_id": ledger[1].id, "child_name": "Summer", "value": 3.0}]
+    
+    def test_unknown_board(self, client, ledger):
+        """Test that an unknown board is not found."""
+        assert client.get("/api/leaderboards/spenders").status_code == 404
+    
+    def test_invalid_period(self, client, ledger):
+        """Test that an invalid period is rejected."""
+        assert client.get("/api/leaderboards/savers?period=last-week").status_code == 400
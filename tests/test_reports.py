@@ -0,0 +1,126 @@
+"""
+Unit tests for cross-household reports.
+
+Tests app/reports.py and the route in app/routers/reports.py.
+"""
+
+import json
+import os
+
+import pytest
+
+from app import models, reports, tenants
+
+
+@pytest.fixture
+def ledgers(tmp_path):
+    """Three household ledgers with children, transactions and completions."""
+    tenant_engines = tenants.TenantEngines(str(tmp_path))
+    paths = []
+    for n, name in enumerate(["holt", "chen", "garcia"], start=1):
+        paths.append(tenant_engines.create(name))
+        db = tenant_engines.session_factory(name)()
+        workbook = models.Workbook(name=f"Grade {n} Reading")
+        children = [models.Child(name=f"Child {i}") for i in range(n)]
+        db.add_all([workbook, *children])
+        db.commit()
+        for child in children:
+            db.add(models.Account(children_id=child.id, date="2025-01-01", description="Gift", amount=10.0))
+            db.add(models.Member(children_id=child.id, workbooks_id=workbook.id, completed=1, date="2025-01-02"))
+        db.commit()
+        db.close()
+    yield paths
+    tenant_engines.clear()
+
+
+class TestReports:
+    """Tests for summarizing and merging ledgers."""
+    
+    def test_balances(self, ledgers):
+        """Test that household partials add up to the total."""
+        lines = list(reports.stream(ledgers, "balances", processes=1))
+        
+        assert [line["type"] for line in lines] == ["household"] * 3 + ["total"]
+        assert lines[0] == {
+            "type": "household",
+            "household": "holt",
+            "values": {"children": 1, "balance": 10.0, "in_debt": 0, "transactions": 1}
+        }
+        assert lines[-1]["households"] == 3
+        assert lines[-1]["values"] == {"children": 6, "balance": 60.0, "in_debt": 0, "transactions": 6}
+    
+    def test_grades(self, ledgers):
+        """Test that keyed values merge per key."""
+        total = reports.merge(reports.fan_out(ledgers, "grades", processes=1))
+        
+        assert total["values"] == {"completions": 6, "by_grade": {"1": 1, "2": 2, "3": 3}}
+    
+    def test_process_pool_matches_serial(self, ledgers, monkeypatch):
+        """Test that fanning out to worker processes gives the same total."""
+        monkeypatch.setattr(reports, "DEFAULT_PROCESSES", 2)
+        try:
+            parallel = reports.merge(reports.fan_out(ledgers, "balances", processes=2))
+        finally:
+            reports.shutdown_pool()
+        
+        assert parallel == reports.merge(reports.fan_out(ledgers, "balances", processes=1))
+    
+    def test_reports_share_one_pool(self, ledgers, monkeypatch):
+        """Test that a different process count does not start another pool."""
+        monkeypatch.setattr(reports, "DEFAULT_PROCESSES", 2)
+        try:
+            list(reports.fan_out(ledgers, "balances", processes=2))
+            pool = reports._pool_instance
+            list(reports.fan_out(ledgers, "grades", processes=64))
+            
+            assert reports._pool_instance is pool
+            assert pool._max_workers == 2
+        finally:
+            reports.shutdown_pool()
+    
+    def test_unreadable_ledger(self, ledgers, tmp_path):
+        """Test that a missing ledger is reported without failing the rest."""
+        missing = os.path.join(str(tmp_path), "lost.sqlite")
+        
+        total = reports.merge(reports.fan_out(ledgers + [missing], "balances", processes=1))
+        
+        assert total["households"] == 3
+        assert total["errors"] == ["lost"]
+    
+    def test_unknown_report(self, ledgers):
+        """Test that an unknown report is rejected."""
+        with pytest.raises(ValueError):
+            list(reports.fan_out(ledgers, "salaries"))
+
+
+class TestReportRoutes:
+    """Tests for the NDJSON report endpoint."""
+    
+    def test_streams_ndjson(self, client, sample_transaction):
+        """Test that the application database is reported when no tenants exist."""
+        response = client.get("/api/reports/balances?processes=1")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-1]["type"] == "total"
+        assert lines[-1]["values"]["transactions"] == 1
+    
+    def test_unknown_report(self, client):
+        """Test that an unknown report is a 404."""
+        assert client.get("/api/reports/salaries").status_code == 404
+    
+    def test_refused_to_households_without_token(self, client, monkeypatch):
+        """Test that tenant deployments refuse reports until a token is configured."""
+        monkeypatch.setattr(tenants, "TENANT_MODE", "header")
+        monkeypatch.setattr(reports, "REPORT_TOKEN", "")
+        
+        assert client.get("/api/reports/balances").status_code == 403
+    
+    def test_operator_token(self, client, sample_transaction, monkeypatch):
+        """Test that only the configured bearer token reads reports."""
+        monkeypatch.setattr(reports, "REPORT_TOKEN", "s3cret")
+        
+        assert client.get("/api/reports/balances").status_code == 403
+        assert client.get("/api/reports/balances", headers={"Authorization": "Bearer nope"}).status_code == 403
+        assert client.get("/api/reports/balances", headers={"Authorization": "Bearer s3cret"}).status_code == 200
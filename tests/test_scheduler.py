@@ -0,0 +1,142 @@
+"""
+Unit tests for the recurring allowance scheduler.
+
+Tests app/scheduler.py and the allowance rule routes in
+app/routers/allowances.py.
+"""
+
+from datetime import date
+
+import pytest
+
+from app import crud, models, scheduler, schemas
+
+
+@pytest.fixture
+def children(test_db):
+    """Three children."""
+    kids = [models.Child(name=name) for name in ("River", "Summer", "Autumn")]
+    test_db.add_all(kids)
+    test_db.commit()
+    return kids
+
+
+def _rule(db, **fields):
+    """Create a rule with sensible defaults."""
+    data = {"date": "2025-01-01", "description": "Bare Minimum Workbooks",
+            "amount": 10.0, "frequency": "monthly"}
+    data.update(fields)
+    return crud.create_allowance_rule(db, schemas.AllowanceRuleCreate(**data))
+
+
+class TestNextOccurrence:
+    """Tests for stepping posting dates."""
+    
+    def test_weekly(self):
+        """Test that weekly rules advance seven days."""
+        assert scheduler.next_occurrence("2024-12-30", "weekly") == "2025-01-06"
+    
+    def test_monthly_keeps_day(self):
+        """Test that monthly rules keep their day across a year end."""
+        assert scheduler.next_occurrence("2024-12-15", "monthly") == "2025-01-15"
+    
+    def test_unknown_frequency(self):
+        """Test that unknown frequencies are rejected."""
+        with pytest.raises(ValueError):
+            scheduler.next_occurrence("2025-01-01", "daily")
+
+
+class TestRunDue:
+    """Tests for posting due rules."""
+    
+    def test_posts_to_every_child(self, test_db, children):
+        """Test that a rule without a child pays everyone."""
+        rule = _rule(test_db)
+        
+        assert scheduler.run_due(test_db, today=date(2025, 1, 1)) == 3
+        test_db.refresh(rule)
+        assert rule.next_date == "2025-02-01"
+    
+    def test_catches_up_missed_dates(self, test_db, children):
+        """Test that every missed date is posted once."""
+        _rule(test_db, children_id=children[0].id, frequency="weekly")
+        
+        posted = scheduler.run_due(test_db, today=date(2025, 1, 22))
+        
+        dates = [t.date for t in crud.get_child_transactions(test_db, children[0].id)]
+        assert posted == 4
+        assert dates == ["2025-01-01", "2025-01-08", "2025-01-15", "2025-01-22"]
+    
+    def test_runs_are_idempotent(self, test_db, children):
+        """Test that running again on the same day posts nothing."""
+        _rule(test_db)
+        scheduler.run_due(test_db, today=date(2025, 1, 5))
+        
+        assert scheduler.run_due(test_db, today=date(2025, 1, 5)) == 0
+        assert test_db.query(models.Account).count() == 3
+    
+    def test_rules_not_yet_due(self, test_db, children):
+        """Test that future rules are left alone."""
+        _rule(test_db, date="2025-03-01")
+        
+        assert scheduler.run_due(test_db, today=date(2025, 2, 28)) == 0
+    
+    def test_processes_all_batches(self, test_db, children):
+        """Test that rules beyond the first batch are posted."""
+        for n in range(5):
+            _rule(test_db, children_id=children[0].id, description=f"Rule {n}")
+        
+        assert scheduler.run_due(test_db, today=date(2025, 1, 1), batch_size=2) == 5
+    
+    def test_claimed_rule_is_skipped(self, test_db, children, monkeypatch):
+        """Test that a rule advanced by another worker is not posted again."""
+        rule = _rule(test_db)
+        query = test_db.query
+        
+        def stale_query(*args):
+            # Simulate another worker claiming the rule after it was read.
+            result = query(*args)
+            with test_db.get_bind().begin() as conn:
+                conn.exec_driver_sql(
+                    "UPDATE AllowanceRules SET next_date = '2025-02-01' WHERE id = ?", (rule.id,)
+                )
+            return result
+        
+        monkeypatch.setattr(test_db, "query", stale_query)
+        
+        assert scheduler.run_due(test_db, today=date(2025, 1, 1)) == 0
+
+
+class TestAllowanceRuleRoutes:
+    """Tests for the allowance rule API."""
+    
+    def test_create_list_delete(self, client, children):
+        """Test the rule lifecycle."""
+        response = client.post("/api/allowance-rules", json={
+            "date": "2025-01-05", "description": "Allowance", "amount": 5.0,
+            "frequency": "weekly", "children_id": children[0].id
+        })
+        
+        assert response.status_code == 201
+        rule_id = response.json()["id"]
+        assert response.json()["next_date"] == "2025-01-05"
+        assert [r["id"] for r in client.get("/api/allowance-rules").json()] == [rule_id]
+        assert client.delete(f"/api/allowance-rules/{rule_id}").status_code == 204
+        assert client.delete(f"/api/allowance-rules/{rule_id}").status_code == 404
+    
+    def test_monthly_rule_after_day_28(self, client, children):
+        """Test that monthly rules must fall on a day every month has."""
+        response = client.post("/api/allowance-rules", json={
+            "date": "2025-01-31", "description": "Allowance", "amount": 5.0, "frequency": "monthly"
+        })
+        
+        assert response.status_code == 422
+    
+    def test_unknown_child(self, client):
+        """Test that rules for a missing child are rejected."""
+        response = client.post("/api/allowance-rules", json={
+            "date": "2025-01-05", "description": "Allowance", "amount": 5.0,
+            "frequency": "weekly", "children_id": 99999
+        })
+        
+        assert response.status_code == 404
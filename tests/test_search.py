@@ -0,0 +1,115 @@
+"""
+Unit tests for transaction full-text search.
+
+Tests app/search.py, the Account_fts index in app/models.py and the
+routes in app/routers/search.py.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import search
+from app.database import init_db
+
+
+@pytest.fixture
+def ledger(make_ledger):
+    """Two children with a handful of searchable transactions."""
+    return make_ledger(["River", "Summer"], transactions=[
+        ("River", "2021-03-04", "Kung Fu XP", 80.0),
+        ("Summer", "2021-03-04", "Kung Fu XP", 30.0),
+        ("River", "2021-09-25", "Kung Fu XP 18k-28k", 100.0),
+        ("Summer", "2021-10-20", "Cozy Grotto", -17.0),
+        ("Summer", "2022-03-19", "Cozy Grotto and Jewelry", -22.5),
+    ])
+
+
+class TestBuildMatchQuery:
+    """Tests for query sanitizing."""
+    
+    def test_words_become_prefix_terms(self):
+        """Test that each word is quoted as a prefix term."""
+        assert search.build_match_query("kung fu") == '"kung"* "fu"*'
+    
+    def test_fts_syntax_is_neutralized(self):
+        """Test that FTS operators and quotes are stripped."""
+        assert search.build_match_query('grotto" OR (x') == '"grotto"* "OR"* "x"*'
+    
+    def test_no_words(self):
+        """Test that punctuation-only input matches nothing."""
+        assert search.build_match_query("  -*- ") is None
+
+
+class TestSearchTransactions:
+    """Tests for search_transactions."""
+    
+    def test_finds_matches_across_children(self, test_db, ledger):
+        """Test that all matching transactions are returned."""
+        results = search.search_transactions(test_db, "kung fu xp")
+        
+        assert len(results) == 3
+        assert {r["child_name"] for r in results} == {"River", "Summer"}
+    
+    def test_filter_by_child(self, test_db, ledger):
+        """Test restricting results to one child."""
+        river, summer = ledger
+        results = search.search_transactions(test_db, "grotto", child_id=summer.id)
+        
+        assert [r["description"] for r in results] == ["Cozy Grotto", "Cozy Grotto and Jewelry"]
+        assert search.search_transactions(test_db, "grotto", child_id=river.id) == []
+    
+    def test_results_ranked_by_relevance(self, test_db, ledger):
+        """Test that shorter, closer matches rank first."""
+        results = search.search_transactions(test_db, "cozy grotto")
+        
+        assert results[0]["description"] == "Cozy Grotto"
+        assert results[0]["rank"] <= results[1]["rank"]
+    
+    def test_index_follows_updates_and_deletes(self, test_db, ledger):
+        """Test that triggers keep the index in sync with Account."""
+        test_db.execute(text("UPDATE Account SET description = 'Piano lesson' WHERE description = 'Cozy Grotto'"))
+        test_db.execute(text("DELETE FROM Account WHERE description = 'Cozy Grotto and Jewelry'"))
+        test_db.commit()
+        
+        assert search.search_transactions(test_db, "grotto") == []
+        assert len(search.search_transactions(test_db, "piano")) == 1
+    
+    def test_index_built_for_existing_ledger(self, tmp_path):
+        """Test that init_db indexes rows written before the index existed."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.sqlite'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE Account (id INTEGER PRIMARY KEY, children_id INTEGER, date TEXT, description TEXT, amount REAL)"))
+            conn.execute(text("INSERT INTO Account VALUES (1, 1, '2021-03-04', 'Kung Fu XP', 80.0)"))
+        
+        init_db(engine)
+        
+        with engine.connect() as conn:
+            rowid = conn.execute(text("SELECT rowid FROM Account_fts WHERE Account_fts MATCH 'kung'")).scalar()
+        assert rowid == 1
+
+
+class TestSearchEndpoints:
+    """Tests for search routes."""
+    
+    def test_api_search(self, client, ledger):
+        """Test the JSON search endpoint."""
+        river, _ = ledger
+        response = client.get("/api/search/transactions", params={"q": "kung", "child_id": river.id})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 2
+        assert all(item["children_id"] == river.id for item in data)
+    
+    def test_api_search_requires_query(self, client):
+        """Test that an empty query is rejected."""
+        response = client.get("/api/search/transactions", params={"q": ""})
+        
+        assert response.status_code == 422
+    
+    def test_search_page(self, client, ledger):
+        """Test the search results page."""
+        response = client.get("/search", params={"q": "grotto"})
+        
+        assert response.status_code == 200
+        assert b"Cozy Grotto and Jewelry" in response.content
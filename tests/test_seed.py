@@ -0,0 +1,114 @@
+"""
+Unit tests for the synthetic ledger generator.
+
+Tests the seeded dataset generation in app/seed.py.
+"""
+
+import hashlib
+import sqlite3
+
+import pytest
+
+from app import models, seed
+
+
+def _digest(path):
+    """Hash every row of every ledger table in a stable order."""
+    conn = sqlite3.connect(path)
+    digest = hashlib.sha256()
+    for table in ("Children", "Workbooks", "Members", "Account"):
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2"):
+            digest.update(repr(row).encode())
+    conn.close()
+    return digest.hexdigest()
+
+
+class TestSeedGenerator:
+    """Tests for the seeded ledger generator."""
+
+    def test_generate_row_counts(self, tmp_path):
+        """Test that the requested numbers of rows are written."""
+        path = str(tmp_path / "ledger.sqlite")
+        counts = seed.generate(path, families=3, children=2, transactions=20)
+
+        assert counts["Children"] == 6
+        assert counts["Account"] == 6 * 20
+        assert counts["Workbooks"] == len(seed.workbook_catalog())
+
+        conn = sqlite3.connect(path)
+        assert conn.execute("SELECT COUNT(*) FROM Account").fetchone()[0] == 120
+        conn.close()
+
+    def test_generate_without_transactions(self, tmp_path):
+        """Test that children can be generated with no activity."""
+        path = str(tmp_path / "ledger.sqlite")
+        counts = seed.generate(path, families=2, children=2, transactions=0)
+
+        assert counts["Children"] == 4
+        assert counts["Account"] == counts["Members"] == 0
+
+    def test_generate_is_reproducible(self, tmp_path):
+        """Test that the same seed produces identical ledgers."""
+        first = str(tmp_path / "first.sqlite")
+        second = str(tmp_path / "second.sqlite")
+        other = str(tmp_path / "other.sqlite")
+        seed.generate(first, families=2, children=3, transactions=30, seed=7)
+        seed.generate(second, families=2, children=3, transactions=30, seed=7)
+        seed.generate(other, families=2, children=3, transactions=30, seed=8)
+
+        assert _digest(first) == _digest(second)
+        assert _digest(first) != _digest(other)
+
+    def test_completions_are_credited(self, tmp_path):
+        """Test that every completion has a matching reward transaction."""
+        path = str(tmp_path / "ledger.sqlite")
+        seed.generate(path, families=1, children=2, transactions=40)
+
+        conn = sqlite3.connect(path)
+        missing = conn.execute(
+            """SELECT COUNT(*) FROM Members m JOIN Workbooks w ON w.id = m.workbooks_id
+            WHERE NOT EXISTS (SELECT 1 FROM Account a WHERE a.children_id = m.children_id
+            AND a.date = m.date AND a.description = 'Completed ' || w.name)"""
+        ).fetchone()[0]
+        conn.close()
+        assert missing == 0
+
+    def test_derived_tables_rebuilt(self, tmp_path):
+        """Test that derived tables match the ledger and their triggers are back."""
+        path = str(tmp_path / "ledger.sqlite")
+        seed.generate(path, families=2, children=2, transactions=40)
+
+        conn = sqlite3.connect(path)
+        searched = conn.execute("SELECT rowid FROM Account_fts WHERE Account_fts MATCH 'completed'").fetchall()
+        completed = conn.execute("SELECT id FROM Account WHERE description LIKE 'Completed %'").fetchall()
+        titles = conn.execute("SELECT COUNT(*) FROM Workbooks_fts WHERE Workbooks_fts MATCH 'grade'").fetchone()[0]
+        stats = conn.execute("SELECT * FROM ChildStats ORDER BY 1").fetchall()
+        expected = conn.execute(
+            models.CHILD_STATS_QUERY.format(account="main.Account") + " ORDER BY 1"
+        ).fetchall()
+        facets = conn.execute("SELECT COUNT(*) FROM WorkbookFacets WHERE grade IS NOT NULL").fetchone()[0]
+        triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        conn.close()
+
+        assert completed and set(completed) <= set(searched)
+        assert titles == len(seed.workbook_catalog())
+        assert stats == expected and len(stats) == 4
+        assert facets == len(seed.workbook_catalog())
+        assert set(models.SEARCH_TRIGGERS) <= triggers
+        assert set(models.CHILD_STATS_TRIGGERS) | set(models.FACET_TRIGGERS) <= triggers
+
+    def test_catalog_volumes(self):
+        """Test that extra volumes extend the catalog with unique titles."""
+        titles = seed.workbook_catalog(volumes=3)
+
+        assert len(titles) == 3 * len(seed.workbook_catalog())
+        assert len(set(titles)) == len(titles)
+        assert "Grade 4 Decimals and Fractions" in titles
+
+    def test_generate_refuses_existing_file(self, tmp_path):
+        """Test that an existing database is never overwritten."""
+        path = tmp_path / "ledger.sqlite"
+        path.write_bytes(b"")
+
+        with pytest.raises(FileExistsError):
+            seed.generate(str(path), families=1, children=1, transactions=1)
@@ -0,0 +1,143 @@
+"""
+Unit tests for per-child activity statistics.
+
+Tests the trigger-maintained ChildStats table in app/models.py,
+app/stats.py and the routes in app/routers/stats.py.
+"""
+
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app import archive, stats
+
+
+@pytest.fixture
+def ledger(make_ledger):
+    """Two children with transactions and completions, and one without."""
+    return make_ledger(
+        ["River", "Summer", "Autumn"],
+        transactions=[
+            ("River", "2024-03-01", "Gift", 100.0),
+            ("River", "2024-07-04", "Candy", -12.5),
+            ("River", "2025-02-10", "Chores", 20.0),
+            ("Summer", "2025-12-31", "Stickers", -3.0),
+        ],
+        completions=[
+            ("River", 1, "2025-03-01"),
+            ("Summer", 1, "2026-01-09"),
+            ("Summer", 2, "2026-01-10"),
+        ],
+        workbooks=2
+    )
+
+
+def _row(db, child_id):
+    """The stored statistics of one child."""
+    return stats.get_stats(db, child_id)[0]
+
+
+class TestTriggers:
+    """Tests for the trigger-maintained statistics."""
+    
+    def test_counts_sums_and_last_activity(self, test_db, ledger):
+        """Test the statistics kept for ORM inserts."""
+        river, summer, autumn = ledger
+        
+        assert _row(test_db, river.id) == {
+            "child_id": river.id, "child_name": "River", "transactions": 3,
+            "credits": 120.0, "debits": 12.5, "completions": 1, "last_activity": "2025-03-01"
+        }
+        assert _row(test_db, summer.id)["completions"] == 2
+        assert _row(test_db, summer.id)["last_activity"] == "2026-01-10"
+        assert _row(test_db, autumn.id)["transactions"] == 0
+        assert _row(test_db, autumn.id)["last_activity"] is None
+        assert stats.verify(test_db) == []
+    
+    def test_legacy_cli_inserts(self, test_db, test_engine, ledger):
+        """Test that rows written outside SQLAlchemy are counted too."""
+        river, _, _ = ledger
+        conn = sqlite3.connect(test_engine.url.database)
+        conn.execute(
+            "INSERT OR IGNORE INTO Account (children_id, date, description, amount) VALUES (?,?,?,?)",
+            (river.id, "2026-02-01", "Payout", 5.0)
+        )
+        conn.commit()
+        conn.close()
+        
+        row = _row(test_db, river.id)
+        assert (row["transactions"], row["credits"], row["last_activity"]) == (4, 125.0, "2026-02-01")
+        assert stats.verify(test_db) == []
+    
+    def test_update_and_delete(self, test_db, ledger):
+        """Test that moving and deleting rows keeps the statistics current."""
+        river, summer, _ = ledger
+        test_db.execute(text(
+            "UPDATE Account SET children_id = :to WHERE description = 'Chores'"
+        ), {"to": summer.id})
+        test_db.execute(text("DELETE FROM Account WHERE description = 'Gift'"))
+        test_db.commit()
+        
+        river_row, summer_row = _row(test_db, river.id), _row(test_db, summer.id)
+        assert (river_row["transactions"], river_row["credits"], river_row["last_activity"]) == (1, 0.0, "2025-03-01")
+        assert (summer_row["transactions"], summer_row["credits"]) == (2, 20.0)
+        assert stats.verify(test_db) == []
+
+
+class TestVerifyAndRebuild:
+    """Tests for detecting and repairing drift."""
+    
+    def test_drift_is_reported_and_repaired(self, test_db, ledger):
+        """Test that a bypassed table shows up in verify and rebuild fixes it."""
+        river, _, _ = ledger
+        test_db.execute(text("UPDATE ChildStats SET credits = 1, completions = 9 WHERE children_id = :id"),
+                        {"id": river.id})
+        test_db.commit()
+        
+        drift = stats.verify(test_db)
+        assert [(d["child_id"], d["column"], d["stored"], d["expected"]) for d in drift] == [
+            (river.id, "credits", 1.0, 120.0), (river.id, "completions", 9, 1)
+        ]
+        
+        assert stats.rebuild(test_db) == 2
+        assert stats.verify(test_db) == []
+        assert _row(test_db, river.id)["credits"] == 120.0
+    
+    def test_archived_years_still_count(self, test_db, test_engine, ledger):
+        """Test that archiving a year neither changes nor drifts the statistics."""
+        river, _, _ = ledger
+        before = stats.get_stats(test_db)
+        try:
+            archive.archive_year(test_db, 2024, today=date(2026, 3, 1))
+            
+            assert stats.get_stats(test_db) == before
+            assert stats.verify(test_db) == []
+            stats.rebuild(test_db)
+            assert _row(test_db, river.id)["transactions"] == 3
+        finally:
+            path = archive.archive_path(test_engine)
+            test_engine.dispose()
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class TestStatsRoutes:
+    """Tests for the statistics API endpoints."""
+    
+    def test_all_children(self, client, ledger):
+        """Test listing statistics for every child."""
+        response = client.get("/api/stats")
+        
+        assert response.status_code == 200
+        assert [row["child_name"] for row in response.json()] == ["River", "Summer", "Autumn"]
+    
+    def test_one_child(self, client, ledger):
+        """Test one child's statistics and an unknown child."""
+        response = client.get(f"/api/child/{ledger[1].id}/stats")
+        
+        assert response.status_code == 200
+        assert response.json()["debits"] == 3.0
+        assert client.get("/api/child/999/stats").status_code == 404
@@ -0,0 +1,142 @@
+"""
+Unit tests for multi-tenant routing.
+
+Tests app/tenants.py with the application wrapped in TenantMiddleware.
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import tenants
+from app.main import create_app
+
+
+@pytest.fixture
+def tenant_engines(tmp_path):
+    """Two households, with room for only two open engines."""
+    tenant_engines = tenants.TenantEngines(str(tmp_path), capacity=2)
+    tenant_engines.create("holt")
+    tenant_engines.create("chen")
+    yield tenant_engines
+    tenant_engines.clear()
+
+
+def _client(tenant_engines, mode, **kwargs):
+    """Client for an application routing tenants by mode."""
+    application = create_app()
+    application.add_middleware(
+        tenants.TenantMiddleware, mode=mode, tenant_engines=tenant_engines
+    )
+    return TestClient(application, **kwargs)
+
+
+class TestTenantEngines:
+    """Tests for the engine LRU."""
+    
+    def test_lists_and_validates_names(self, tenant_engines):
+        """Test that only valid names map to files."""
+        assert tenant_engines.tenants() == ["chen", "holt"]
+        with pytest.raises(ValueError):
+            tenants.tenant_path("../etc/passwd")
+        with pytest.raises(LookupError):
+            tenant_engines.session_factory("smith")
+    
+    def test_evicts_least_recently_used(self, tenant_engines):
+        """Test that the cache stays bounded and reopens evicted tenants."""
+        tenant_engines.create("larsen")
+        holt = tenant_engines.session_factory("holt")
+        tenant_engines.session_factory("chen")
+        assert tenant_engines.session_factory("holt") is holt
+        
+        tenant_engines.session_factory("larsen")
+        
+        assert tenant_engines.stats() == {
+            "open": 2, "capacity": 2, "hits": 1, "opened": 3, "evicted": 1
+        }
+        assert tenant_engines.session_factory("holt") is holt
+        assert tenant_engines.session_factory("chen") is not None
+        assert tenant_engines.stats()["evicted"] == 2
+    
+
+    def test_reopening_skips_schema_upgrade(self, tenant_engines, monkeypatch):
+        """Test that the DDL runs once per tenant, not on every LRU miss."""
+        calls = []
+        monkeypatch.setattr(tenants, "init_db", calls.append)
+        fresh = tenants.TenantEngines(tenant_engines.directory, capacity=1)
+        try:
+            for name in ("holt", "chen", "holt", "chen"):
+                fresh.session_factory(name)
+        finally:
+            fresh.clear()
+        
+        assert len(calls) == 2
+        assert fresh.stats()["evicted"] == 3
+    
+    def test_background_jobs_bypass_the_lru(self, tenant_engines, monkeypatch):
+        """Test that visiting every household leaves the request engines alone."""
+        monkeypatch.setattr(tenants, "TENANT_MODE", "header")
+        monkeypatch.setattr(tenants, "engines", tenant_engines)
+        holt = tenant_engines.session_factory("holt")
+        
+        visited = [factory.kw["bind"].url.database for factory in tenants.session_factories()]
+        
+        assert [os.path.basename(path) for path in visited] == ["chen.sqlite", "holt.sqlite"]
+        assert tenant_engines.session_factory("holt") is holt
+        assert tenant_engines.stats()["opened"] == 1
+
+
+class TestTenantMiddleware:
+    """Tests for routing requests to tenant databases."""
+    
+    def test_header_routing_isolates_households(self, tenant_engines):
+        """Test that each household sees only its own children."""
+        with _client(tenant_engines, "header") as client:
+            response = client.post(
+                "/children", data={"name": "River"}, headers={"X-Ledger-Tenant": "holt"}
+            )
+            assert response.status_code == 200
+            
+            holt = client.get("/api/children", headers={"X-Ledger-Tenant": "holt"}).json()
+            chen = client.get("/api/children", headers={"X-Ledger-Tenant": "chen"}).json()
+        
+        assert [child["name"] for child in holt] == ["River"]
+        assert chen == []
+    
+    def test_unknown_or_missing_tenant(self, tenant_engines):
+        """Test that requests without a known tenant are rejected."""
+        with _client(tenant_engines, "header") as client:
+            assert client.get("/api/children").status_code == 404
+            response = client.get("/api/children", headers={"X-Ledger-Tenant": "smith"})
+            assert response.status_code == 404
+            assert response.json() == {"detail": "Unknown tenant"}
+            assert client.get("/api/metrics").status_code == 200
+    
+    def test_path_routing(self, tenant_engines):
+        """Test that a /t/<tenant>/ prefix selects the tenant."""
+        with _client(tenant_engines, "path") as client:
+            client.post("/t/chen/children", data={"name": "Summer"}, follow_redirects=False)
+            
+            chen = client.get("/t/chen/api/children").json()
+            holt = client.get("/t/holt/api/children").json()
+            
+            assert [child["name"] for child in chen] == ["Summer"]
+            assert holt == []
+            assert client.get("/api/children").status_code == 404
+    
+    def test_host_routing(self, tenant_engines):
+        """Test that the first host label selects the tenant."""
+        with _client(tenant_engines, "host", base_url="http://holt.ledger.test") as client:
+            client.post("/children", data={"name": "Rowan"})
+            
+            names = [child["name"] for child in client.get("/api/children").json()]
+            other = client.get("/api/children", headers={"Host": "chen.ledger.test"}).json()
+        
+        assert names == ["Rowan"]
+        assert other == []
+    
+    def test_unknown_mode(self):
+        """Test that a misconfigured mode fails fast."""
+        with pytest.raises(ValueError):
+            tenants.TenantMiddleware(None, mode="cookie")